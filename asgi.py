@@ -0,0 +1,331 @@
+"""ASGI entry point serving the allergen, nutrition and recipe endpoints with asyncio.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+
+Importing backend loads the models, so this serves the same model objects,
+result cache and response bodies as the Flask app. The event loop only reads
+requests and writes responses. Searches run in a bounded thread pool
+(ASGI_SEARCH_THREADS), so idle keep-alive connections and slow recipe
+queries don't tie up a worker. At most ASGI_SEARCH_QUEUE_DEPTH searches
+wait for a thread; past that a request gets a 503 with Retry-After right
+away instead of queueing without bound.
+"""
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g
+
+import backend
+from backend import models, result_cache
+from json_rows import score_fields
+from metrics import ERROR_KINDS, ERRORS, EXCEPTIONS, REQUEST_LATENCY, record_result_size, stage
+from singleflight import AsyncSingleFlight, FlightTimeout
+
+SEARCH_THREADS = int(os.environ.get("ASGI_SEARCH_THREADS", os.cpu_count() or 1))
+SEARCH_QUEUE_DEPTH = int(os.environ.get("ASGI_SEARCH_QUEUE_DEPTH", 64))
+MAX_BODY_BYTES = 1 << 20
+
+
+class Overloaded(Exception):
+    """The search pool already has as many jobs as it may hold."""
+
+
+class BoundedExecutor:
+    """Thread pool that refuses new jobs once `threads + max_queue` are pending."""
+
+    def __init__(self, threads, max_queue):
+        self.threads = threads
+        self.max_queue = max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="search")
+
+    async def run(self, fn, *args):
+        if self.pending >= self.threads + self.max_queue:
+            self.rejected += 1
+            raise Overloaded("Too many searches queued, try again shortly")
+        return await self.run_admitted(fn, *args)
+
+    async def run_admitted(self, fn, *args):
+        """run() for a later job of a request already let in, such as the next chunk of a stream.
+
+        It is never refused: the response has started, so a 503 can no longer be sent.
+        """
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        future = self._pool.submit(fn, *args)
+        # Released when the job ends, even if the request awaiting it was cancelled
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _release(self):
+        self.pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "threads": self.threads,
+            "max_queue": self.max_queue,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+
+searches = BoundedExecutor(SEARCH_THREADS, SEARCH_QUEUE_DEPTH)
+in_flight = AsyncSingleFlight(timeout=backend.SINGLE_FLIGHT_TIMEOUT)
+
+
+def in_app_context(endpoint, fn, *args):
+    # stage() and record_result_size() report through flask.g
+    with backend.app.app_context():
+        g.metrics_endpoint = endpoint
+        return fn(*args)
+
+
+def search(endpoint, fn, *args, **kwargs):
+    return searches.run(in_app_context, endpoint, functools.partial(fn, *args, **kwargs))
+
+
+async def coalesced(namespace, model, key, compute):
+    """Like backend.coalesced, for a coroutine function."""
+    if backend.SINGLE_FLIGHT_TIMEOUT <= 0:
+        return await compute(), False
+    return await in_flight.do((namespace, id(model), key), compute)
+
+
+async def stream_chunks(endpoint, model, query, **kwargs):
+    """(async iterator of NDJSON chunks, headers).
+
+    Only the search runs before the response starts. Each chunk is then
+    encoded on a search thread once the previous one has been sent, so the
+    first rows go out early and only one chunk is held at a time.
+    """
+    chunks, headers = await search(endpoint, stream_search, model, query, **kwargs)
+
+    async def body():
+        while True:
+            chunk = await searches.run_admitted(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    return body(), headers
+
+
+def error(status, message):
+    return status, backend.encode_json({"error": message}), {}
+
+
+def wants_stream(data, headers):
+    return data.get("stream") is True or backend.NDJSON_MIMETYPE in headers.get("accept", "")
+
+
+def parse_text(data, field):
+    """(normalized query, None) or (None, error response)."""
+    if not isinstance(data, dict) or field not in data:
+        return None, error(400, f"Missing '{field}' in request")
+    if not isinstance(data[field], str):
+        return None, error(400, f"'{field}' must be a string")
+    query = data[field].strip().lower()
+    if not query:
+        return None, error(400, "Empty query")
+    return query, None
+
+
+# ====================== SEARCH JOBS ======================
+# Run on the search threads.
+
+def stream_search(model, query, **kwargs):
+    """(NDJSON chunk generator, headers) for a streamed response; the chunks are encoded as they are drawn."""
+    with stage("search"):
+        found = model.find(query, **kwargs)
+    rows, scores = found if isinstance(found, tuple) else (found, None)
+    record_result_size(len(rows))
+    extras = score_fields(scores) if scores is not None else None
+    headers = {"X-Result-Count": str(len(rows)), "X-Model-Version": str(model.version)}
+    return backend.row_chunks(model, rows, extras), headers
+
+
+def nutrition_body(query):
+    with stage("search"):
+        food, nutrition = backend.lookup_food(query)
+    record_result_size(1 if nutrition else 0)
+    with stage("serialize"):
+        body = backend.encode_json(backend.nutrition_payload(query, food, nutrition))
+    return (200 if nutrition else 404), body
+
+
+# ====================== ENDPOINTS ======================
+
+async def predict_allergen(data, headers):
+    model = models['allergen']
+    if not model:
+        return error(503, "Allergen model not available")
+    query, failed = parse_text(data, "text")
+    if failed:
+        return failed
+
+    if wants_stream(data, headers):
+        chunks, extra = await stream_chunks("predict_allergen", model, query)
+        return 200, chunks, extra
+
+    body = result_cache.get('allergen', model, query)
+    if body is not None:
+        return 200, body, {"X-Cache": "HIT"}
+    body, shared = await coalesced('allergen', model, query,
+                                   lambda: search("predict_allergen", backend.allergen_body, model, query))
+    return 200, body, {"X-Cache": "SHARED" if shared else "MISS"}
+
+
+async def predict_nutrition(data, headers):
+    if not models['nutrition']:
+        return error(503, "Nutrition model not available")
+    query, failed = parse_text(data, "text")
+    if failed:
+        return failed
+    status, body = await search("predict_nutrition", nutrition_body, query)
+    return status, body, {}
+
+
+async def recommend_recipes(data, headers):
+    model = models['recipe']
+    if not model:
+        return error(503, "Recipe model not available")
+    query, failed = parse_text(data, "query")
+    if failed:
+        return failed
+    top_n = backend.parse_top_n(data)
+    if top_n is None:
+        return error(400, f"'top_n' must be an integer between 1 and {backend.MAX_TOP_N}")
+    if data.get("exclude_allergens"):
+        # The first request after a (re)load may build the recipe/allergen join, a pass over the corpus
+        exclusion, message, status = await search("recommend_recipes", backend.parse_exclusions, data, model)
+    else:
+        exclusion, message, status = backend.parse_exclusions(data, model)
+    if message:
+        return error(status, message)
+    allowed, excluded, exclusion_key = exclusion
+    key = (query, top_n) + exclusion_key
+
+    if wants_stream(data, headers):
+        chunks, extra = await stream_chunks("recommend_recipes", model, query, top_n=top_n, allowed=allowed)
+        return 200, chunks, extra
+
+    body = result_cache.get('recipe', model, key)
+    if body is not None:
+        return 200, body, {"X-Cache": "HIT"}
+    body, shared = await coalesced('recipe', model, key, lambda: search(
+        "recommend_recipes", backend.recipe_body, model, query, top_n, allowed, excluded, key))
+    return 200, body, {"X-Cache": "SHARED" if shared else "MISS"}
+
+
+async def cache_stats(data, headers):
+    stats = dict(result_cache.stats(), single_flight=in_flight.stats(), search_pool=searches.stats())
+    return 200, backend.encode_json(stats), {}
+
+
+# path -> (method, metrics endpoint name, handler)
+ROUTES = {
+    "/predict_allergen": ("POST", "predict_allergen", predict_allergen),
+    "/predict_nutrition": ("POST", "predict_nutrition", predict_nutrition),
+    "/recommend_recipes": ("POST", "recommend_recipes", recommend_recipes),
+    "/cache_stats": ("GET", None, cache_stats),
+}
+
+
+# ====================== ASGI ======================
+
+async def read_body(receive):
+    """The request body, or None if it is larger than MAX_BODY_BYTES."""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return b""
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def respond(send, status, body, headers):
+    """Send a response; an async iterator body is sent as NDJSON, one message per chunk as it comes."""
+    stream = hasattr(body, "__aiter__")
+    mimetype = backend.NDJSON_MIMETYPE if stream else backend.app.json.mimetype
+    raw = [(b"content-type", mimetype.encode()), (b"access-control-allow-origin", b"*")]
+    raw += [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    if not stream:
+        raw.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": raw})
+    if not stream:
+        await send({"type": "http.response.body", "body": body})
+        return
+    async for chunk in body:
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            searches.shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+    if scope["method"] == "OPTIONS":
+        # CORS preflight, answered like flask_cors does for the Flask app
+        allow = {"Access-Control-Allow-Methods": "GET, POST, OPTIONS"}
+        if "access-control-request-headers" in headers:
+            allow["Access-Control-Allow-Headers"] = headers["access-control-request-headers"]
+        return await respond(send, 200, b"", allow)
+
+    route = ROUTES.get(scope["path"])
+    if route is None:
+        return await respond(send, *error(404, "Not found"))
+    method, endpoint, handler = route
+    if scope["method"] != method:
+        return await respond(send, *error(405, "Method not allowed"))
+
+    started = time.perf_counter()
+    body = await read_body(receive)
+    if body is None:
+        response = error(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+    else:
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        try:
+            response = await handler(data, headers)
+        except (Overloaded, FlightTimeout) as e:
+            response = 503, backend.encode_json({"error": str(e)}), {"Retry-After": "1"}
+        except Exception as e:
+            if endpoint is not None:
+                EXCEPTIONS.labels(endpoint, type(e).__name__).inc()
+            response = error(500, str(e))
+
+    status = response[0]
+    if endpoint is not None:
+        REQUEST_LATENCY.labels(endpoint, str(status)).observe(time.perf_counter() - started)
+        if status in ERROR_KINDS:
+            ERRORS.labels(endpoint, ERROR_KINDS[status]).inc()
+    await respond(send, *response)
@@ -1,434 +1,807 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import joblib
-
-# Very important: import your custom class before loading pickle!
-from model import AllergenModel
-
-app = Flask(__name__)
-CORS(app)
-
-# ===========================
-# Load Models
-# ===========================
-
-try:
-    print("🔄 Loading models...")
-    allergen_model = joblib.load('allergen_model.pkl')
-    print("✅ Allergen model loaded successfully!")
-except Exception as e:
-    print("❌ Error loading allergen model:", e)
-    allergen_model = None
-
-# (if you later fix recipe_model.pkl, same logic applies)
-
-# ===========================
-# Your Endpoints
-# ===========================
-
-@app.route("/")
-def home():
-    return "Nutrition API is Running 🚀"
-
-@app.route("/predict_allergen", methods=["POST"])
-def predict_allergen():
-    if allergen_model is None:
-        return jsonify({"error": "Allergen model not available"}), 500
-    
-    data = request.get_json()
-    text = data.get("text", "")
-    
-    if not text:
-        return jsonify({"error": "No input provided"}), 400
-
-    try:
-        result = allergen_model.predict(text)  # Assuming your model has predict method
-        return jsonify({"result": result})
-    except Exception as e:
-        print("Prediction error:", e)
-        return jsonify({"error": "Prediction failed"}), 500
-
-# ===========================
-# Run app
-# ===========================
-if __name__ == "__main__":
-    import os
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
-
-
-# ====================== MODEL CLASSES ======================
-class AllergenModel:
-    def __init__(self, df):
-        self.df = df
-
-    def search(self, query):
-        query = query.lower().strip()
-        result = self.df[
-            self.df['food'].str.lower().str.contains(query) |
-            self.df['type'].str.lower().str.contains(query) |
-            self.df['group'].str.lower().str.contains(query) |
-            self.df['class'].str.lower().str.contains(query) |
-            self.df['allergy'].str.lower().str.contains(query)
-        ]
-        if result.empty:
-            return "❌ No allergen data found for that query."
-        return result.reset_index(drop=True)
-
-class RecipeSearchModel:
-    def __init__(self, df):
-        self.df = df
-
-    def search(self, query, top_n=5):
-        query = query.lower().strip()
-        results = self.df[
-            self.df['title'].str.lower().str.contains(query) |
-            self.df['ingredients'].str.lower().str.contains(query) |
-            self.df['ner'].str.lower().str.contains(query)
-        ]
-        if results.empty:
-            return "❌ No recipes found for that query."
-        return results[['title', 'ingredients', 'directions', 'link']].head(top_n).reset_index(drop=True)
-
-# ====================== FOOD NUTRITION DATABASE ======================
-
-food_nutrition_db = {
-    "apple": {"calories": 52, "protein": 0.3, "carbs": 14, "fat": 0.2, "fiber": 2.4},
-    "banana": {"calories": 89, "protein": 1.1, "carbs": 23, "fat": 0.3, "fiber": 2.6},
-    "orange": {"calories": 47, "protein": 0.9, "carbs": 12, "fat": 0.1, "fiber": 2.4},
-    "grapes": {"calories": 69, "protein": 0.7, "carbs": 18, "fat": 0.2, "fiber": 0.9},
-    "carrot": {"calories": 41, "protein": 0.9, "carbs": 10, "fat": 0.2, "fiber": 2.8},
-    "spinach": {"calories": 23, "protein": 2.9, "carbs": 3.6, "fat": 0.4, "fiber": 2.2},
-    "broccoli": {"calories": 55, "protein": 3.7, "carbs": 11, "fat": 0.6, "fiber": 3.8},
-    "rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "bread": {"calories": 265, "protein": 9, "carbs": 49, "fat": 3.2, "fiber": 2.7},
-    "chicken breast": {"calories": 165, "protein": 31, "carbs": 0, "fat": 3.6, "fiber": 0},
-    "milk": {"calories": 42, "protein": 3.4, "carbs": 5, "fat": 1, "fiber": 0},
-    "egg": {"calories": 155, "protein": 13, "carbs": 1.1, "fat": 11, "fiber": 0},
-    "cheese": {"calories": 402, "protein": 25, "carbs": 1.3, "fat": 33, "fiber": 0},
-    "yogurt": {"calories": 59, "protein": 10, "carbs": 3.6, "fat": 0.4, "fiber": 0},
-    "beef": {"calories": 250, "protein": 26, "carbs": 0, "fat": 17, "fiber": 0},
-    "salmon": {"calories": 208, "protein": 20, "carbs": 0, "fat": 13, "fiber": 0},
-    "potato": {"calories": 77, "protein": 2, "carbs": 17, "fat": 0.1, "fiber": 2.2},
-    "sweet potato": {"calories": 86, "protein": 1.6, "carbs": 20, "fat": 0.1, "fiber": 3},
-    "oats": {"calories": 389, "protein": 17, "carbs": 66, "fat": 7, "fiber": 10.6},
-    "almonds": {"calories": 579, "protein": 21, "carbs": 22, "fat": 50, "fiber": 12.5},
-    "walnuts": {"calories": 654, "protein": 15, "carbs": 14, "fat": 65, "fiber": 6.7},
-    "peanuts": {"calories": 567, "protein": 26, "carbs": 16, "fat": 49, "fiber": 8.5},
-    "butter": {"calories": 717, "protein": 0.9, "carbs": 0.1, "fat": 81, "fiber": 0},
-    "honey": {"calories": 304, "protein": 0.3, "carbs": 82, "fat": 0, "fiber": 0.2},
-    # FRUITS (120 items)
-    "apple": {"calories": 52, "protein": 0.3, "carbs": 14, "fat": 0.2, "fiber": 2.4},
-    "banana": {"calories": 89, "protein": 1.1, "carbs": 23, "fat": 0.3, "fiber": 2.6},
-    "orange": {"calories": 47, "protein": 0.9, "carbs": 12, "fat": 0.1, "fiber": 2.4},
-    "grapes": {"calories": 69, "protein": 0.7, "carbs": 18, "fat": 0.2, "fiber": 0.9},
-    "strawberry": {"calories": 32, "protein": 0.7, "carbs": 7.7, "fat": 0.3, "fiber": 2},
-    "blueberry": {"calories": 57, "protein": 0.7, "carbs": 14, "fat": 0.3, "fiber": 2.4},
-    "raspberry": {"calories": 52, "protein": 1.2, "carbs": 12, "fat": 0.7, "fiber": 6.5},
-    "blackberry": {"calories": 43, "protein": 1.4, "carbs": 10, "fat": 0.5, "fiber": 5.3},
-    "kiwi": {"calories": 61, "protein": 1.1, "carbs": 15, "fat": 0.5, "fiber": 3},
-    "pineapple": {"calories": 50, "protein": 0.5, "carbs": 13, "fat": 0.1, "fiber": 1.4},
-    "mango": {"calories": 60, "protein": 0.8, "carbs": 15, "fat": 0.4, "fiber": 1.6},
-    "pear": {"calories": 57, "protein": 0.4, "carbs": 15, "fat": 0.1, "fiber": 3.1},
-    "peach": {"calories": 39, "protein": 0.9, "carbs": 10, "fat": 0.3, "fiber": 1.5},
-    "plum": {"calories": 46, "protein": 0.7, "carbs": 11, "fat": 0.3, "fiber": 1.4},
-    "cherry": {"calories": 50, "protein": 1, "carbs": 12, "fat": 0.3, "fiber": 1.6},
-    "watermelon": {"calories": 30, "protein": 0.6, "carbs": 8, "fat": 0.2, "fiber": 0.4},
-    "cantaloupe": {"calories": 34, "protein": 0.8, "carbs": 8, "fat": 0.2, "fiber": 0.9},
-    "honeydew": {"calories": 36, "protein": 0.5, "carbs": 9, "fat": 0.1, "fiber": 0.8},
-    "apricot": {"calories": 48, "protein": 1.4, "carbs": 11, "fat": 0.4, "fiber": 2},
-    "nectarine": {"calories": 44, "protein": 1.1, "carbs": 11, "fat": 0.3, "fiber": 1.7},
-    "pomegranate": {"calories": 83, "protein": 1.7, "carbs": 19, "fat": 1.2, "fiber": 4},
-    "fig": {"calories": 74, "protein": 0.8, "carbs": 19, "fat": 0.3, "fiber": 2.9},
-    "grapefruit": {"calories": 42, "protein": 0.8, "carbs": 11, "fat": 0.1, "fiber": 1.6},
-    "lemon": {"calories": 29, "protein": 1.1, "carbs": 9, "fat": 0.3, "fiber": 2.8},
-    "lime": {"calories": 30, "protein": 0.7, "carbs": 11, "fat": 0.2, "fiber": 2.8},
-    "coconut": {"calories": 354, "protein": 3.3, "carbs": 15, "fat": 33, "fiber": 9},
-    "avocado": {"calories": 160, "protein": 2, "carbs": 9, "fat": 15, "fiber": 7},
-    "papaya": {"calories": 43, "protein": 0.5, "carbs": 11, "fat": 0.3, "fiber": 1.7},
-    "guava": {"calories": 68, "protein": 2.6, "carbs": 14, "fat": 1, "fiber": 5.4},
-    "lychee": {"calories": 66, "protein": 0.8, "carbs": 17, "fat": 0.4, "fiber": 1.3},
-    "passion fruit": {"calories": 97, "protein": 2.2, "carbs": 23, "fat": 0.7, "fiber": 10},
-    "dragon fruit": {"calories": 60, "protein": 1.2, "carbs": 13, "fat": 0, "fiber": 3},
-    "star fruit": {"calories": 31, "protein": 1, "carbs": 7, "fat": 0.3, "fiber": 2.8},
-    "persimmon": {"calories": 127, "protein": 0.8, "carbs": 34, "fat": 0.4, "fiber": 3.6},
-    "tangerine": {"calories": 53, "protein": 0.8, "carbs": 13, "fat": 0.3, "fiber": 1.8},
-    "clementine": {"calories": 47, "protein": 0.9, "carbs": 12, "fat": 0.2, "fiber": 1.7},
-    "boysenberry": {"calories": 50, "protein": 1.2, "carbs": 12, "fat": 0.3, "fiber": 5.3},
-    "elderberry": {"calories": 73, "protein": 0.7, "carbs": 18, "fat": 0.5, "fiber": 7},
-    "gooseberry": {"calories": 44, "protein": 0.9, "carbs": 10, "fat": 0.6, "fiber": 4.3},
-    "mulberry": {"calories": 43, "protein": 1.4, "carbs": 10, "fat": 0.4, "fiber": 1.7},
-    "plantain": {"calories": 122, "protein": 1.3, "carbs": 32, "fat": 0.4, "fiber": 2.3},
-    "ackee": {"calories": 151, "protein": 2.9, "carbs": 0.8, "fat": 15, "fiber": 2.7},
-    "breadfruit": {"calories": 103, "protein": 1.1, "carbs": 27, "fat": 0.2, "fiber": 4.9},
-    "cherimoya": {"calories": 75, "protein": 1.6, "carbs": 18, "fat": 0.7, "fiber": 3},
-    "durian": {"calories": 147, "protein": 1.5, "carbs": 27, "fat": 5.3, "fiber": 3.8},
-    "jackfruit": {"calories": 95, "protein": 1.7, "carbs": 23, "fat": 0.6, "fiber": 1.5},
-    "kumquat": {"calories": 71, "protein": 1.9, "carbs": 16, "fat": 0.9, "fiber": 6.5},
-    "longan": {"calories": 60, "protein": 1.3, "carbs": 15, "fat": 0.1, "fiber": 1.1},
-    "loquat": {"calories": 47, "protein": 0.4, "carbs": 12, "fat": 0.2, "fiber": 1.7},
-    "mangosteen": {"calories": 73, "protein": 0.4, "carbs": 18, "fat": 0.6, "fiber": 1.8},
-    "quince": {"calories": 57, "protein": 0.4, "carbs": 15, "fat": 0.1, "fiber": 1.9},
-    "rambutan": {"calories": 68, "protein": 0.9, "carbs": 16, "fat": 0.2, "fiber": 0.9},
-    "sapodilla": {"calories": 83, "protein": 0.4, "carbs": 20, "fat": 1.1, "fiber": 5.3},
-    "soursop": {"calories": 66, "protein": 1, "carbs": 17, "fat": 0.3, "fiber": 3.3},
-    "tamarind": {"calories": 239, "protein": 2.8, "carbs": 63, "fat": 0.6, "fiber": 5.1},
-    "ugli fruit": {"calories": 45, "protein": 0.9, "carbs": 11, "fat": 0.2, "fiber": 1.9},
-    "yuzu": {"calories": 20, "protein": 0.5, "carbs": 7, "fat": 0.1, "fiber": 1.8},
-    # ... (additional fruits to reach 100+)
-
-    # VEGETABLES (150 items)
-    "carrot": {"calories": 41, "protein": 0.9, "carbs": 10, "fat": 0.2, "fiber": 2.8},
-    "spinach": {"calories": 23, "protein": 2.9, "carbs": 3.6, "fat": 0.4, "fiber": 2.2},
-    "broccoli": {"calories": 55, "protein": 3.7, "carbs": 11, "fat": 0.6, "fiber": 3.8},
-    "potato": {"calories": 77, "protein": 2, "carbs": 17, "fat": 0.1, "fiber": 2.2},
-    "sweet potato": {"calories": 86, "protein": 1.6, "carbs": 20, "fat": 0.1, "fiber": 3},
-    "tomato": {"calories": 18, "protein": 0.9, "carbs": 3.9, "fat": 0.2, "fiber": 1.2},
-    "cucumber": {"calories": 16, "protein": 0.7, "carbs": 3.6, "fat": 0.1, "fiber": 0.5},
-    "onion": {"calories": 40, "protein": 1.1, "carbs": 9, "fat": 0.1, "fiber": 1.7},
-    "garlic": {"calories": 149, "protein": 6.4, "carbs": 33, "fat": 0.5, "fiber": 2.1},
-    "bell pepper": {"calories": 31, "protein": 1, "carbs": 6, "fat": 0.3, "fiber": 2.1},
-    "zucchini": {"calories": 17, "protein": 1.2, "carbs": 3.1, "fat": 0.3, "fiber": 1},
-    "eggplant": {"calories": 25, "protein": 1, "carbs": 6, "fat": 0.2, "fiber": 3},
-    "mushroom": {"calories": 22, "protein": 3.1, "carbs": 3.3, "fat": 0.3, "fiber": 1},
-    "cauliflower": {"calories": 25, "protein": 2, "carbs": 5, "fat": 0.3, "fiber": 2},
-    "brussels sprouts": {"calories": 43, "protein": 3.4, "carbs": 9, "fat": 0.3, "fiber": 3.8},
-    "kale": {"calories": 35, "protein": 2.9, "carbs": 4.4, "fat": 1.5, "fiber": 4.1},
-    "lettuce": {"calories": 15, "protein": 1.4, "carbs": 2.9, "fat": 0.2, "fiber": 1.3},
-    "cabbage": {"calories": 25, "protein": 1.3, "carbs": 5.8, "fat": 0.1, "fiber": 2.5},
-    "celery": {"calories": 16, "protein": 0.7, "carbs": 3, "fat": 0.2, "fiber": 1.6},
-    "asparagus": {"calories": 20, "protein": 2.2, "carbs": 3.9, "fat": 0.1, "fiber": 2.1},
-    "green beans": {"calories": 31, "protein": 1.8, "carbs": 7, "fat": 0.1, "fiber": 2.7},
-    "peas": {"calories": 81, "protein": 5.4, "carbs": 14, "fat": 0.4, "fiber": 5.1},
-    "corn": {"calories": 86, "protein": 3.3, "carbs": 19, "fat": 1.4, "fiber": 2},
-    "pumpkin": {"calories": 26, "protein": 1, "carbs": 6.5, "fat": 0.1, "fiber": 0.5},
-    "butternut squash": {"calories": 45, "protein": 1, "carbs": 12, "fat": 0.1, "fiber": 2},
-    "beetroot": {"calories": 43, "protein": 1.6, "carbs": 10, "fat": 0.2, "fiber": 2.8},
-    "radish": {"calories": 16, "protein": 0.7, "carbs": 3.4, "fat": 0.1, "fiber": 1.6},
-    "turnip": {"calories": 28, "protein": 0.9, "carbs": 6.4, "fat": 0.1, "fiber": 1.8},
-    "artichoke": {"calories": 47, "protein": 3.3, "carbs": 11, "fat": 0.2, "fiber": 5.4},
-    "leek": {"calories": 61, "protein": 1.5, "carbs": 14, "fat": 0.3, "fiber": 1.8},
-    "fennel": {"calories": 31, "protein": 1.2, "carbs": 7.3, "fat": 0.2, "fiber": 3.1},
-    "bok choy": {"calories": 13, "protein": 1.5, "carbs": 2.2, "fat": 0.2, "fiber": 1},
-    "arugula": {"calories": 25, "protein": 2.6, "carbs": 3.7, "fat": 0.7, "fiber": 1.6},
-    "endive": {"calories": 17, "protein": 1.3, "carbs": 3.4, "fat": 0.2, "fiber": 3.1},
-    "watercress": {"calories": 11, "protein": 2.3, "carbs": 1.3, "fat": 0.1, "fiber": 0.5},
-    "collard greens": {"calories": 32, "protein": 3, "carbs": 5.4, "fat": 0.6, "fiber": 4},
-    "swiss chard": {"calories": 19, "protein": 1.8, "carbs": 3.7, "fat": 0.2, "fiber": 1.6},
-    "okra": {"calories": 33, "protein": 1.9, "carbs": 7.5, "fat": 0.2, "fiber": 3.2},
-    "parsnip": {"calories": 75, "protein": 1.2, "carbs": 18, "fat": 0.3, "fiber": 4.9},
-    "rutabaga": {"calories": 37, "protein": 1.1, "carbs": 8.6, "fat": 0.2, "fiber": 2.3},
-    "daikon": {"calories": 18, "protein": 0.6, "carbs": 4.1, "fat": 0.1, "fiber": 1.6},
-    "jicama": {"calories": 38, "protein": 0.7, "carbs": 9, "fat": 0.1, "fiber": 4.9},
-    "kohlrabi": {"calories": 27, "protein": 1.7, "carbs": 6.2, "fat": 0.1, "fiber": 3.6},
-    # ... (additional vegetables to reach 150+)
-
-    # GRAINS/CEREALS (100 items)
-    "rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "bread": {"calories": 265, "protein": 9, "carbs": 49, "fat": 3.2, "fiber": 2.7},
-    "oats": {"calories": 389, "protein": 17, "carbs": 66, "fat": 7, "fiber": 10.6},
-    "quinoa": {"calories": 120, "protein": 4.4, "carbs": 21, "fat": 1.9, "fiber": 2.8},
-    "barley": {"calories": 354, "protein": 12, "carbs": 73, "fat": 2.3, "fiber": 17},
-    "buckwheat": {"calories": 343, "protein": 13, "carbs": 72, "fat": 3.4, "fiber": 10},
-    "millet": {"calories": 378, "protein": 11, "carbs": 73, "fat": 4.2, "fiber": 8.5},
-    "bulgur": {"calories": 83, "protein": 3.1, "carbs": 19, "fat": 0.2, "fiber": 4.5},
-    "farro": {"calories": 340, "protein": 15, "carbs": 71, "fat": 2.5, "fiber": 10},
-    "spelt": {"calories": 338, "protein": 15, "carbs": 70, "fat": 2.4, "fiber": 10.7},
-    "amaranth": {"calories": 371, "protein": 14, "carbs": 65, "fat": 7, "fiber": 7},
-    "teff": {"calories": 367, "protein": 13, "carbs": 73, "fat": 2.4, "fiber": 8},
-    "cornmeal": {"calories": 370, "protein": 7, "carbs": 79, "fat": 1.8, "fiber": 7.3},
-    "whole wheat flour": {"calories": 340, "protein": 13, "carbs": 72, "fat": 2.5, "fiber": 10.7},
-    "white flour": {"calories": 364, "protein": 10, "carbs": 76, "fat": 1, "fiber": 2.7},
-    "rye flour": {"calories": 325, "protein": 10, "carbs": 69, "fat": 1.6, "fiber": 15.1},
-    "coconut flour": {"calories": 400, "protein": 20, "carbs": 60, "fat": 13, "fiber": 39},
-    "almond flour": {"calories": 600, "protein": 24, "carbs": 20, "fat": 53, "fiber": 11},
-    "corn flour": {"calories": 364, "protein": 6.9, "carbs": 76, "fat": 3.9, "fiber": 7.3},
-    "sorghum": {"calories": 329, "protein": 11, "carbs": 72, "fat": 3.5, "fiber": 6.7},
-    "wild rice": {"calories": 101, "protein": 4, "carbs": 21, "fat": 0.3, "fiber": 1.8},
-    "basmati rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "jasmine rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "brown rice": {"calories": 111, "protein": 2.6, "carbs": 23, "fat": 0.9, "fiber": 1.8},
-    "black rice": {"calories": 160, "protein": 5, "carbs": 34, "fat": 1.5, "fiber": 2},
-    "red rice": {"calories": 140, "protein": 3, "carbs": 30, "fat": 1, "fiber": 2.5},
-    "sushi rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "arborio rice": {"calories": 130, "protein": 2.7, "carbs": 28, "fat": 0.3, "fiber": 0.4},
-    "couscous": {"calories": 112, "protein": 3.8, "carbs": 23, "fat": 0.2, "fiber": 1.4},
-    "polenta": {"calories": 70, "protein": 1.4, "carbs": 15, "fat": 0.4, "fiber": 1.2},
-    # ... (additional grains to reach 100+)
-
-    # PROTEINS (150 items)
-    "chicken breast": {"calories": 165, "protein": 31, "carbs": 0, "fat": 3.6, "fiber": 0},
-    "egg": {"calories": 155, "protein": 13, "carbs": 1.1, "fat": 11, "fiber": 0},
-    "beef": {"calories": 250, "protein": 26, "carbs": 0, "fat": 17, "fiber": 0},
-    "salmon": {"calories": 208, "protein": 20, "carbs": 0, "fat": 13, "fiber": 0},
-    "tuna": {"calories": 144, "protein": 23, "carbs": 0, "fat": 5, "fiber": 0},
-    "pork": {"calories": 242, "protein": 25, "carbs": 0, "fat": 16, "fiber": 0},
-    "turkey": {"calories": 135, "protein": 29, "carbs": 0, "fat": 3, "fiber": 0},
-    "lamb": {"calories": 294, "protein": 25, "carbs": 0, "fat": 21, "fiber": 0},
-    "duck": {"calories": 337, "protein": 19, "carbs": 0, "fat": 28, "fiber": 0},
-    "cod": {"calories": 82, "protein": 18, "carbs": 0, "fat": 0.7, "fiber": 0},
-    "tilapia": {"calories": 96, "protein": 20, "carbs": 0, "fat": 1.7, "fiber": 0},
-    "shrimp": {"calories": 99, "protein": 24, "carbs": 0.2, "fat": 0.3, "fiber": 0},
-    "crab": {"calories": 97, "protein": 20, "carbs": 0, "fat": 1.5, "fiber": 0},
-    "lobster": {"calories": 90, "protein": 19, "carbs": 0.5, "fat": 0.9, "fiber": 0},
-    "mussels": {"calories": 86, "protein": 12, "carbs": 3.7, "fat": 2.2, "fiber": 0},
-    "oysters": {"calories": 68, "protein": 7, "carbs": 3.9, "fat": 2.5, "fiber": 0},
-    "scallops": {"calories": 111, "protein": 21, "carbs": 2.4, "fat": 1.6, "fiber": 0},
-    "sardines": {"calories": 208, "protein": 25, "carbs": 0, "fat": 11, "fiber": 0},
-    "anchovies": {"calories": 131, "protein": 20, "carbs": 0, "fat": 4.8, "fiber": 0},
-    "mackerel": {"calories": 205, "protein": 19, "carbs": 0, "fat": 14, "fiber": 0},
-    "trout": {"calories": 141, "protein": 20, "carbs": 0, "fat": 6.2, "fiber": 0},
-    "halibut": {"calories": 111, "protein": 23, "carbs": 0, "fat": 2.3, "fiber": 0},
-    "bass": {"calories": 124, "protein": 21, "carbs": 0, "fat": 4, "fiber": 0},
-    "herring": {"calories": 158, "protein": 18, "carbs": 0, "fat": 9, "fiber": 0},
-    "catfish": {"calories": 95, "protein": 16, "carbs": 0, "fat": 2.8, "fiber": 0},
-    "swordfish": {"calories": 144, "protein": 19, "carbs": 0, "fat": 7.5, "fiber": 0},
-    "clams": {"calories": 74, "protein": 13, "carbs": 2.6, "fat": 0.8, "fiber": 0},
-    "octopus": {"calories": 82, "protein": 15, "carbs": 2.2, "fat": 1, "fiber": 0},
-    "squid": {"calories": 92, "protein": 16, "carbs": 3.1, "fat": 1.4, "fiber": 0},
-    "frog legs": {"calories": 73, "protein": 16, "carbs": 0, "fat": 0.3, "fiber": 0},
-    "rabbit": {"calories": 173, "protein": 33, "carbs": 0, "fat": 3.5, "fiber": 0},
-    "venison": {"calories": 158, "protein": 30, "carbs": 0, "fat": 3.2, "fiber": 0},
-    "bison": {"calories": 143, "protein": 28, "carbs": 0, "fat": 2.4, "fiber": 0},
-    "elk": {"calories": 146, "protein": 30, "carbs": 0, "fat": 2, "fiber": 0},
-    "quail": {"calories": 227, "protein": 25, "carbs": 0, "fat": 14, "fiber": 0},
-    "pheasant": {"calories": 181, "protein": 30, "carbs": 0, "fat": 6, "fiber": 0},
-    "goose": {"calories": 371, "protein": 25, "carbs": 0, "fat": 30, "fiber": 0},
-    "emu": {"calories": 134, "protein": 23, "carbs": 0, "fat": 4, "fiber": 0},
-    "ostrich": {"calories": 145, "protein": 27, "carbs": 0, "fat": 3, "fiber": 0},
-    "alligator": {"calories": 143, "protein": 29, "carbs": 0, "fat": 2.6, "fiber": 0},
-    "kangaroo": {"calories": 121, "protein": 23, "carbs": 0, "fat": 2.5, "fiber": 0},
-    # ... (additional proteins to reach 150+)
-
-    # DAIRY/EGGS (100 items)
-    "milk": {"calories": 42, "protein": 3.4, "carbs": 5, "fat": 1, "fiber": 0},
-    "cheese": {"calories": 402, "protein": 25, "carbs": 1.3, "fat": 33, "fiber": 0},
-    "yogurt": {"calories": 59, "protein": 10, "carbs": 3.6, "fat": 0.4, "fiber": 0},
-    "butter": {"calories": 717, "protein": 0.9, "carbs": 0.1, "fat": 81, "fiber": 0},
-    "cream": {"calories": 340, "protein": 2.1, "carbs": 2.8, "fat": 36, "fiber": 0},
-    "sour cream": {"calories": 193, "protein": 2.4, "carbs": 4.3, "fat": 19, "fiber": 0},
-    "cottage cheese": {"calories": 98, "protein": 11, "carbs": 3.4, "fat": 4.3, "fiber": 0},
-    "ricotta": {"calories": 174, "protein": 11, "carbs": 3, "fat": 13, "fiber": 0},
-    "feta": {"calories": 264, "protein": 14, "carbs": 4.1, "fat": 21, "fiber": 0},
-    "mozzarella": {"calories": 280, "protein": 28, "carbs": 3.1, "fat": 17, "fiber": 0},
-    "parmesan": {"calories": 392, "protein": 36, "carbs": 3.2, "fat": 26, "fiber": 0},
-    "cheddar": {"calories": 403, "protein": 25, "carbs": 1.3, "fat": 33, "fiber": 0},
-    "swiss": {"calories": 380, "protein": 27, "carbs": 5, "fat": 28, "fiber": 0},
-    "gouda": {"calories": 356, "protein": 25, "carbs": 2.2, "fat": 27, "fiber": 0},
-    "brie": {"calories": 334, "protein": 21, "carbs": 0.5, "fat": 28, "fiber": 0},
-    "camembert": {"calories": 300, "protein": 20, "carbs": 0.5, "fat": 24, "fiber": 0},
-    "blue cheese": {"calories": 353, "protein": 21, "carbs": 2.3, "fat": 29, "fiber": 0},
-    # More foods can easily be added here...
-}
-# ====================== LOAD MODELS ======================
-models = {
-    'allergen': None,
-    'nutrition': True,  # Mock flag (we are using lookup)
-    'recipe': None
-}
-
-try:
-    print("\u26a0\ufe0f Loading models...")
-    
-    # Load Allergen Model
-    allergen_path = os.path.join(os.path.dirname(__file__), 'allergen_model.pkl')
-    if os.path.exists(allergen_path):
-        with open(allergen_path, 'rb') as f:
-            models['allergen'] = pickle.load(f)
-        print("\u2705 Allergen model loaded successfully")
-    else:
-        print("\u274c Allergen model file not found")
-        
-    # Load Recipe Model
-    recipe_path = os.path.join(os.path.dirname(__file__), 'recipe_model.pkl')
-    if os.path.exists(recipe_path):
-        with open(recipe_path, 'rb') as f:
-            models['recipe'] = pickle.load(f)
-        print("\u2705 Recipe model loaded successfully")
-    else:
-        print("\u26a0\ufe0f Recipe model file not found - using dummy data")
-        dummy_data = {
-            'title': ['Dummy Recipe'],
-            'ingredients': ['Test ingredient'],
-            'directions': ['Test instructions'],
-            'link': ['#'],
-            'ner': ['test']
-        }
-        models['recipe'] = RecipeSearchModel(pd.DataFrame(dummy_data))
-
-except Exception as e:
-    print(f"\u274c Error loading models: {e}")
-
-# ====================== API ENDPOINTS ======================
-
-@app.route("/predict_allergen", methods=["POST"])
-def predict_allergen():
-    if not models['allergen']:
-        return jsonify({"error": "Allergen model not available"}), 503
-        
-    data = request.get_json()
-    if not data or "text" not in data:
-        return jsonify({"error": "Missing 'text' in request"}), 400
-
-    query = data["text"].strip().lower()
-    if not query:
-        return jsonify({"error": "Empty query"}), 400
-
-    try:
-        result = models['allergen'].search(query)
-        if isinstance(result, str):
-            return jsonify({"result": result})
-        return jsonify({
-            "result": result.to_dict(orient="records"),
-            "count": len(result)
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route("/predict_nutrition", methods=["POST"])
-def predict_nutrition():
-    if not models['nutrition']:
-        return jsonify({"error": "Nutrition model not available"}), 503
-
-    data = request.get_json()
-    if not data or "text" not in data:
-        return jsonify({"error": "Missing 'text' in request"}), 400
-
-    query = data["text"].strip().lower()
-    if not query:
-        return jsonify({"error": "Empty query"}), 400
-
-    nutrition = food_nutrition_db.get(query)
-    if not nutrition:
-        return jsonify({"message": "❌ Food not found. Please try another."}), 404
-
-    return jsonify({
-        "food": query,
-        "nutrition": nutrition
-    })
-
-@app.route("/recommend_recipes", methods=["POST"])
-def recommend_recipes():
-    if not models['recipe']:
-        return jsonify({"error": "Recipe model not available"}), 503
-        
-    data = request.get_json()
-    if not data or "query" not in data:
-        return jsonify({"error": "Missing 'query' in request"}), 400
-
-    query = data["query"].strip().lower()
-    if not query:
-        return jsonify({"error": "Empty query"}), 400
-
-    try:
-        results = models['recipe'].search(query)
-        if isinstance(results, str):
-            return jsonify({"message": results})
-        return jsonify({
-            "recipes": results.to_dict(orient="records"),
-            "count": len(results)
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5000)
+import hmac
+import os
+
+import pandas as pd
+from flask import Flask, request, jsonify
+from flask_cors import CORS
+
+from cache import ResultCache
+from json_rows import encode_value, score_fields
+from food_data import food_nutrition_db
+from food_index import FoodIndex
+from metrics import instrumented, record_exception, record_result_size, stage
+from metrics import render as render_metrics
+from model import AllergenModel, RecipeSearchModel, load_model
+from recipe_allergens import AllergenFilter, RecipeAllergenCache
+from nutrition_store import (NUTRIENTS, NutrientMatrix, nutrient_dict, parse_meal_text, parse_predicates,
+                             parse_quantity, portion_grams)
+from reloader import ModelReloader
+from search_index import normalize_ingredient
+from sharding import ShardedRecipeModel
+from singleflight import FlightTimeout, SingleFlight
+
+app = Flask(__name__)
+CORS(app)
+
+# "scan" keeps the original str.contains scans, "index" uses the inverted indexes
+SEARCH_MODE = os.environ.get("SEARCH_MODE", "index").strip().lower()
+
+DEFAULT_TOP_N = 5
+MAX_TOP_N = 100
+MAX_BATCH_SIZE = 100
+MAX_AUTOCOMPLETE = 25
+MAX_MEALS = 50
+MAX_MEAL_ITEMS = 100
+MAX_PANTRY_ITEMS = 50
+DEFAULT_FOOD_LIMIT = 20
+MAX_FOOD_RESULTS = 100
+MAX_SIMILAR = 25
+
+@app.route("/")
+def home():
+    return "Nutrition API is Running 🚀"
+
+# ====================== FOOD NUTRITION DATABASE ======================
+# food_nutrition_db itself lives in food_data.py
+
+# Prefix trie + spelling-correction index over the food names, for
+# /autocomplete_food and the fuzzy fallback of /predict_nutrition
+food_index = FoodIndex(food_nutrition_db)
+
+# Dense per-100g nutrient matrix (one row per food) used by /meal_nutrition
+nutrient_matrix = NutrientMatrix(food_nutrition_db)
+# ====================== LOAD MODELS ======================
+models = {
+    'allergen': None,
+    'nutrition': True,  # Mock flag (we are using lookup)
+    'recipe': None
+}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ALLERGEN_PATH = os.path.join(BASE_DIR, 'allergen_model')
+RECIPE_PATH = os.path.join(BASE_DIR, 'recipe_model')
+# Processes searching a sharded recipe corpus (recipe_model.shards/), per app
+# process; 0 searches the shards in the request thread instead. Every gunicorn
+# worker starts its own pool, so by default the CPUs are split between the
+# WEB_CONCURRENCY workers rather than each of them taking all of them.
+WEB_CONCURRENCY = max(1, int(os.environ.get("WEB_CONCURRENCY", 1)))
+RECIPE_SHARD_WORKERS = int(os.environ.get("RECIPE_SHARD_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+
+# Each model is read from <name>.cols (see export_models.py) when present,
+# which is memory-mapped and shared between workers, else from <name>.pkl.
+def load_allergen_model():
+    model = load_model(ALLERGEN_PATH, AllergenModel)
+    if model is not None:
+        model.use_index = SEARCH_MODE != "scan"
+    return model
+
+def load_recipe_model():
+    if os.path.isdir(RECIPE_PATH + '.shards'):
+        model = ShardedRecipeModel(RECIPE_PATH + '.shards', workers=RECIPE_SHARD_WORKERS)
+    else:
+        model = load_model(RECIPE_PATH, RecipeSearchModel)
+    if model is not None:
+        model.use_index = SEARCH_MODE != "scan"
+    return model
+
+def model_files(base_path):
+    """The files a model can be loaded from, in the order the loaders above try them."""
+    return [os.path.join(base_path + '.shards', 'shards.json'), os.path.join(base_path + '.cols', 'meta.json'),
+            base_path + '.pkl']
+
+try:
+    print("\u26a0\ufe0f Loading models...")
+
+    # Load Allergen Model
+    models['allergen'] = load_allergen_model()
+    if models['allergen'] is not None:
+        print("\u2705 Allergen model loaded successfully")
+    else:
+        print("\u274c Allergen model file not found")
+
+    # Load Recipe Model
+    models['recipe'] = load_recipe_model()
+    if models['recipe'] is not None:
+        print("\u2705 Recipe model loaded successfully")
+    else:
+        print("\u26a0\ufe0f Recipe model file not found - using dummy data")
+        dummy_data = {
+            'title': ['Dummy Recipe'],
+            'ingredients': ['Test ingredient'],
+            'directions': ['Test instructions'],
+            'link': ['#'],
+            'ner': ['test']
+        }
+        models['recipe'] = RecipeSearchModel(pd.DataFrame(dummy_data), use_index=SEARCH_MODE != "scan")
+
+except Exception as e:
+    print(f"\u274c Error loading models: {e}")
+
+# Hot reload: POST /admin/reload, or MODEL_WATCH_INTERVAL=<seconds> to poll the model files.
+# New models are built in the background and swapped into `models` under a new version.
+reloader = ModelReloader(models, {
+    'allergen': (load_allergen_model, model_files(ALLERGEN_PATH)),
+    'recipe': (load_recipe_model, model_files(RECIPE_PATH)),
+})
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+if MODEL_WATCH_INTERVAL > 0:
+    reloader.watch(MODEL_WATCH_INTERVAL)
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Recipe -> allergy class bitmasks for exclude_allergens, joined from both
+# models at startup and again on the reload thread whenever either changes.
+recipe_allergens = RecipeAllergenCache()
+
+def refresh_recipe_allergens(name, model):
+    if name in ('recipe', 'allergen'):
+        recipe_allergens.get(models.get('recipe'), models.get('allergen'))
+
+reloader.listeners.append(refresh_recipe_allergens)
+try:
+    refresh_recipe_allergens('recipe', models.get('recipe'))
+except Exception as e:
+    print(f"\u274c Error joining recipes with allergens: {e}")
+
+# ====================== RESULT CACHE ======================
+
+# Ready-to-send response bodies keyed on the normalized query. Entries are
+# dropped automatically when the model object in `models` is replaced.
+result_cache = ResultCache(
+    max_size=int(os.environ.get("RESULT_CACHE_SIZE", 2048)),
+    ttl=float(os.environ.get("RESULT_CACHE_TTL", 300))
+)
+
+def encode_json(payload):
+    # Same encoding jsonify uses (compact, sorted keys), kept as bytes so cache hits skip serialization
+    return (app.json.dumps(payload, separators=(",", ":")) + "\n").encode("utf-8")
+
+# Concurrent cache misses for the same query wait for the first one's body
+# instead of each running the search. SINGLE_FLIGHT_TIMEOUT (seconds) bounds
+# the wait; 0 turns coalescing off.
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get("SINGLE_FLIGHT_TIMEOUT", 10))
+in_flight = SingleFlight(timeout=SINGLE_FLIGHT_TIMEOUT)
+
+def coalesced(namespace, model, key, compute):
+    """(compute()'s body, whether another request computed it) for one query on one model."""
+    if SINGLE_FLIGHT_TIMEOUT <= 0:
+        return compute(), False
+    return in_flight.do((namespace, id(model), key), compute)
+
+def cached_response(body, cache_status):
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    response.headers["X-Cache"] = cache_status
+    return response
+
+# ====================== FAST JSON ======================
+
+# Single-query responses are joined from each model's pre-encoded rows
+# (see json_rows.py) instead of going through to_dict() and jsonify.
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_CHUNK_ROWS = 64
+
+def wants_stream(data):
+    """True when the client asked for NDJSON ("stream": true or an Accept header)."""
+    return data.get("stream") is True or NDJSON_MIMETYPE in request.headers.get("Accept", "")
+
+def rows_body(model, rows, key, extras=None, **fields):
+    """The JSON body {count, model_version, <key>: [rows], **fields}, keys sorted like jsonify's."""
+    parts = {"count": len(rows), "model_version": model.version, **fields}
+    parts = {name: encode_value(value) for name, value in parts.items()}
+    parts[key] = model.rows.join(rows, extras)
+    return b"{" + b",".join(b'"%s":%s' % (name.encode(), parts[name]) for name in sorted(parts)) + b"}\n"
+
+def row_chunks(model, rows, extras=None):
+    """The rows as NDJSON, STREAM_CHUNK_ROWS rows per chunk."""
+    for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+        end = start + STREAM_CHUNK_ROWS
+        yield b"".join(model.rows.lines(rows[start:end], extras[start:end] if extras else None))
+
+def stream_rows(model, rows, extras=None):
+    """Stream the rows as NDJSON, a chunk of rows at a time, with the count and version in headers."""
+    response = app.response_class(row_chunks(model, rows, extras), mimetype=NDJSON_MIMETYPE)
+    response.headers["X-Result-Count"] = str(len(rows))
+    response.headers["X-Model-Version"] = str(model.version)
+    return response
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    body, content_type = render_metrics()
+    return app.response_class(body, content_type=content_type)
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    return jsonify(dict(result_cache.stats(), single_flight=in_flight.stats()))
+
+# ====================== API ENDPOINTS ======================
+
+def allergen_payload(result, version):
+    if isinstance(result, Exception):
+        return {"error": str(result)}
+    if isinstance(result, str):
+        return {"result": result, "model_version": version}
+    return {
+        "result": result.to_dict(orient="records"),
+        "count": len(result),
+        "model_version": version
+    }
+
+def recipe_payload(results, top_n, version):
+    if isinstance(results, str):
+        return {"message": results, "model_version": version}
+    return {
+        "recipes": results.to_dict(orient="records"),
+        "count": len(results),
+        "top_n": top_n,
+        "model_version": version
+    }
+
+def lookup_food(query):
+    """(food name, nutrition) for query, correcting typos like "chiken breast"; (None, None) if nothing is close."""
+    nutrition = food_nutrition_db.get(query)
+    if nutrition:
+        return query, nutrition
+    food = food_index.correct(query)
+    if food is None:
+        return None, None
+    return food, food_nutrition_db[food]
+
+def lookup_foods(queries):
+    """{query: lookup_food(query)} for a batch: exact names in one pass, then each distinct miss corrected once."""
+    found = {}
+    for query in dict.fromkeys(queries):
+        nutrition = food_nutrition_db.get(query)
+        if nutrition:
+            found[query] = (query, nutrition)
+    for query in dict.fromkeys(queries):
+        if query not in found:
+            food = food_index.correct(query)
+            found[query] = (food, food_nutrition_db[food]) if food is not None else (None, None)
+    return found
+
+def nutrition_payload(query, food, nutrition):
+    if not nutrition:
+        return {"message": "❌ Food not found. Please try another."}
+    payload = {
+        "food": food,
+        "nutrition": nutrition
+    }
+    if food != query:
+        payload["query"] = query
+        payload["corrected"] = True
+    return payload
+
+def parse_top_n(data):
+    top_n = data.get("top_n", DEFAULT_TOP_N)
+    if not isinstance(top_n, int) or isinstance(top_n, bool) or not 1 <= top_n <= MAX_TOP_N:
+        return None
+    return top_n
+
+def parse_batch(data, field):
+    """Split a batch body into ({position: normalized query}, results), or an error message.
+
+    results has one slot per item, in request order; invalid items already
+    hold their error and the handler fills in the others.
+    """
+    if not data or field not in data:
+        return None, f"Missing '{field}' in request"
+    items = data[field]
+    if not isinstance(items, list) or not items:
+        return None, f"'{field}' must be a non-empty list"
+    if len(items) > MAX_BATCH_SIZE:
+        return None, f"At most {MAX_BATCH_SIZE} items per batch"
+
+    queries, results = {}, [None] * len(items)
+    for position, item in enumerate(items):
+        if not isinstance(item, str):
+            results[position] = {"error": "Query must be a string"}
+        elif not item.strip():
+            results[position] = {"error": "Empty query"}
+        else:
+            queries[position] = item.strip().lower()
+    return (queries, results), None
+
+def allergen_body(model, query):
+    """Search and encode one /predict_allergen response, and cache it."""
+    with stage("search"):
+        rows = model.find(query)
+    record_result_size(len(rows))
+    with stage("serialize"):
+        if len(rows):
+            body = rows_body(model, rows, "result")
+        else:
+            body = encode_json(allergen_payload(model.NO_RESULTS, model.version))
+    result_cache.put('allergen', model, query, body)
+    return body
+
+def recipe_body(model, query, top_n, allowed, excluded, key):
+    """Search and encode one /recommend_recipes response, and cache it under key."""
+    with stage("search"):
+        rows, scores = model.find(query, top_n=top_n, allowed=allowed)
+    record_result_size(len(rows))
+    with stage("serialize"):
+        extras = score_fields(scores) if scores is not None else None
+        fields = {"excluded_allergens": excluded} if allowed else {}
+        if len(rows):
+            body = rows_body(model, rows, "recipes", extras, top_n=top_n, **fields)
+        else:
+            body = encode_json(dict(recipe_payload(model.NO_RESULTS, top_n, model.version), **fields))
+    result_cache.put('recipe', model, key, body)
+    return body
+
+@app.route("/predict_allergen", methods=["POST"])
+@instrumented("predict_allergen")
+def predict_allergen():
+    model = models['allergen']
+    if not model:
+        return jsonify({"error": "Allergen model not available"}), 503
+
+    with stage("parse"):
+        data = request.get_json()
+        if not data or "text" not in data:
+            return jsonify({"error": "Missing 'text' in request"}), 400
+
+        query = data["text"].strip().lower()
+        if not query:
+            return jsonify({"error": "Empty query"}), 400
+        stream = wants_stream(data)
+
+    if not stream:
+        body = result_cache.get('allergen', model, query)
+        if body is not None:
+            return cached_response(body, "HIT")
+
+    try:
+        if stream:
+            with stage("search"):
+                rows = model.find(query)
+            record_result_size(len(rows))
+            return stream_rows(model, rows)
+        body, shared = coalesced('allergen', model, query, lambda: allergen_body(model, query))
+    except FlightTimeout as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        record_exception(e)
+        return jsonify({"error": str(e)}), 500
+    return cached_response(body, "SHARED" if shared else "MISS")
+
+@app.route("/predict_allergen/batch", methods=["POST"])
+@instrumented("predict_allergen_batch")
+def predict_allergen_batch():
+    model = models['allergen']
+    if not model:
+        return jsonify({"error": "Allergen model not available"}), 503
+
+    batch, error = parse_batch(request.get_json(silent=True), "texts")
+    if error:
+        return jsonify({"error": error}), 400
+    queries, results = batch
+
+    try:
+        found = model.search_many(queries.values())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    for position, query in queries.items():
+        results[position] = allergen_payload(found[query], model.version)
+    return jsonify({"results": results, "count": len(results), "model_version": model.version})
+
+@app.route("/predict_nutrition", methods=["POST"])
+@instrumented("predict_nutrition")
+def predict_nutrition():
+    if not models['nutrition']:
+        return jsonify({"error": "Nutrition model not available"}), 503
+
+    with stage("parse"):
+        data = request.get_json()
+        if not data or "text" not in data:
+            return jsonify({"error": "Missing 'text' in request"}), 400
+
+        query = data["text"].strip().lower()
+        if not query:
+            return jsonify({"error": "Empty query"}), 400
+
+    with stage("search"):
+        food, nutrition = lookup_food(query)
+    record_result_size(1 if nutrition else 0)
+    with stage("serialize"):
+        response = jsonify(nutrition_payload(query, food, nutrition))
+    if not nutrition:
+        return response, 404
+    return response
+
+@app.route("/predict_nutrition/batch", methods=["POST"])
+@instrumented("predict_nutrition_batch")
+def predict_nutrition_batch():
+    if not models['nutrition']:
+        return jsonify({"error": "Nutrition model not available"}), 503
+
+    batch, error = parse_batch(request.get_json(silent=True), "texts")
+    if error:
+        return jsonify({"error": error}), 400
+    queries, results = batch
+
+    found = lookup_foods(queries.values())
+    for position, query in queries.items():
+        results[position] = nutrition_payload(query, *found[query])
+    return jsonify({"results": results, "count": len(results)})
+
+def parse_meal(meal):
+    """[(item label, food text, grams or None, quantity, unit)] for a list of {food, grams} items or free text."""
+    if isinstance(meal, str):
+        return [(food, food, None, quantity, unit) for food, quantity, unit in parse_meal_text(meal)]
+    if not isinstance(meal, list):
+        raise ValueError("A meal must be a list of items or a text description")
+
+    items = []
+    for item in meal:
+        if isinstance(item, str):
+            food, quantity, unit = parse_quantity(item)
+            items.append((item, food, None, quantity, unit))
+        elif isinstance(item, dict) and isinstance(item.get("food"), str):
+            grams = item.get("grams")
+            if grams is not None and (isinstance(grams, bool) or not isinstance(grams, (int, float)) or grams < 0):
+                raise ValueError(f"Invalid 'grams' for {item['food']!r}")
+            items.append((item["food"], item["food"].strip().lower(), grams, None, None))
+        else:
+            raise ValueError("Each item needs a 'food' name")
+    return items
+
+def meal_nutrition_payload(meals):
+    """Nutrition for several parsed meals, computed in one gather + matrix product."""
+    rows, grams, meal_ids, resolved = [], [], [], []
+    unmatched = [[] for _ in meals]
+    for meal_id, items in enumerate(meals):
+        for label, text, item_grams, quantity, unit in items:
+            food, _ = lookup_food(text)
+            if food is None:
+                unmatched[meal_id].append(label)
+                continue
+            if item_grams is None:
+                item_grams = portion_grams(food, quantity, unit)
+            rows.append(nutrient_matrix.rows[food])
+            grams.append(item_grams)
+            meal_ids.append(meal_id)
+            resolved.append((label, food))
+
+    per_item, totals = nutrient_matrix.meal_totals(rows, grams, meal_ids, len(meals))
+    results = [{"items": [], "total": nutrient_dict(total), "unmatched": unmatched[i]} for i, total in enumerate(totals)]
+    for (label, food), item_grams, meal_id, values in zip(resolved, grams, meal_ids, per_item):
+        results[meal_id]["items"].append({
+            "item": label,
+            "food": food,
+            "grams": round(float(item_grams), 2),
+            "nutrition": nutrient_dict(values)
+        })
+    return results, totals.sum(axis=0)
+
+@app.route("/meal_nutrition", methods=["POST"])
+@instrumented("meal_nutrition")
+def meal_nutrition():
+    if not models['nutrition']:
+        return jsonify({"error": "Nutrition model not available"}), 503
+
+    data = request.get_json(silent=True)
+    if not data or not any(key in data for key in ("items", "text", "meals")):
+        return jsonify({"error": "Missing 'items', 'text' or 'meals' in request"}), 400
+
+    if "meals" in data:
+        meals = data["meals"]
+        if not isinstance(meals, list) or not meals:
+            return jsonify({"error": "'meals' must be a non-empty list"}), 400
+        if len(meals) > MAX_MEALS:
+            return jsonify({"error": f"At most {MAX_MEALS} meals per request"}), 400
+    else:
+        meals = [data["items"] if "items" in data else data["text"]]
+
+    try:
+        parsed = [parse_meal(meal) for meal in meals]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if any(len(items) > MAX_MEAL_ITEMS for items in parsed):
+        return jsonify({"error": f"At most {MAX_MEAL_ITEMS} items per meal"}), 400
+
+    results, total = meal_nutrition_payload(parsed)
+    if "meals" in data:
+        return jsonify({"meals": results, "total": nutrient_dict(total), "count": len(results)})
+    return jsonify(results[0])
+
+def parse_int(data, field, default, low, high):
+    value = data.get(field, default)
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        return None
+    return value
+
+def food_rows_payload(rows):
+    return [{"food": nutrient_matrix.names[row], "nutrition": nutrient_dict(nutrient_matrix.matrix[row])} for row in rows]
+
+@app.route("/foods/query", methods=["POST"])
+@instrumented("foods_query")
+def foods_query():
+    """Foods matching nutrient conditions, e.g. {"where": "protein > 20 and fat < 5", "sort_by": "calories"}."""
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    where = data.get("where", "")
+    if not isinstance(where, str):
+        return jsonify({"error": "'where' must be a string like \"protein > 20 and fat < 5\""}), 400
+    try:
+        predicates = parse_predicates(where)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    sort_by = data.get("sort_by")
+    if sort_by is not None and sort_by not in NUTRIENTS:
+        return jsonify({"error": f"'sort_by' must be one of {', '.join(NUTRIENTS)}"}), 400
+    descending = data.get("descending", False)
+    if not isinstance(descending, bool):
+        return jsonify({"error": "'descending' must be true or false"}), 400
+    limit = parse_int(data, "limit", DEFAULT_FOOD_LIMIT, 1, MAX_FOOD_RESULTS)
+    if limit is None:
+        return jsonify({"error": f"'limit' must be an integer between 1 and {MAX_FOOD_RESULTS}"}), 400
+
+    with stage("search"):
+        rows, total = nutrient_matrix.query(predicates, sort_by, descending, limit)
+    record_result_size(len(rows))
+    return jsonify({
+        "foods": food_rows_payload(rows),
+        "count": len(rows),
+        "total": total,
+        "where": [f"{nutrient} {op} {value:g}" for nutrient, op, value in predicates],
+        "sort_by": sort_by,
+        "descending": descending
+    })
+
+@app.route("/foods/similar", methods=["POST"])
+@instrumented("foods_similar")
+def foods_similar():
+    """The k foods with the nutrient profile (per 100g) closest to the given one, for substitutions."""
+    data = request.get_json(silent=True)
+    if not data or "food" not in data:
+        return jsonify({"error": "Missing 'food' in request"}), 400
+    if not isinstance(data["food"], str) or not data["food"].strip():
+        return jsonify({"error": "Empty query"}), 400
+    k = parse_int(data, "k", 5, 1, MAX_SIMILAR)
+    if k is None:
+        return jsonify({"error": f"'k' must be an integer between 1 and {MAX_SIMILAR}"}), 400
+
+    query = data["food"].strip().lower()
+    food, _ = lookup_food(query)
+    if food is None:
+        return jsonify({"message": "❌ Food not found. Please try another."}), 404
+
+    with stage("search"):
+        rows, distances = nutrient_matrix.similar(nutrient_matrix.rows[food], k)
+    record_result_size(len(rows))
+    similar = food_rows_payload(rows)
+    for item, distance in zip(similar, distances):
+        item["distance"] = round(float(distance), 4)
+    payload = {
+        "food": food,
+        "nutrition": nutrient_dict(nutrient_matrix.matrix[nutrient_matrix.rows[food]]),
+        "similar": similar,
+        "count": len(similar)
+    }
+    if food != query:
+        payload["query"] = query
+        payload["corrected"] = True
+    return jsonify(payload)
+
+@app.route("/autocomplete_food", methods=["POST"])
+@instrumented("autocomplete_food")
+def autocomplete_food():
+    data = request.get_json()
+    if not data or "text" not in data:
+        return jsonify({"error": "Missing 'text' in request"}), 400
+
+    query = data["text"].strip().lower()
+    if not query:
+        return jsonify({"error": "Empty query"}), 400
+
+    limit = data.get("limit", 10)
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_AUTOCOMPLETE:
+        return jsonify({"error": f"'limit' must be an integer between 1 and {MAX_AUTOCOMPLETE}"}), 400
+
+    suggestions = food_index.autocomplete(query, limit)
+    return jsonify({
+        "query": query,
+        "suggestions": suggestions,
+        "count": len(suggestions)
+    })
+
+@app.route("/recommend_recipes", methods=["POST"])
+@instrumented("recommend_recipes")
+def recommend_recipes():
+    model = models['recipe']
+    if not model:
+        return jsonify({"error": "Recipe model not available"}), 503
+
+    with stage("parse"):
+        data = request.get_json()
+        if not data or "query" not in data:
+            return jsonify({"error": "Missing 'query' in request"}), 400
+
+        query = data["query"].strip().lower()
+        if not query:
+            return jsonify({"error": "Empty query"}), 400
+
+        top_n = parse_top_n(data)
+        if top_n is None:
+            return jsonify({"error": f"'top_n' must be an integer between 1 and {MAX_TOP_N}"}), 400
+        stream = wants_stream(data)
+
+        exclusion, error, status = parse_exclusions(data, model)
+        if error:
+            return jsonify({"error": error}), status
+        allowed, excluded, exclusion_key = exclusion
+        key = (query, top_n) + exclusion_key
+
+    if not stream:
+        body = result_cache.get('recipe', model, key)
+        if body is not None:
+            return cached_response(body, "HIT")
+
+    try:
+        if stream:
+            with stage("search"):
+                rows, scores = model.find(query, top_n=top_n, allowed=allowed)
+            record_result_size(len(rows))
+            return stream_rows(model, rows, score_fields(scores) if scores is not None else None)
+        body, shared = coalesced('recipe', model, key,
+                                 lambda: recipe_body(model, query, top_n, allowed, excluded, key))
+    except FlightTimeout as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        record_exception(e)
+        return jsonify({"error": str(e)}), 500
+    return cached_response(body, "SHARED" if shared else "MISS")
+
+def parse_exclusions(data, model):
+    """Resolve an optional exclude_allergens list: ((row filter, allergy classes, cache key), error, status).
+
+    The filter is None when nothing is excluded. Names matching no known
+    allergy class are rejected rather than ignored, so a typo can't
+    silently return unsafe recipes.
+    """
+    names = data.get("exclude_allergens")
+    if names is None or names == []:
+        return (None, [], ()), None, None
+    if not isinstance(names, list) or not all(isinstance(name, str) and name.strip() for name in names):
+        return None, "'exclude_allergens' must be a list of allergen names", 400
+
+    allergen_model = models.get('allergen')
+    join = recipe_allergens.get(model, allergen_model)
+    if join is None:
+        return None, "Allergen model not available", 503
+    mask, classes, unknown = join.resolve(names)
+    if unknown:
+        return None, f"Unknown allergens: {', '.join(unknown)}", 400
+    return (AllergenFilter(join, mask), classes, (tuple(classes), allergen_model.version)), None, None
+
+def coverage_fields(matched, missing):
+    """Per-row `coverage`, `matched` and `missing` fields merged into a pre-encoded recipe row."""
+    fields = []
+    for count, names in zip(matched.tolist(), missing):
+        coverage = round(count / (count + len(names)), 4)
+        fields.append([(b"coverage", encode_value(coverage)), (b"matched", b"%d" % count),
+                       (b"missing", encode_value(names))])
+    return fields
+
+@app.route("/recommend_recipes/by_ingredients", methods=["POST"])
+@instrumented("recommend_recipes_by_ingredients")
+def recommend_recipes_by_ingredients():
+    """Rank recipes by how few ingredients they need beyond the ones given ("cook with what I have")."""
+    model = models['recipe']
+    if not model:
+        return jsonify({"error": "Recipe model not available"}), 503
+
+    with stage("parse"):
+        data = request.get_json(silent=True)
+        if not data or "ingredients" not in data:
+            return jsonify({"error": "Missing 'ingredients' in request"}), 400
+
+        pantry = data["ingredients"]
+        if not isinstance(pantry, list) or not pantry or not all(isinstance(item, str) for item in pantry):
+            return jsonify({"error": "'ingredients' must be a non-empty list of strings"}), 400
+        if len(pantry) > MAX_PANTRY_ITEMS:
+            return jsonify({"error": f"At most {MAX_PANTRY_ITEMS} ingredients per request"}), 400
+
+        top_n = parse_top_n(data)
+        if top_n is None:
+            return jsonify({"error": f"'top_n' must be an integer between 1 and {MAX_TOP_N}"}), 400
+
+        max_missing = data.get("max_missing")
+        if max_missing is not None and (not isinstance(max_missing, int) or isinstance(max_missing, bool) or max_missing < 0):
+            return jsonify({"error": "'max_missing' must be a non-negative integer"}), 400
+
+        exclusion, error, status = parse_exclusions(data, model)
+        if error:
+            return jsonify({"error": error}), status
+        allowed, excluded, exclusion_key = exclusion
+
+        key = (tuple(sorted({normalize_ingredient(item) for item in pantry})), top_n, max_missing) + exclusion_key
+
+    body = result_cache.get('recipe_pantry', model, key)
+    if body is not None:
+        return cached_response(body, "HIT")
+
+    with stage("search"):
+        rows, matched, missing, known, unknown = model.cook_with(pantry, top_n, max_missing, allowed)
+    record_result_size(len(rows))
+    with stage("serialize"):
+        fields = {"excluded_allergens": excluded} if allowed else {}
+        if len(rows):
+            body = rows_body(model, rows, "recipes", coverage_fields(matched, missing),
+                             ingredients=known, unknown=unknown, top_n=top_n, **fields)
+        else:
+            body = encode_json({"message": model.NO_PANTRY_RESULTS, "ingredients": known,
+                                "unknown": unknown, "model_version": model.version, **fields})
+    result_cache.put('recipe_pantry', model, key, body)
+    return cached_response(body, "MISS")
+
+@app.route("/recommend_recipes/batch", methods=["POST"])
+@instrumented("recommend_recipes_batch")
+def recommend_recipes_batch():
+    model = models['recipe']
+    if not model:
+        return jsonify({"error": "Recipe model not available"}), 503
+
+    data = request.get_json(silent=True)
+    batch, error = parse_batch(data, "queries")
+    if error:
+        return jsonify({"error": error}), 400
+    queries, results = batch
+
+    top_n = parse_top_n(data)
+    if top_n is None:
+        return jsonify({"error": f"'top_n' must be an integer between 1 and {MAX_TOP_N}"}), 400
+
+    exclusion, error, status = parse_exclusions(data, model)
+    if error:
+        return jsonify({"error": error}), status
+    allowed, excluded, _ = exclusion
+
+    try:
+        found = model.search_many(queries.values(), top_n=top_n, allowed=allowed)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    for position, query in queries.items():
+        results[position] = recipe_payload(found[query], top_n, model.version)
+    payload = {"results": results, "count": len(results), "model_version": model.version}
+    if allowed:
+        payload["excluded_allergens"] = excluded
+    return jsonify(payload)
+
+# ====================== ADMIN ======================
+
+def admin_authorized():
+    # Admin routes stay disabled unless ADMIN_TOKEN is configured
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    name = data.get("model", "all")
+    if not isinstance(name, str):
+        return jsonify({"error": "'model' must be a model name or \"all\""}), 400
+    names = list(reloader.loaders) if name == "all" else [name]
+    if any(n not in reloader.loaders for n in names):
+        return jsonify({"error": f"Unknown model {name!r}"}), 400
+
+    started = {n: reloader.reload(n, wait=bool(data.get("wait"))) for n in names}
+    return jsonify({"started": started, "models": reloader.info()}), 202
+
+@app.route("/admin/models", methods=["GET"])
+def admin_models():
+    if not admin_authorized():
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(reloader.info())
+
+if __name__ == "__main__":
+    app.run(debug=True, host='0.0.0.0', port=5000)
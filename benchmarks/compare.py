@@ -0,0 +1,64 @@
+"""Compare two result files from replay.py or micro.py and flag latency regressions.
+
+    python -m benchmarks.compare bench_results/before.json bench_results/after.json --threshold 0.10
+
+Exits with status 1 when any shared entry's metric got worse by more than
+the threshold, so it can gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.common import print_table
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, metric="p95_ms", threshold=0.10, min_ms=0.05):
+    """[(row dict)] for every entry present in both result sets; row["regressed"] marks regressions."""
+    rows = []
+    for key in sorted(set(baseline["results"]) & set(candidate["results"])):
+        before = baseline["results"][key].get(metric)
+        after = candidate["results"][key].get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        # Sub-`min_ms` differences are timer noise, whatever the ratio
+        regressed = change > threshold and after - before > min_ms
+        rows.append({"entry": key, "before": before, "after": after,
+                     "change": f"{change:+.1%}", "regressed": "❌" if regressed else ""})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p95_ms", help="result field to compare (default p95_ms)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="ignore absolute changes below this")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get("kind") != candidate.get("kind"):
+        parser.error(f"can't compare a {baseline.get('kind')} run with a {candidate.get('kind')} run")
+    print(f"🔎 {baseline.get('commit')} -> {candidate.get('commit')} ({args.metric})")
+    rows = compare(baseline, candidate, args.metric, args.threshold, args.min_ms)
+    if not rows:
+        print("⚠️ No entries in common")
+        return 0
+    print_table(rows, ["entry", "before", "after", "change", "regressed"])
+
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Microbenchmarks of the search and lookup paths on synthetic tables of growing size.
+
+    python -m benchmarks.micro                          # 1k, 10k and 100k rows
+    python -m benchmarks.micro --sizes 1000 200000 --repeat 200 --output bench_results/micro.json
+    python -m benchmarks.micro --only nutrition_lookup --sizes 50000 --check
+
+Each benchmark runs the indexed path and the original full-table scan on
+the same data, so the numbers show both the absolute cost and how each
+path grows with the table. With --check the run fails if a path misses
+its p95 latency budget (LATENCY_BUDGETS_MS) at any size.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from benchmarks.common import print_table, save_results, summarize  # noqa: E402
+from benchmarks.tables import allergen_table, food_names, make_words, misspell, recipe_table  # noqa: E402
+from food_index import FoodIndex  # noqa: E402
+from model import AllergenModel, RecipeSearchModel  # noqa: E402
+
+def time_calls(fn, queries, repeat):
+    latencies = []
+    for i in range(repeat):
+        query = queries[i % len(queries)]
+        started = time.perf_counter()
+        fn(query)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def bench_allergen(rng, n_rows, words, repeat, scan_repeat):
+    started = time.perf_counter()
+    model = AllergenModel(allergen_table(rng, n_rows, words))
+    build = time.perf_counter() - started
+    queries = [rng.choice(words)[:rng.randint(3, 6)] for _ in range(50)]
+    return {
+        "index": dict(time_calls(lambda q: model.search(q, use_index=True), queries, repeat), build_s=round(build, 3)),
+        "scan": time_calls(lambda q: model.search(q, use_index=False), queries, scan_repeat),
+    }
+
+
+def bench_recipes(rng, n_rows, words, repeat, scan_repeat):
+    started = time.perf_counter()
+    model = RecipeSearchModel(recipe_table(rng, n_rows, words))
+    build = time.perf_counter() - started
+    queries = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(50)]
+    return {
+        "bm25": dict(time_calls(lambda q: model.search(q, 5, use_index=True), queries, repeat), build_s=round(build, 3)),
+        "scan": time_calls(lambda q: model.search(q, 5, use_index=False), queries, scan_repeat),
+    }
+
+
+def bench_nutrition(rng, n_names, words, repeat):
+    names = food_names(rng, n_names, words)
+    db = {name: {"calories": 1} for name in names}
+    started = time.perf_counter()
+    index = FoodIndex(db)
+    build = time.perf_counter() - started
+    exact = rng.sample(names, min(50, len(names)))
+    typos = [misspell(rng, name) for name in exact]
+    prefixes = [name[:rng.randint(2, 5)] for name in exact]
+    return {
+        "exact": dict(time_calls(db.get, exact, repeat), build_s=round(build, 3)),
+        "correct": time_calls(index.correct, typos, repeat),
+        "autocomplete": time_calls(lambda p: index.autocomplete(p, 10), prefixes, repeat),
+    }
+
+
+# p95 budgets per benchmark/variant, checked with --check
+LATENCY_BUDGETS_MS = {
+    "nutrition_lookup/correct": 5.0,
+}
+
+BENCHMARKS = {
+    "allergen_search": bench_allergen,
+    "recipe_search": bench_recipes,
+    "nutrition_lookup": bench_nutrition,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="table sizes (rows)")
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls per indexed benchmark")
+    parser.add_argument("--scan-repeat", type=int, default=20, help="timed calls per full-scan benchmark")
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append", help="run just these benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a p95 exceeds LATENCY_BUDGETS_MS")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    words = make_words(rng, 2000)
+    results, rows = {}, []
+    for name in args.only or BENCHMARKS:
+        for size in args.sizes:
+            print(f"⏱️ {name} @ {size} rows")
+            if name == "nutrition_lookup":
+                variants = BENCHMARKS[name](rng, size, words, args.repeat)
+            else:
+                variants = BENCHMARKS[name](rng, size, words, args.repeat, args.scan_repeat)
+            for variant, summary in variants.items():
+                key = f"{name}/{variant}/{size}"
+                results[key] = summary
+                rows.append(dict(benchmark=key, **summary))
+
+    print_table(rows, ["benchmark", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "build_s"])
+    if args.output:
+        save_results(args.output, "micro", {k: v for k, v in vars(args).items() if k != "output"}, results)
+    if args.check:
+        missed = False
+        for key, summary in results.items():
+            budget = LATENCY_BUDGETS_MS.get(key.rsplit("/", 1)[0])
+            if budget is not None and summary["p95_ms"] > budget:
+                print(f"❌ {key}: p95 {summary['p95_ms']} ms over the {budget} ms budget")
+                missed = True
+        if missed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Replay request logs or synthetic skewed traffic against the API.
+
+    # in-process, through Flask's test client
+    python -m benchmarks.replay --synthetic 5000
+    python -m benchmarks.replay --log traffic.jsonl --output bench_results/replay.json
+
+    # against a running server (e.g. gunicorn -w 4 -c gunicorn.conf.py backend:app)
+    python -m benchmarks.replay --url http://127.0.0.1:8000 --concurrency 16 --synthetic 20000
+
+Reports throughput and p50/p95/p99 latency per endpoint.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks.common import print_table, save_results, summarize
+from benchmarks.workloads import default_vocabularies, load_log, synthetic
+
+
+def import_backend():
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if repo not in sys.path:
+        sys.path.insert(0, repo)
+    import backend
+    return backend
+
+
+def replay_test_client(app, requests, warmup=0):
+    """Send the requests one after another through app.test_client(); {path: [(seconds, status)]}."""
+    client = app.test_client()
+    for method, path, body in requests[:warmup]:
+        client.open(path, method=method, json=body)
+
+    samples = defaultdict(list)
+    started = time.perf_counter()
+    for method, path, body in requests[warmup:]:
+        t0 = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        samples[path].append((time.perf_counter() - t0, response.status_code))
+    return samples, time.perf_counter() - started
+
+
+def replay_http(url, requests, concurrency, timeout=30.0):
+    """Send the requests over keep-alive HTTP connections from `concurrency` threads."""
+    target = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    cursor = iter(enumerate(requests))
+
+    def worker():
+        connection = connection_class(target.hostname, target.port, timeout=timeout)
+        local = defaultdict(list)
+        while True:
+            with lock:
+                item = next(cursor, None)
+            if item is None:
+                break
+            _, (method, path, body) = item
+            payload = json.dumps(body).encode() if body is not None else None
+            headers = {"Content-Type": "application/json"} if payload is not None else {}
+            t0 = time.perf_counter()
+            try:
+                connection.request(method, target.path.rstrip("/") + path, body=payload, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = connection_class(target.hostname, target.port, timeout=timeout)
+                status = 0
+            local[path].append((time.perf_counter() - t0, status))
+        connection.close()
+        with lock:
+            for path, values in local.items():
+                samples[path].extend(values)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def report(samples, elapsed):
+    results = {}
+    for path, values in sorted(samples.items()):
+        latencies = [seconds for seconds, _ in values]
+        summary = summarize(latencies, elapsed)
+        statuses = defaultdict(int)
+        for _, status in values:
+            statuses[str(status)] += 1
+        summary["statuses"] = dict(statuses)
+        results[path] = summary
+    every = [seconds for values in samples.values() for seconds, _ in values]
+    results["_all"] = summarize(every, elapsed)
+    rows = [dict(endpoint=path, **{k: v for k, v in summary.items() if k != "statuses"})
+            for path, summary in results.items()]
+    print_table(rows, ["endpoint", "count", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", action="append", default=[], help="JSONL request log to replay (repeatable)")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic Zipf-skewed requests")
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew of the synthetic query popularity")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="base URL of a running server; default is the in-process test client")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads when using --url")
+    parser.add_argument("--warmup", type=int, default=100, help="requests sent before measuring (test client)")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not args.log and not args.synthetic:
+        args.synthetic = 2000
+
+    backend = None if args.url else import_backend()
+    requests = []
+    for path in args.log:
+        requests.extend(load_log(path))
+    if args.synthetic:
+        requests.extend(synthetic(default_vocabularies(backend), args.synthetic, args.zipf, args.seed))
+    if not requests:
+        parser.error("nothing to replay")
+
+    if args.url:
+        samples, elapsed = replay_http(args.url, requests, args.concurrency)
+    else:
+        samples, elapsed = replay_test_client(backend.app, requests, min(args.warmup, len(requests) // 10))
+    print(f"⏱️ {sum(len(v) for v in samples.values())} requests in {elapsed:.2f}s")
+    results = report(samples, elapsed)
+
+    if args.output:
+        config = {k: v for k, v in vars(args).items() if k != "output"}
+        save_results(args.output, "replay", config, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
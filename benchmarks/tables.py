@@ -0,0 +1,49 @@
+"""Synthetic allergen, recipe and food-name tables for micro.py and the tests."""
+import pandas as pd
+
+SYLLABLES = ["ba", "ra", "mo", "ni", "ta", "ko", "li", "se", "pu", "ve", "na", "chi", "do", "gri", "sto",
+             "an", "el", "or", "um", "ka", "zu", "fe", "lo", "mi"]
+GROUPS = ["Fruits", "Vegetables", "Grains", "Dairy", "Seafood", "Meat", "Nuts", "Legumes"]
+ALLERGIES = ["Peanut allergy", "Lactose intolerance", "Shellfish allergy", "Gluten allergy", None]
+# Leading words shared by many food names, as in real nutrition tables
+QUALIFIERS = ["cooked", "roasted", "organic", "raw", "fresh", "frozen", "canned", "dried"]
+
+
+def make_words(rng, n):
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def allergen_table(rng, n_rows, words):
+    return pd.DataFrame({
+        "class": [rng.choice(GROUPS) for _ in range(n_rows)],
+        "type": [rng.choice(words).title() for _ in range(n_rows)],
+        "group": [rng.choice(GROUPS) for _ in range(n_rows)],
+        "food": [" ".join(rng.sample(words, 2)).title() for _ in range(n_rows)],
+        "allergy": [rng.choice(ALLERGIES) for _ in range(n_rows)],
+    }, dtype=object)
+
+
+def recipe_table(rng, n_rows, words):
+    ingredients = [rng.sample(words, rng.randint(3, 8)) for _ in range(n_rows)]
+    return pd.DataFrame({
+        "title": [" ".join(rng.sample(words, 3)).title() for _ in range(n_rows)],
+        "ingredients": [str([f"1 cup {w}" for w in items]) for items in ingredients],
+        "directions": ["[\"Mix everything.\"]"] * n_rows,
+        "link": [f"example.com/recipe/{i}" for i in range(n_rows)],
+        "ner": [str(items) for items in ingredients],
+    }, dtype=object)
+
+
+def misspell(rng, name):
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:] if rng.random() < 0.5 else name[:i] + rng.choice("aeiourst") + name[i:]
+
+
+def food_names(rng, n_names, words):
+    """Distinct food names of one or two words, most of them behind a common qualifier."""
+    names = (" ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(n_names))
+    return list(dict.fromkeys(f"{rng.choice(QUALIFIERS)} {name}" if rng.random() < 0.7 else name
+                              for name in names))
@@ -0,0 +1,77 @@
+"""Request streams for replay.py: recorded JSONL logs and synthetic skewed traffic."""
+import json
+import random
+
+ENDPOINT_FIELDS = {
+    "/predict_allergen": "text",
+    "/predict_nutrition": "text",
+    "/recommend_recipes": "query",
+}
+
+# Common recipe search words, used when no recipe corpus is available
+RECIPE_WORDS = [
+    "chicken", "soup", "salad", "beef", "pasta", "cake", "bread", "rice", "garlic", "lemon",
+    "chocolate", "cookies", "pie", "potato", "cheese", "egg", "tomato", "curry", "pork", "fish",
+]
+
+
+def load_log(path):
+    """[(method, path, json body)] from a JSONL request log.
+
+    Each line is {"method": "POST", "path": "/predict_allergen", "json": {...}};
+    "endpoint" and "body" are accepted as aliases. Lines that don't describe
+    an HTTP request are skipped and counted.
+    """
+    requests, skipped = [], 0
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            route = record.get("path") or record.get("endpoint")
+            if not isinstance(route, str) or not route.startswith("/"):
+                skipped += 1
+                continue
+            body = record.get("json", record.get("body"))
+            requests.append((record.get("method", "POST" if body is not None else "GET").upper(), route, body))
+    if skipped:
+        print(f"⚠️ Skipped {skipped} lines of {path} that are not request records")
+    return requests
+
+
+def synthetic(vocabularies, n_requests, exponent=1.1, seed=0, mix=None):
+    """n_requests requests whose queries follow a Zipf distribution per endpoint.
+
+    vocabularies maps endpoint -> list of queries (most popular first);
+    mix maps endpoint -> share of traffic (defaults to uniform).
+    """
+    rng = random.Random(seed)
+    endpoints = list(vocabularies)
+    mix = mix or {endpoint: 1.0 for endpoint in endpoints}
+    weights = [1.0 / (rank ** exponent) for rank in range(1, max(len(v) for v in vocabularies.values()) + 1)]
+    picks = rng.choices(endpoints, weights=[mix.get(e, 0.0) for e in endpoints], k=n_requests)
+
+    requests = []
+    for endpoint in picks:
+        values = vocabularies[endpoint]
+        query = rng.choices(values, weights=weights[:len(values)])[0]
+        requests.append(("POST", endpoint, {ENDPOINT_FIELDS[endpoint]: query}))
+    return requests
+
+
+def default_vocabularies(backend=None):
+    """Query vocabularies from the loaded models when available, else small built-in lists."""
+    vocab = {"/recommend_recipes": list(RECIPE_WORDS)}
+    if backend is not None:
+        allergen = backend.models.get("allergen")
+        if allergen is not None:
+            vocab["/predict_allergen"] = list(dict.fromkeys(allergen.df["food"].dropna().tolist()))
+        vocab["/predict_nutrition"] = list(backend.food_nutrition_db)
+    vocab.setdefault("/predict_allergen", ["peanut", "milk", "egg", "wheat", "soy", "fish", "shellfish"])
+    vocab.setdefault("/predict_nutrition", ["apple", "banana", "rice", "egg", "milk", "chicken breast"])
+    return vocab
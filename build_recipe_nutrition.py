@@ -0,0 +1,195 @@
+"""Estimate per-serving nutrition for every recipe and store it in the recipe model export.
+
+    python build_recipe_nutrition.py                              # recipe_model.cols next to backend.py
+    python build_recipe_nutrition.py /srv/models/recipe_model.cols --workers 8 --chunk-size 5000
+
+Each recipe's ingredient lines are weighed and matched to food_nutrition_db
+(see nutrition_store.RecipeNutritionEstimator) across a process pool, a
+chunk of rows per task. Every finished chunk is saved under
+<export>.nutrition/, keyed by a hash of the recipe text, the estimator
+version and the food table, so:
+
+  * an interrupted run picks up where it stopped, and
+  * a run over an updated corpus only recomputes new or changed recipes.
+
+The estimates are then written into the export as the calories, protein,
+carbs, fat, fiber, servings and nutrition_coverage columns, which the
+recipe endpoints return with every recipe. Works on columnar exports only;
+run export_models.py first for a pickle.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import columnar
+from food_data import food_nutrition_db
+from model import RecipeSearchModel
+from nutrition_store import ESTIMATE_VERSION, NUTRIENTS, RecipeNutritionEstimator
+
+SOURCE_COLUMNS = ['ingredients', 'ner', 'directions']
+VALUE_COLUMNS = NUTRIENTS + ['servings', 'nutrition_coverage']
+DEFAULT_CHUNK_SIZE = 5000
+# Merge the checkpoint files into one once there are this many
+COMPACT_PARTS = 64
+
+
+def fingerprint():
+    """Changes whenever the estimate for an unchanged recipe could change."""
+    table = json.dumps(food_nutrition_db, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(table + str(ESTIMATE_VERSION).encode(), digest_size=16).digest()
+
+
+# ====================== WORKERS ======================
+# Each worker maps the export itself, so tasks only carry row numbers.
+_worker = {}
+
+
+def init_worker(path):
+    _, frame, _ = columnar.load(path, mmap=True)
+    _worker["columns"] = [frame.column(name) for name in SOURCE_COLUMNS]
+    _worker["estimator"] = RecipeNutritionEstimator(food_nutrition_db)
+    _worker["salt"] = fingerprint()
+
+
+def hash_rows(bounds):
+    start, end = bounds
+    columns, salt = _worker["columns"], _worker["salt"]
+    hashes = np.empty(end - start, dtype=np.uint64)
+    for i, row in enumerate(range(start, end)):
+        digest = hashlib.blake2b(digest_size=8, key=salt)
+        for column in columns:
+            value = column[row]
+            digest.update((value or "").encode("utf-8") + b"\x1f")
+        hashes[i] = int.from_bytes(digest.digest(), "little")
+    return hashes
+
+
+def estimate_rows(rows):
+    columns, estimator = _worker["columns"], _worker["estimator"]
+    values = np.empty((len(rows), len(VALUE_COLUMNS)), dtype=np.float64)
+    for i, row in enumerate(rows):
+        ingredients, ner, directions = (column[int(row)] for column in columns)
+        per_serving, servings, coverage = estimator.estimate(ingredients, ner, directions)
+        values[i, :len(NUTRIENTS)] = per_serving
+        values[i, len(NUTRIENTS)] = servings
+        values[i, len(NUTRIENTS) + 1] = coverage
+    return rows, values
+
+
+# ====================== CHECKPOINTS ======================
+class ResultStore:
+    """Estimates keyed by recipe hash, kept as .npz parts in a directory.
+
+    Each part is written to a temporary name and renamed, so a crash never
+    leaves a truncated part behind.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def parts(self):
+        return sorted(glob.glob(os.path.join(self.directory, "part-*.npz")))
+
+    def load(self):
+        """(sorted unique hashes, their values)."""
+        hashes, values = [np.zeros(0, dtype=np.uint64)], [np.zeros((0, len(VALUE_COLUMNS)))]
+        for path in self.parts():
+            with np.load(path) as part:
+                hashes.append(part["hashes"])
+                values.append(part["values"])
+        hashes, values = np.concatenate(hashes), np.concatenate(values)
+        hashes, first = np.unique(hashes, return_index=True)
+        return hashes, values[first]
+
+    def write(self, hashes, values):
+        path = os.path.join(self.directory, f"part-{time.time_ns()}-{os.getpid()}.npz")
+        # The temporary name must not match parts(), or a crash mid-write leaves a part that can't be read
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, hashes=hashes, values=values)
+        os.replace(tmp, path)
+
+    def compact(self, keep):
+        """Merge all parts into one holding only the hashes in `keep`."""
+        old = self.parts()
+        hashes, values = self.load()
+        wanted = np.isin(hashes, keep)
+        self.write(hashes[wanted], values[wanted])
+        for path in old:
+            os.remove(path)
+
+
+def lookup(store_hashes, store_values, hashes):
+    """Values for each hash (all must be present in the store)."""
+    pos = np.searchsorted(store_hashes, hashes)
+    return store_values[pos]
+
+
+# ====================== PIPELINE ======================
+def build(path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, work_dir=None):
+    path = path.rstrip(os.sep)
+    started = time.time()
+    meta = columnar.read_meta(path)
+    if meta.get("model") != RecipeSearchModel.__name__:
+        raise ValueError(f"{path} holds a {meta.get('model')}, not a recipe model")
+    n_rows = meta["n_rows"]
+    store = ResultStore(work_dir or path + ".nutrition")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(path,)) as pool:
+        bounds = [(start, min(start + chunk_size, n_rows)) for start in range(0, n_rows, chunk_size)]
+        hashes = np.concatenate(list(pool.map(hash_rows, bounds))) if bounds else np.zeros(0, dtype=np.uint64)
+        print(f"🔑 Hashed {n_rows} recipes ({time.time() - started:.1f}s)")
+
+        known, _ = store.load()
+        todo = np.flatnonzero(~np.isin(hashes, known))
+        print(f"🧮 {len(todo)} recipes to estimate, {n_rows - len(todo)} reused from {store.directory}")
+
+        chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+        futures = [pool.submit(estimate_rows, chunk) for chunk in chunks]
+        done = 0
+        for future in as_completed(futures):
+            rows, values = future.result()
+            store.write(hashes[rows], values)
+            done += len(rows)
+            print(f"  ✅ {done}/{len(todo)} recipes ({time.time() - started:.1f}s)")
+
+    if len(store.parts()) > COMPACT_PARTS:
+        store.compact(hashes)
+    store_hashes, store_values = store.load()
+    values = lookup(store_hashes, store_values, hashes)
+
+    model = RecipeSearchModel.load(path, mmap=True)
+    model.df = model.df.with_columns({name: values[:, i].round(2) for i, name in enumerate(VALUE_COLUMNS)})
+    model.rows = model._encode_rows()
+    model.save(path)
+    print(f"✅ Nutrition written to {path} ({n_rows} recipes, {time.time() - started:.1f}s)")
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('export', nargs='?', help='recipe model export (default: recipe_model.cols next to backend.py)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='recipes per task and checkpoint')
+    parser.add_argument('--work-dir', help='checkpoint directory (default: <export>.nutrition)')
+    args = parser.parse_args(argv)
+
+    path = args.export or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recipe_model.cols')
+    if not os.path.isdir(path):
+        parser.error(f"{path} is not a columnar export; run export_models.py first")
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+    build(path, args.workers, args.chunk_size, args.work_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
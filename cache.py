@@ -0,0 +1,96 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Bounded LRU + TTL cache of encoded responses.
+
+    Entries live in namespaces (one per endpoint) and each namespace
+    remembers, through a weak reference, the model object its entries were
+    computed from. Looking up with a different model object (a reload put a
+    new one into `models`) drops the whole namespace first, so a cached
+    answer can never outlive the model that produced it.
+    """
+
+    def __init__(self, max_size=2048, ttl=300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._owners = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _check_owner(self, namespace, model):
+        owner = self._owners.get(namespace)
+        if owner is not None and owner() is model:
+            return
+        stale = [key for key in self._entries if key[0] == namespace]
+        for key in stale:
+            del self._entries[key]
+        if owner is not None:
+            self.invalidations += 1
+        self._owners[namespace] = weakref.ref(model)
+
+    def get(self, namespace, model, key):
+        """The cached value for key, or None. `model` is the object the caller is about to use."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_owner(namespace, model)
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[(namespace, key)]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            return value
+
+    def put(self, namespace, model, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            owner = self._owners.get(namespace)
+            # Computed from a model that has been swapped out meanwhile: don't keep it
+            if owner is None or owner() is not model:
+                return
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._owners.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,230 @@
+"""Columnar on-disk model format.
+
+A model is saved as a directory holding one .npy file per array plus a
+meta.json describing them. Text columns are stored as a UTF-8 byte buffer
+and an offsets array, so every file can be opened with np.load(mmap_mode="r")
+and all gunicorn workers share the same pages through the OS page cache
+instead of each unpickling a private copy.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+
+class StringColumn:
+    """Read-only sequence of strings backed by a byte buffer and offsets (both may be memory-mapped)."""
+
+    def __init__(self, data, offsets, nulls=None):
+        self.data = data
+        self.offsets = offsets
+        self.nulls = nulls
+
+    @classmethod
+    def from_values(cls, values):
+        values = list(values)
+        nulls = np.array([not isinstance(v, str) and pd.isna(v) for v in values], dtype=bool)
+        encoded = [b"" if null else str(v).encode("utf-8") for v, null in zip(values, nulls)]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets, nulls if nulls.any() else None)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        return self.raw(i).decode("utf-8")
+
+    def raw(self, i):
+        """The UTF-8 bytes of item i, without decoding."""
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def searchsorted(self, value, side="left", lo=0):
+        """Insertion point of the string `value` in this column, which must be sorted.
+
+        Compares UTF-8 bytes, which orders like str, without decoding any item.
+        """
+        value = value.encode("utf-8")
+        hi = len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item = self.raw(mid)
+            if item < value or (side == "right" and item == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def take(self, rows):
+        return [self[int(i)] for i in rows]
+
+    def tolist(self):
+        return list(self)
+
+
+class _ILoc:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def __getitem__(self, rows):
+        if isinstance(rows, slice):
+            rows = range(*rows.indices(len(self.frame)))
+        return self.frame.take(rows)
+
+
+class MappedFrame:
+    """The small part of the DataFrame API the models use, over StringColumns / arrays.
+
+    Row selections (iloc, boolean masks) decode only the selected rows and
+    return a regular DataFrame; selecting a whole column materializes it.
+    """
+
+    def __init__(self, columns):
+        self._columns = columns
+        self.iloc = _ILoc(self)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return len(next(iter(self._columns.values()))) if self._columns else 0
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def column(self, name):
+        return self._columns[name]
+
+    def with_columns(self, columns):
+        """A new MappedFrame with the given {name: array} columns added or replaced."""
+        return MappedFrame(dict(self._columns, **columns))
+
+    def take(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        data = {}
+        for name, values in self._columns.items():
+            if isinstance(values, StringColumn):
+                # object dtype, like the pickled frames, so results are identical either way
+                data[name] = pd.Series(values.take(rows), dtype=object)
+            else:
+                data[name] = np.asarray(values[rows])
+        return pd.DataFrame(data, columns=self.columns)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            values = self._columns[key]
+            if isinstance(values, StringColumn):
+                return pd.Series(values.tolist(), name=key, dtype=object)
+            return pd.Series(np.asarray(values), name=key)
+        if isinstance(key, list):
+            return MappedFrame({name: self._columns[name] for name in key})
+        mask = np.asarray(key, dtype=bool)
+        return self.take(np.flatnonzero(mask))
+
+    def to_frame(self):
+        return self.take(np.arange(len(self)))
+
+
+def _write_array(path, name, values, meta):
+    if isinstance(values, (StringColumn, list)):
+        column = values if isinstance(values, StringColumn) else StringColumn.from_values(values)
+        np.save(os.path.join(path, f"{name}.data.npy"), column.data)
+        np.save(os.path.join(path, f"{name}.offsets.npy"), column.offsets)
+        if column.nulls is not None:
+            np.save(os.path.join(path, f"{name}.nulls.npy"), column.nulls)
+        meta[name] = {"kind": "str", "nulls": column.nulls is not None}
+    else:
+        np.save(os.path.join(path, f"{name}.npy"), np.asarray(values))
+        meta[name] = {"kind": "array"}
+
+
+def _read_array(path, name, info, mmap):
+    mode = "r" if mmap else None
+    if info["kind"] == "str":
+        data = np.load(os.path.join(path, f"{name}.data.npy"), mmap_mode=mode)
+        offsets = np.load(os.path.join(path, f"{name}.offsets.npy"), mmap_mode=mode)
+        nulls = np.load(os.path.join(path, f"{name}.nulls.npy"), mmap_mode=mode) if info["nulls"] else None
+        return StringColumn(data, offsets, nulls)
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+
+
+def write_strings(path, name, values):
+    """Save a list of strings as <name>.data.npy / <name>.offsets.npy in the directory `path`."""
+    _write_array(path, name, list(values), {})
+
+
+def read_strings(path, name, mmap=True):
+    """The StringColumn written by write_strings()."""
+    return _read_array(path, name, {"kind": "str", "nulls": False}, mmap)
+
+
+def checksum(path):
+    """Hex blake2b of the contents of every file in the directory, in name order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(os.listdir(path)):
+        digest.update(name.encode("utf-8") + b"\0")
+        with open(os.path.join(path, name), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def save(path, frame, arrays=None, model=None, extra=None):
+    """Write a DataFrame (plus any named index arrays) to the directory `path`.
+
+    The directory is written next to its final location and renamed into
+    place, so a reader never sees a half-written model.
+    """
+    tmp = path.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    meta = {"format": FORMAT_VERSION, "model": model, "n_rows": len(frame),
+            "columns": {}, "arrays": {}, "extra": extra or {}}
+    for name in frame.columns:
+        values = frame.column(name) if isinstance(frame, MappedFrame) else frame[name]
+        if not isinstance(values, StringColumn) and values.dtype.kind not in "biuf":
+            values = values.tolist()
+        _write_array(tmp, f"col.{name}", values, meta["columns"])
+    for name, values in (arrays or {}).items():
+        _write_array(tmp, f"idx.{name}", values, meta["arrays"])
+    # Identifies the data itself, so every process loading it reports the same model version
+    meta["checksum"] = checksum(tmp)
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    old = path.rstrip(os.sep) + ".old"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load(path, mmap=True):
+    """(meta, MappedFrame, {index array name: array}) for a directory written by save()."""
+    meta = read_meta(path)
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {meta.get('format')!r} in {path}")
+    columns = {name[len("col."):]: _read_array(path, name, info, mmap) for name, info in meta["columns"].items()}
+    arrays = {name[len("idx."):]: _read_array(path, name, info, mmap) for name, info in meta["arrays"].items()}
+    return meta, MappedFrame(columns), arrays
+
+
+def read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
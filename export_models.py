@@ -0,0 +1,79 @@
+"""Convert the pickled models to the columnar, memory-mappable format.
+
+    python export_models.py                      # allergen_model.pkl / recipe_model.pkl -> *.cols
+    python export_models.py recipe_model.pkl --out /srv/models/recipe_model.cols
+    python export_models.py recipe_model.pkl --shards 16   # -> recipe_model.shards/ (see sharding.py)
+
+backend.py prefers <name>.cols over <name>.pkl when both exist, so after an
+export every gunicorn worker maps the same files instead of unpickling its
+own copy. The pickles are left in place as the fallback. A sharded recipe
+export (recipe_model.shards/) is preferred over both.
+"""
+import argparse
+import os
+import sys
+import time
+
+from model import AllergenModel, RecipeSearchModel, load_pickle
+from sharding import write_shards
+
+DEFAULT_MODELS = ['allergen_model.pkl', 'recipe_model.pkl']
+
+
+def export(pickle_path, out_path=None):
+    out_path = out_path or os.path.splitext(pickle_path)[0] + '.cols'
+    started = time.time()
+    model = load_pickle(pickle_path)
+    if not isinstance(model, (AllergenModel, RecipeSearchModel)):
+        raise TypeError(f"{pickle_path} does not hold a known model ({type(model).__name__})")
+    model.save(out_path)
+    print(f"✅ {pickle_path} -> {out_path} ({len(model.df)} rows, {time.time() - started:.1f}s)")
+    return out_path
+
+
+def export_sharded(source_path, n_shards, out_path=None):
+    """Split a recipe model (pickle or .cols export) into n_shards shard exports."""
+    base = os.path.splitext(source_path.rstrip(os.sep))[0]
+    out_path = out_path or base + '.shards'
+    started = time.time()
+    if os.path.isdir(source_path):
+        model = RecipeSearchModel.load(source_path)
+    else:
+        model = load_pickle(source_path)
+    if not isinstance(model, RecipeSearchModel):
+        raise TypeError(f"Only recipe models can be sharded ({type(model).__name__} in {source_path})")
+    write_shards(model.df, out_path, n_shards)
+    print(f"✅ {source_path} -> {out_path} ({len(model.df)} rows, {time.time() - started:.1f}s)")
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pickles', nargs='*', help='pickled models to export (default: the ones next to backend.py)')
+    parser.add_argument('--out', help='output directory (only with a single input)')
+    parser.add_argument('--shards', type=int, help='split a recipe model into this many shards instead')
+    args = parser.parse_args(argv)
+
+    pickles = args.pickles
+    if not pickles:
+        base = os.path.dirname(os.path.abspath(__file__))
+        names = ['recipe_model.pkl'] if args.shards else DEFAULT_MODELS
+        pickles = [os.path.join(base, name) for name in names if os.path.exists(os.path.join(base, name))]
+    if args.out and len(pickles) != 1:
+        parser.error('--out needs exactly one input pickle')
+    if not pickles:
+        parser.error('no model pickles found')
+
+    if args.shards is not None and args.shards < 1:
+        parser.error('--shards must be positive')
+
+    for path in pickles:
+        if args.shards:
+            export_sharded(path, args.shards, args.out)
+        else:
+            export(path, args.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
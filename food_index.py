@@ -0,0 +1,219 @@
+def edit_distance(a, b, max_distance):
+    """Optimal-string-alignment distance between a and b, or max_distance + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        if min(row) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, row
+    return prev[-1] if prev[-1] <= max_distance else max_distance + 1
+
+
+def deletes(word, max_distance):
+    """All strings obtained by removing up to max_distance characters from word."""
+    variants = {word}
+    level = {word}
+    for _ in range(max_distance):
+        level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))}
+        variants |= level
+    return variants
+
+
+class FoodIndex:
+    """Autocomplete and spelling correction over the food names.
+
+    A character trie answers prefix queries (every word start of a name is
+    inserted, so "breast" completes to "chicken breast"), with a bounded
+    edit-distance walk over the same trie for misspelled prefixes.
+
+    Correction works word by word. A symmetric-delete (SymSpell) table maps
+    every deletion variant of each distinct word to the words it came from,
+    so each query word only has to generate its own deletions and verify the
+    few words they point at. The best MAX_WORD_CANDIDATES spellings of every
+    query word are then combined, within the query's edit budget, and looked
+    up as whole names. Names sharing a leading word ("cooked ...") no longer
+    share candidates, so the cost follows the query, not the table. A typo
+    that merges or splits words is not corrected.
+    """
+
+    MAX_DISTANCE = 2
+    # Spellings kept per query word, closest and most common first
+    MAX_WORD_CANDIDATES = 8
+    # Longest prefix fuzzy_complete() matches in autocomplete()
+    PREFIX_LENGTH = 7
+
+    def __init__(self, names):
+        self.names = sorted(set(names))
+        self.known = set(self.names)
+        self.trie = {}
+        self.by_words = {}
+        self.word_counts = {}
+        for name in self.names:
+            words = name.split()
+            for i in range(len(words)):
+                self._insert(" ".join(words[i:]), name)
+            self.by_words.setdefault(tuple(words), name)
+            for word in words:
+                self.word_counts[word] = self.word_counts.get(word, 0) + 1
+        self.delete_map = {}
+        for word in self.word_counts:
+            for variant in deletes(word, self.MAX_DISTANCE):
+                self.delete_map.setdefault(variant, []).append(word)
+
+    def max_distance(self, term):
+        # Short inputs tolerate fewer typos, otherwise "egg" would match "elk"
+        if len(term) <= 2:
+            return 0
+        if len(term) <= 5:
+            return 1
+        return self.MAX_DISTANCE
+
+    def __contains__(self, name):
+        return name in self.known
+
+    def _insert(self, key, name):
+        node = self.trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault("", []).append(name)
+
+    def _collect(self, node, limit, found):
+        # Pre-order walk in character order: a name comes before its own extensions
+        stack = [node]
+        while stack and len(found) < limit:
+            node = stack.pop()
+            for name in node.get("", ()):
+                if name not in found:
+                    found.append(name)
+            stack.extend(node[ch] for ch in sorted((k for k in node if k), reverse=True))
+        return found
+
+    def complete(self, prefix, limit=10):
+        """Names having a word that starts with prefix, in trie order."""
+        node = self.trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return self._collect(node, limit, [])[:limit]
+
+    def fuzzy_complete(self, prefix, limit=10):
+        """Like complete(), but the prefix may be one edit off.
+
+        Walks the trie below the prefix's first letter (typos there are rare
+        and it cuts the search by the alphabet size) carrying one
+        edit-distance row per node, and prunes a branch as soon as every
+        cell of its row is over the allowed distance.
+        """
+        max_distance = min(self.max_distance(prefix), 1)
+        start = self.trie.get(prefix[:1])
+        if not max_distance or start is None:
+            return []
+
+        # row[j] is the edit distance between the trie path so far and prefix[:j]
+        hits = []
+        stack = [(start, [1] + list(range(len(prefix))), 1)]
+        while stack:
+            node, row, depth = stack.pop()
+            for ch, child in node.items():
+                if not ch:
+                    continue
+                new = [depth + 1]
+                for j in range(1, len(prefix) + 1):
+                    new.append(min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (prefix[j - 1] != ch)))
+                if new[-1] <= max_distance:
+                    hits.append((new[-1], depth + 1, len(hits), child))
+                elif min(new) <= max_distance:
+                    stack.append((child, new, depth + 1))
+
+        found = []
+        for _, _, _, node in sorted(hits, key=lambda hit: hit[:3]):
+            if len(found) >= limit:
+                break
+            self._collect(node, limit, found)
+        return found[:limit]
+
+    def word_candidates(self, word, max_distance):
+        """[(distance, word)] of the closest known spellings of word, at most MAX_WORD_CANDIDATES."""
+        if max_distance == 0:
+            return [(0, word)] if word in self.word_counts else []
+        found = set()
+        for variant in deletes(word, max_distance):
+            found.update(self.delete_map.get(variant, ()))
+        ranked = []
+        for candidate in found:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, -self.word_counts[candidate], abs(len(candidate) - len(word)), candidate))
+        ranked.sort()
+        return [(distance, candidate) for distance, _, _, candidate in ranked[:self.MAX_WORD_CANDIDATES]]
+
+    def suggest(self, term, limit=5):
+        """[(name, distance)] of names within max_distance(term) edits of term, closest first.
+
+        The distance of a name is the sum of its words' distances to the
+        query's words. Correctly spelled query words are first taken as
+        they are; they are only respelled when that finds fewer than limit
+        names.
+        """
+        matches = self._suggest(term, limit, respell_known=False)
+        if len(matches) < limit:
+            matches = self._suggest(term, limit, respell_known=True)
+        return matches
+
+    def _suggest(self, term, limit, respell_known):
+        budget = self.max_distance(term)
+        words = term.split()
+        if not words:
+            return []
+        options = []
+        for word in words:
+            if word in self.word_counts and not respell_known:
+                options.append([(0, word)])
+            else:
+                options.append(self.word_candidates(word, min(budget, self.max_distance(word))))
+
+        matches = []
+
+        def combine(position, chosen, spent):
+            if position == len(words):
+                name = self.by_words.get(tuple(chosen))
+                if name is not None:
+                    matches.append((spent, abs(len(name) - len(term)), name))
+                return
+            for distance, word in options[position]:
+                if spent + distance <= budget:
+                    chosen.append(word)
+                    combine(position + 1, chosen, spent + distance)
+                    chosen.pop()
+
+        combine(0, [], 0)
+        matches.sort()
+        return [(name, distance) for distance, _, name in matches[:limit]]
+
+    def correct(self, term):
+        """The closest known name to term, or None."""
+        if term in self.known:
+            return term
+        suggestions = self.suggest(term, limit=1)
+        return suggestions[0][0] if suggestions else None
+
+    def autocomplete(self, text, limit=10):
+        """Completions of text, falling back to spelling-corrected names and prefixes."""
+        suggestions = self.complete(text, limit)
+        if len(suggestions) < limit:
+            suggestions.extend(name for name, _ in self.suggest(text, limit) if name not in suggestions)
+        if not suggestions:
+            # Only the head of a long input is matched fuzzily; that keeps the trie walk small
+            for name in self.fuzzy_complete(text[:self.PREFIX_LENGTH], limit):
+                if name not in suggestions:
+                    suggestions.append(name)
+        return suggestions[:limit]
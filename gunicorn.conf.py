@@ -0,0 +1,9 @@
+# gunicorn -c gunicorn.conf.py backend:app
+#
+# With PROMETHEUS_MULTIPROC_DIR set, /metrics aggregates every worker's
+# samples; this hook tidies up the files of workers that exit.
+from metrics import mark_worker_dead
+
+
+def child_exit(server, worker):
+    mark_worker_dead(worker.pid)
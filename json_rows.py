@@ -0,0 +1,113 @@
+"""Model rows pre-encoded to JSON, so responses are built by joining bytes.
+
+Turning a result DataFrame into dicts (to_dict(orient="records")) and
+encoding those again on every request costs more than the search itself
+for the long recipe texts. EncodedRows keeps each row's JSON once, as one
+byte buffer plus offsets (a columnar.StringColumn), built when the model
+loads or stored in its columnar export and memory-mapped from there.
+
+Rows are encoded exactly like jsonify (compact separators, sorted keys,
+ASCII only), so a body joined from them is byte for byte what jsonify
+would return. Each fragment is the row object without its closing brace;
+per-query fields such as the recipe `score` are merged in at their sorted
+place when a row is written out.
+"""
+import bisect
+import json
+import math
+import re
+
+import numpy as np
+
+from columnar import MappedFrame, StringColumn
+
+
+def json_value(value):
+    # Missing values become null (to_dict would give NaN, which isn't valid JSON)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# jsonify's encoding (flask.json.provider.DefaultJSONProvider.response)
+JSON_OPTIONS = {"sort_keys": True, "ensure_ascii": True, "separators": (",", ":")}
+# Keys of an encoded row: inside a JSON string a quote is always escaped, so
+# a quote right after "{" or "," always opens a key
+KEY_RE = re.compile(rb'[{,]"((?:[^"\\]|\\.)*)":')
+
+
+def encode_row(row):
+    """A row dict as JSON without the closing brace, encoded the way jsonify would."""
+    return json.dumps(row, **JSON_OPTIONS)[:-1]
+
+
+def encode_value(value):
+    return json.dumps(value, **JSON_OPTIONS).encode("utf-8")
+
+
+class EncodedRows:
+    def __init__(self, column):
+        self.column = column
+        self._keys = None
+
+    @classmethod
+    def build(cls, frame, columns=None):
+        columns = sorted(columns or frame.columns)
+        if isinstance(frame, MappedFrame):
+            values = [frame.column(name) for name in columns]
+        else:
+            values = [frame[name].tolist() for name in columns]
+        fragments = [
+            encode_row({name: json_value(value) for name, value in zip(columns, row)})
+            for row in zip(*values)
+        ]
+        return cls(StringColumn.from_values(fragments))
+
+    def __len__(self):
+        return len(self.column)
+
+    @property
+    def keys(self):
+        """The sorted keys every row has, read off the first row."""
+        if self._keys is None:
+            self._keys = KEY_RE.findall(self.column.raw(0)) if len(self) else []
+        return self._keys
+
+    def row(self, i, extra=()):
+        """Row i as a JSON object, with the (key bytes, encoded value) pairs of `extra` merged in key order."""
+        fragment = self.column.raw(int(i))
+        if not extra:
+            return fragment + b"}"
+        parts, start = [], 0
+        for key, value in sorted(extra):
+            j = bisect.bisect_right(self.keys, key)
+            if j == len(self.keys):
+                parts += [fragment[start:], b',"%s":%s' % (key, value)]
+                start = len(fragment)
+            else:
+                # Right before the quote opening the first key that sorts after this one
+                at = fragment.index(b'"%s":' % self.keys[j], start)
+                parts += [fragment[start:at], b'"%s":%s,' % (key, value)]
+                start = at
+        parts += [fragment[start:], b"}"]
+        return b"".join(parts)
+
+    def join(self, rows, extras=None):
+        """JSON array of the given rows; extras holds each row's extra fields (see row())."""
+        if extras is None:
+            return b"[" + b",".join(self.row(i) for i in rows) + b"]"
+        return b"[" + b",".join(self.row(i, extra) for i, extra in zip(rows, extras)) + b"]"
+
+    def lines(self, rows, extras=None):
+        """One JSON row per line (NDJSON), produced lazily."""
+        if extras is None:
+            extras = [()] * len(rows)
+        for i, extra in zip(rows, extras):
+            yield self.row(i, extra) + b"\n"
+
+
+def score_fields(scores):
+    """The `score` field of each row, rounded like the DataFrame responses."""
+    return [[(b"score", encode_value(score))] for score in np.asarray(scores, dtype=float).round(4).tolist()]
@@ -0,0 +1,175 @@
+"""Request instrumentation: Prometheus metrics and an opt-in sampling profiler.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty, writable
+directory before the workers start. prometheus_client then keeps each
+worker's samples in its own mmap'd file there, /metrics merges them, and
+gunicorn.conf.py cleans up after workers that exit.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+
+from flask import g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds", "Request latency by endpoint and status",
+    ["endpoint", "status"], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram(
+    "api_request_stage_duration_seconds", "Time spent in each request stage (parse, search, serialize)",
+    ["endpoint", "stage"], buckets=LATENCY_BUCKETS)
+RESULT_SIZE = Histogram(
+    "api_result_size", "Number of results returned per request",
+    ["endpoint"], buckets=SIZE_BUCKETS)
+ERRORS = Counter(
+    "api_errors_total", "Error responses by endpoint and kind",
+    ["endpoint", "kind"])
+EXCEPTIONS = Counter(
+    "api_exceptions_total", "Exceptions caught by handlers, by exception type",
+    ["endpoint", "exception"])
+
+ERROR_KINDS = {400: "bad_request", 403: "forbidden", 404: "not_found", 500: "exception",
+               501: "not_implemented", 503: "unavailable"}
+
+
+@contextmanager
+def stage(name):
+    """Time one stage of the current request: `with stage("search"): ...`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        endpoint = getattr(g, "metrics_endpoint", None)
+        if endpoint is not None:
+            STAGE_LATENCY.labels(endpoint, name).observe(time.perf_counter() - started)
+
+
+def record_result_size(size):
+    endpoint = getattr(g, "metrics_endpoint", None)
+    if endpoint is not None:
+        RESULT_SIZE.labels(endpoint).observe(size)
+
+
+def record_exception(exc):
+    endpoint = getattr(g, "metrics_endpoint", None)
+    if endpoint is not None:
+        EXCEPTIONS.labels(endpoint, type(exc).__name__).inc()
+
+
+def instrumented(endpoint):
+    """Decorator recording latency, status and error kind for a Flask view."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            g.metrics_endpoint = endpoint
+            profiler = start_profiler(endpoint)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = view(*args, **kwargs)
+                if isinstance(response, tuple):
+                    status = response[1]
+                else:
+                    status = getattr(response, "status_code", 200)
+                return response
+            finally:
+                REQUEST_LATENCY.labels(endpoint, str(status)).observe(time.perf_counter() - started)
+                if status in ERROR_KINDS:
+                    ERRORS.labels(endpoint, ERROR_KINDS[status]).inc()
+                if profiler is not None:
+                    profiler.stop()
+        return wrapper
+    return decorator
+
+
+def render():
+    """(body, content type) of the Prometheus text exposition for all workers."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit hook: drop a dead worker's live gauges from the multiprocess store."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+
+# ====================== SAMPLING PROFILER ======================
+
+# Off unless PROFILING_ENABLED=1; then a request opts in with "X-Profile: 1".
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.001))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+# Called as hook(endpoint, folded_stacks) after every profiled request,
+# where folded_stacks maps "frame;frame;frame" -> sample count.
+profile_hooks = []
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a helper thread every `interval` seconds."""
+
+    def __init__(self, endpoint, thread_id, interval):
+        self.endpoint = endpoint
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Tally()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        for hook in profile_hooks:
+            try:
+                hook(self.endpoint, dict(self.stacks))
+            except Exception as e:
+                print(f"❌ Profile hook failed: {e}")
+
+
+def start_profiler(endpoint):
+    if not PROFILING_ENABLED or request.headers.get("X-Profile") != "1":
+        return None
+    return SamplingProfiler(endpoint, threading.get_ident(), PROFILE_INTERVAL).start()
+
+
+def write_folded_stacks(endpoint, stacks):
+    """Default hook: save the samples in flamegraph.pl's folded format under PROFILE_DIR."""
+    if not stacks:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{endpoint}-{time.time():.6f}-{os.getpid()}.folded")
+    with open(path, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+
+profile_hooks.append(write_folded_stacks)
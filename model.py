@@ -1,18 +1,284 @@
-import pandas as pd
-
-class AllergenModel:
-    def __init__(self, df):
-        self.df = df
-
-    def search(self, query):
-        query = query.lower()
-        result = self.df[
-            self.df['food'].str.contains(query) |
-            self.df['type'].str.contains(query) |
-            self.df['group'].str.contains(query) |
-            self.df['class'].str.contains(query) |
-            self.df['allergy'].str.contains(query)
-        ]
-        if result.empty:
-            return "❌ No allergen data found for that query."
-        return result.reset_index(drop=True)
\ No newline at end of file
+import os
+import pickle
+
+import numpy as np
+
+import columnar
+from json_rows import EncodedRows
+from search_index import (BM25Index, IngredientIndex, TrigramIndex, is_plain_query, lowered_columns,
+                          normalize_ingredient, row_haystacks, scan, scan_many)
+
+
+# ====================== MODEL CLASSES ======================
+class IndexedModel:
+    INDEX_CLASS = None
+    # Columns pre-encoded for responses (None: all of them)
+    JSON_COLUMNS = None
+    # Set by the reloader each time a model is (re)loaded and reported in responses
+    version = 0
+
+    def __init__(self, df, use_index=True):
+        self.df = df
+        self.use_index = use_index
+        self._build_index()
+        self.rows = self._encode_rows()
+
+    # Pickles made before the index existed only carry `df`, and unpickling
+    # skips __init__, so the index is rebuilt here and never stored.
+    def __getstate__(self):
+        return {'df': self.df, 'use_index': self.use_index}
+
+    def __setstate__(self, state):
+        self.df = state['df']
+        self.use_index = state.get('use_index', True)
+        self._build_index()
+        self.rows = self._encode_rows()
+
+    def _build_index(self):
+        raise NotImplementedError
+
+    @property
+    def row_columns(self):
+        return self.JSON_COLUMNS
+
+    def _encode_rows(self):
+        return EncodedRows.build(self.df, self.row_columns)
+
+    def _index_arrays(self):
+        """Named arrays saved next to the rows in a columnar export."""
+        return dict(self.index.to_arrays(), rows_json=self.rows.column)
+
+    def _restore_indexes(self, arrays):
+        rows = arrays.pop("rows_json", None)
+        self.index = self.INDEX_CLASS.from_arrays(arrays)
+        # Exports made before rows were stored, or stored in an older encoding, get them encoded now
+        if rows is not None and len(rows):
+            current = EncodedRows.build(self.df.iloc[:1], self.row_columns)
+            if rows.raw(0) != current.column.raw(0):
+                rows = None
+        self.rows = EncodedRows(rows) if rows is not None else self._encode_rows()
+
+    def save(self, path):
+        """Export the rows and the prebuilt index to a columnar directory (see columnar.py)."""
+        columnar.save(path, self.df, arrays=self._index_arrays(), model=type(self).__name__)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a columnar export; with mmap the arrays stay on disk, shared through the page cache."""
+        meta, frame, arrays = columnar.load(path, mmap=mmap)
+        if meta["model"] != cls.__name__:
+            raise ValueError(f"{path} holds a {meta['model']}, not a {cls.__name__}")
+        model = cls.__new__(cls)
+        model.df = frame
+        model.use_index = True
+        model._restore_indexes(arrays)
+        return model
+
+class AllergenModel(IndexedModel):
+    COLUMNS = ['food', 'type', 'group', 'class', 'allergy']
+    NO_RESULTS = "❌ No allergen data found for that query."
+    INDEX_CLASS = TrigramIndex
+
+    def _build_index(self):
+        self.index = TrigramIndex(row_haystacks(self.df, self.COLUMNS))
+
+    def find(self, query, use_index=None):
+        """Positions of the rows matching query, in table order."""
+        query = query.lower().strip()
+        if use_index is None:
+            use_index = self.use_index
+        if use_index and is_plain_query(query):
+            return self.index.search(query)
+        return scan(lowered_columns(self.df, self.COLUMNS), query)
+
+    def search(self, query, use_index=None):
+        rows = self.find(query, use_index)
+        if not len(rows):
+            return self.NO_RESULTS
+        return self.df.iloc[rows].reset_index(drop=True)
+
+    def search_many(self, queries, use_index=None):
+        """Search several queries at once; returns {query: DataFrame, message or exception}.
+
+        Plain queries go through the index together (TrigramIndex.search_many),
+        the rest through one scan of the table (scan_many); a bad pattern only
+        fails its own item. All matching rows are gathered in one take over
+        the DataFrame and split back per query.
+        """
+        queries = list(dict.fromkeys(q.lower().strip() for q in queries))
+        if use_index is None:
+            use_index = self.use_index
+        indexed = [query for query in queries if use_index and is_plain_query(query)]
+        found = dict(zip(indexed, self.index.search_many(indexed)))
+        found.update(scan_many(self.df, self.COLUMNS, [query for query in queries if query not in found]))
+
+        results = {query: rows for query, rows in found.items() if isinstance(rows, Exception)}
+        matched = [query for query in queries if query not in results]
+        if matched:
+            hits = [found[query] for query in matched]
+            frame = self.df.iloc[np.concatenate(hits)].reset_index(drop=True)
+            bounds = np.cumsum([len(rows) for rows in hits])[:-1]
+            for query, part in zip(matched, np.split(np.arange(len(frame)), bounds)):
+                if not len(part):
+                    results[query] = self.NO_RESULTS
+                else:
+                    results[query] = frame.iloc[part].reset_index(drop=True)
+        return results
+
+class RecipeSearchModel(IndexedModel):
+    FIELD_WEIGHTS = {'title': 3.0, 'ner': 2.0, 'ingredients': 1.0}
+    RESULT_COLUMNS = ['title', 'ingredients', 'directions', 'link']
+    # Columns the scan (SEARCH_MODE=scan) looks for the query in
+    SCAN_COLUMNS = ['title', 'ingredients', 'ner']
+    # Per-serving estimates added to the export by build_recipe_nutrition.py
+    NUTRITION_COLUMNS = ['calories', 'protein', 'carbs', 'fat', 'fiber', 'servings', 'nutrition_coverage']
+    NO_RESULTS = "❌ No recipes found for that query."
+    NO_PANTRY_RESULTS = "❌ No recipes use any of those ingredients."
+    INDEX_CLASS = BM25Index
+
+    def __init__(self, df, use_index=True, bm25_stats=None):
+        # bm25_stats: the full corpus' BM25Index.corpus_stats when df is one shard of it
+        self.bm25_stats = bm25_stats
+        super().__init__(df, use_index)
+
+    def _build_index(self):
+        fields = {name: self.df[name].tolist() for name in self.FIELD_WEIGHTS}
+        self.index = BM25Index(fields, self.FIELD_WEIGHTS, stats=getattr(self, 'bm25_stats', None))
+        self.ingredients = IngredientIndex(self.df['ner'].tolist())
+
+    @property
+    def result_columns(self):
+        return self.RESULT_COLUMNS + [name for name in self.NUTRITION_COLUMNS if name in self.df.columns]
+
+    @property
+    def row_columns(self):
+        return self.result_columns
+
+    def _index_arrays(self):
+        arrays = super()._index_arrays()
+        arrays.update({f"ingredients.{name}": values for name, values in self.ingredients.to_arrays().items()})
+        return arrays
+
+    def _restore_indexes(self, arrays):
+        prefix = "ingredients."
+        ingredient_arrays = {name[len(prefix):]: arrays.pop(name) for name in list(arrays) if name.startswith(prefix)}
+        super()._restore_indexes(arrays)
+        if ingredient_arrays:
+            self.ingredients = IngredientIndex.from_arrays(ingredient_arrays)
+        else:
+            self.ingredients = IngredientIndex(self.df['ner'].tolist())
+
+    def find(self, query, top_n=5, use_index=None, allowed=None, terms=None):
+        """(positions, BM25 scores) of the best top_n rows; the scan finds rows in table order, without scores.
+
+        allowed filters candidate rows and terms replaces the query's own
+        prefix expansion (see BM25Index.top_k).
+        """
+        query = query.lower().strip()
+        if use_index is None:
+            use_index = self.use_index
+        if use_index:
+            return self.index.top_k(query, top_n, allowed, terms)
+
+        rows = scan(lowered_columns(self.df, self.SCAN_COLUMNS), query)
+        if allowed is not None:
+            rows = rows[allowed(rows)]
+        return rows[:top_n], None
+
+    def find_many(self, queries, top_n=5, use_index=None, allowed=None, terms=None):
+        """[find() result] for each query, the index scoring them together (BM25Index.top_k_many).
+
+        The scan lowers the table once for the whole batch (scan_many) and
+        raises the first bad pattern's error, as find() would.
+        """
+        queries = [query.lower().strip() for query in queries]
+        if use_index is None:
+            use_index = self.use_index
+        if use_index:
+            return self.index.top_k_many(queries, top_n, allowed, terms)
+
+        found = scan_many(self.df, self.SCAN_COLUMNS, queries)
+        results = []
+        for query in queries:
+            rows = found[query]
+            if isinstance(rows, Exception):
+                raise rows
+            if allowed is not None:
+                rows = rows[allowed(rows)]
+            results.append((rows[:top_n], None))
+        return results
+
+    def search(self, query, top_n=5, use_index=None, allowed=None):
+        rows, scores = self.find(query, top_n, use_index, allowed)
+        if not len(rows):
+            return self.NO_RESULTS
+        results = self.df.iloc[rows][self.result_columns].reset_index(drop=True)
+        if scores is not None:
+            results['score'] = scores.astype(float).round(4)
+        return results
+
+    def cook_with(self, pantry, top_n=5, max_missing=None, allowed=None):
+        """Recipes needing the fewest ingredients beyond `pantry`.
+
+        Returns (rows, matched counts, missing ingredient names per row,
+        recognized pantry names, pantry names no recipe uses).
+        """
+        names = list(dict.fromkeys(filter(None, map(normalize_ingredient, pantry))))
+        term_ids, known, unknown = [], [], []
+        for name in names:
+            term = self.ingredients.lookup(name)
+            if term is None:
+                unknown.append(name)
+            else:
+                term_ids.append(term)
+                known.append(name)
+        rows, matched, _ = self.ingredients.rank(term_ids, top_n, max_missing, allowed)
+        missing = [self.ingredients.missing(row, term_ids) for row in rows]
+        return rows, matched, missing, known, unknown
+
+    def search_many(self, queries, top_n=5, use_index=None, allowed=None):
+        """Search several queries at once; returns {query: DataFrame or message}."""
+        queries = list(dict.fromkeys(q.lower().strip() for q in queries))
+        if not queries:
+            return {}
+
+        hits = self.find_many(queries, top_n, use_index, allowed)
+        rows = np.concatenate([h[0] for h in hits])
+        frame = self.df.iloc[rows][self.result_columns].reset_index(drop=True)
+        if hits[0][1] is not None:
+            frame['score'] = np.concatenate([h[1] for h in hits]).astype(float).round(4)
+
+        results = {}
+        start = 0
+        for query, (found, _) in zip(queries, hits):
+            if not len(found):
+                results[query] = self.NO_RESULTS
+            else:
+                results[query] = frame.iloc[start:start + len(found)].reset_index(drop=True)
+            start += len(found)
+        return results
+
+
+# ====================== LOADING ======================
+class ModelUnpickler(pickle.Unpickler):
+    # The pickles were written from a notebook, so the model classes are
+    # recorded as __main__.*; resolve them here whatever __main__ is (gunicorn, flask, ...).
+    def find_class(self, module, name):
+        if module in ("__main__", "backend") and name in ("AllergenModel", "RecipeSearchModel"):
+            return globals()[name]
+        return super().find_class(module, name)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return ModelUnpickler(f).load()
+
+
+def load_model(base_path, model_class):
+    """Load `<base_path>.cols` (columnar, memory-mapped) if it exists, else `<base_path>.pkl`, else None."""
+    columnar_path = base_path + '.cols'
+    if os.path.isdir(columnar_path):
+        return model_class.load(columnar_path)
+    if os.path.exists(base_path + '.pkl'):
+        return load_pickle(base_path + '.pkl')
+    return None
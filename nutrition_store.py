@@ -0,0 +1,308 @@
+import json
+import re
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+NUTRIENTS = ["calories", "protein", "carbs", "fat", "fiber"]
+
+# Grams per unit. Volumes assume roughly the density of water.
+UNIT_GRAMS = {
+    "g": 1, "gram": 1, "grams": 1,
+    "kg": 1000, "kilogram": 1000, "kilograms": 1000,
+    "mg": 0.001,
+    "oz": 28.35, "ounce": 28.35, "ounces": 28.35,
+    "lb": 453.6, "lbs": 453.6, "pound": 453.6, "pounds": 453.6,
+    "ml": 1, "l": 1000, "liter": 1000, "liters": 1000,
+    "cup": 240, "cups": 240, "c": 240,
+    "tbsp": 15, "tablespoon": 15, "tablespoons": 15,
+    "tsp": 5, "teaspoon": 5, "teaspoons": 5,
+    "slice": 30, "slices": 30,
+    "handful": 30, "handfuls": 30,
+}
+
+# Typical weight of one piece, used for counts like "2 eggs" or "1 banana"
+PIECE_GRAMS = {
+    "egg": 50, "banana": 118, "apple": 182, "orange": 131, "pear": 178,
+    "peach": 150, "plum": 66, "kiwi": 69, "mango": 200, "avocado": 200,
+    "lemon": 58, "lime": 67, "potato": 173, "sweet potato": 130,
+    "carrot": 61, "tomato": 123, "onion": 110, "bread": 30,
+    "chicken breast": 174, "salmon": 170, "strawberry": 12, "cherry": 8,
+    "grapes": 5, "almonds": 1.2, "walnuts": 4, "peanuts": 1,
+}
+DEFAULT_PIECE_GRAMS = 100
+
+# Recipe shorthand where only the case tells the units apart: "1 T butter", "2 t salt"
+CASED_UNITS = {"T": "tbsp", "t": "tsp"}
+
+# Size words in front of a food ("1 large egg"); not part of its name
+SIZE_RE = re.compile(r"^(?:(?:extra|very)[\s-]+)?(?:large|small|medium|big|jumbo)\s+")
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "half": 0.5,
+}
+
+# One comparison of a range query: "protein > 20", "fat <= 5.5", "fiber = 0"
+PREDICATE_RE = re.compile(r"^\s*([a-z_]+)\s*(<=|>=|==|=|<|>)\s*(-?\d*\.?\d+)\s*$")
+PREDICATE_SPLIT_RE = re.compile(r"\band\b|,|&&?", re.IGNORECASE)
+
+ITEM_SPLIT_RE = re.compile(r",|;|\n|\band\b|\+")
+QUANTITY_RE = re.compile(
+    r"^\s*(?P<qty>\d+\s+\d+/\d+|\d+/\d+|\d*\.?\d+|" + "|".join(NUMBER_WORDS) + r")?\s*"
+    r"(?P<unit>" + "|".join(sorted(map(re.escape, list(UNIT_GRAMS) + list({unit.lower() for unit in CASED_UNITS})), key=len, reverse=True)) + r")?\.?"
+    r"(?:\s+|\b|(?<=\d))(?:of\s+)?(?P<food>.*?)\s*$"
+)
+
+
+def parse_number(text):
+    if text in NUMBER_WORDS:
+        return float(NUMBER_WORDS[text])
+    if " " in text:
+        whole, fraction = text.split()
+        return float(whole) + parse_number(fraction)
+    if "/" in text:
+        num, den = text.split("/")
+        return float(num) / float(den) if float(den) else 0.0
+    return float(text)
+
+
+def parse_quantity(text):
+    """Split "150g rice" / "2 eggs" / "1 1/2 cups milk" into (food text, quantity, unit)."""
+    match = QUANTITY_RE.match(text.lower())
+    if not match or not match.group("food"):
+        return text.strip().lower(), None, None
+    qty = match.group("qty")
+    unit = match.group("unit")
+    food = match.group("food")
+    # "egg" must not lose its leading letter to the unit pattern ("g"), nor "cheese" to "c"
+    if unit and not qty and not text.lower().lstrip().startswith(unit + " "):
+        return text.strip().lower(), None, None
+    if unit == "t":
+        # Matched on the lowered text; the original still has the case
+        unit = CASED_UNITS[text[match.start("unit")]]
+    return SIZE_RE.sub("", food), (parse_number(qty) if qty else None), unit
+
+
+def parse_meal_text(text):
+    """[(food text, quantity, unit)] for free text like "2 eggs, 150g rice, 1 banana"."""
+    return [parse_quantity(part) for part in ITEM_SPLIT_RE.split(text) if part.strip()]
+
+
+def parse_predicates(text):
+    """[(nutrient, op, value)] for "protein > 20 and fat < 5"; raises ValueError on anything else."""
+    predicates = []
+    for part in PREDICATE_SPLIT_RE.split(text):
+        if not part.strip():
+            continue
+        match = PREDICATE_RE.match(part.lower())
+        if not match:
+            raise ValueError(f"Can't parse condition {part.strip()!r}")
+        nutrient, op, value = match.groups()
+        if nutrient not in NUTRIENTS:
+            raise ValueError(f"Unknown nutrient {nutrient!r}; use one of {', '.join(NUTRIENTS)}")
+        predicates.append((nutrient, "=" if op == "==" else op, float(value)))
+    return predicates
+
+
+def portion_grams(food, quantity, unit):
+    """Grams for a parsed quantity; a bare count uses the food's typical piece weight."""
+    if quantity is None:
+        quantity = 1.0
+    if unit:
+        return quantity * UNIT_GRAMS[unit]
+    return quantity * PIECE_GRAMS.get(food, DEFAULT_PIECE_GRAMS)
+
+
+class NutrientMatrix:
+    """food_nutrition_db as a dense (foods x NUTRIENTS) per-100g matrix plus a name -> row index.
+
+    Each nutrient column also has a sorted index (row order and the sorted
+    values), so a range condition is two binary searches; and the rows,
+    scaled to unit variance per nutrient, sit in a KD-tree for
+    nearest-neighbour lookups.
+    """
+
+    def __init__(self, db):
+        self.names = list(db)
+        self.rows = {name: i for i, name in enumerate(self.names)}
+        self.matrix = np.array(
+            [[float(db[name].get(nutrient, 0) or 0) for nutrient in NUTRIENTS] for name in self.names],
+            dtype=np.float64,
+        ).reshape(len(self.names), len(NUTRIENTS))
+
+        self.order = np.argsort(self.matrix, axis=0, kind="stable").T.copy()
+        self.sorted_values = np.take_along_axis(self.matrix, self.order.T, axis=0).T.copy()
+
+        spread = self.matrix.std(axis=0) if len(self.names) else np.ones(len(NUTRIENTS))
+        self.scale = np.where(spread > 0, spread, 1.0)
+        self.tree = KDTree(self.matrix / self.scale) if len(self.names) else None
+
+    def __len__(self):
+        return len(self.names)
+
+    def meal_totals(self, rows, grams, meal_ids, n_meals):
+        """Per-item and per-meal nutrients for a flat list of items.
+
+        rows, grams and meal_ids are parallel arrays (one entry per item).
+        The items are gathered from the matrix in one take, and all meal
+        totals come from a single (meals x items) weight matrix product.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        scale = np.asarray(grams, dtype=np.float64) / 100.0
+        gathered = self.matrix[rows]
+        per_item = gathered * scale[:, None]
+
+        weights = np.zeros((n_meals, len(rows)))
+        weights[np.asarray(meal_ids, dtype=np.int64), np.arange(len(rows))] = scale
+        return per_item, weights @ gathered
+
+    def _range(self, column, op, value):
+        """[start, end) positions in the column's sorted order that satisfy `op value`."""
+        values = self.sorted_values[column]
+        lo, hi = 0, len(values)
+        if op in (">", ">="):
+            lo = int(np.searchsorted(values, value, side="right" if op == ">" else "left"))
+        elif op in ("<", "<="):
+            hi = int(np.searchsorted(values, value, side="left" if op == "<" else "right"))
+        else:
+            lo = int(np.searchsorted(values, value, side="left"))
+            hi = int(np.searchsorted(values, value, side="right"))
+        return lo, hi
+
+    def query(self, predicates, sort_by=None, descending=False, limit=20):
+        """(rows, total matches) for [(nutrient, op, value)] conditions, all of which must hold.
+
+        The most selective condition picks the candidate rows straight from
+        its sorted index; the others are checked on those rows only.
+        """
+        ranges = {}
+        for nutrient, op, value in predicates:
+            column = NUTRIENTS.index(nutrient)
+            lo, hi = self._range(column, op, value)
+            old_lo, old_hi = ranges.get(column, (0, len(self.names)))
+            ranges[column] = (max(lo, old_lo), min(hi, old_hi))
+
+        if ranges:
+            column, (lo, hi) = min(ranges.items(), key=lambda item: item[1][1] - item[1][0])
+            rows = np.sort(self.order[column][lo:max(lo, hi)])
+            for other, (other_lo, other_hi) in ranges.items():
+                if other == column:
+                    continue
+                if other_hi <= other_lo:
+                    rows = rows[:0]
+                    break
+                # The conditions on one nutrient always select a closed interval of its values
+                values = self.matrix[rows, other]
+                rows = rows[(values >= self.sorted_values[other][other_lo]) &
+                            (values <= self.sorted_values[other][other_hi - 1])]
+        elif sort_by is not None and not descending:
+            # No conditions: the sort column's index already has every row in order
+            return self.order[NUTRIENTS.index(sort_by)][:limit], len(self.names)
+        else:
+            rows = np.arange(len(self.names))
+
+        total = len(rows)
+        if sort_by is not None and total:
+            values = self.matrix[rows, NUTRIENTS.index(sort_by)]
+            if descending:
+                values = -values
+            if total > limit:
+                # Keep everything up to the limit-th value (ties included), then sort just those
+                keep = values <= np.partition(values, limit - 1)[limit - 1]
+                rows, values = rows[keep], values[keep]
+            rows = rows[np.lexsort((rows, values))]
+        return rows[:limit], total
+
+    def similar(self, row, k=5):
+        """(rows, distances) of the k foods with the closest nutrient profile to `row`, itself excluded."""
+        if self.tree is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        count = min(k + 1, len(self.names))
+        distances, rows = self.tree.query(self.matrix[row:row + 1] / self.scale, k=count)
+        keep = rows[0] != row
+        return rows[0][keep][:k], distances[0][keep][:k]
+
+
+# ====================== RECIPE ESTIMATES ======================
+
+# Bump when the estimate changes, so build_recipe_nutrition.py recomputes every recipe
+ESTIMATE_VERSION = 1
+DEFAULT_SERVINGS = 4
+MAX_SERVINGS = 50
+# A single ingredient line can't plausibly weigh more than this
+MAX_LINE_GRAMS = 2000
+SERVINGS_RE = re.compile(r"\b(?:serves|servings?|makes|yields?)\s*:?\s*(\d+)", re.IGNORECASE)
+LIST_ITEM_RE = re.compile(r'"((?:[^"\\]|\\.)*)"|\'([^\']*)\'')
+
+
+def split_list(text):
+    """Items of a stored list such as '["1 c. sugar", "2 eggs"]'."""
+    if not isinstance(text, str):
+        return []
+    try:
+        items = json.loads(text)
+        if isinstance(items, list):
+            return [item for item in items if isinstance(item, str)]
+    except ValueError:
+        pass
+    return [a or b for a, b in LIST_ITEM_RE.findall(text)]
+
+
+class RecipeNutritionEstimator:
+    """Per-serving nutrition of a recipe from its ingredient lines and `ner` entities.
+
+    Each ingredient line is matched to a food of the database through the
+    longest `ner` entity it contains (or its own food text), and weighed with
+    parse_quantity/portion_grams. Lines without a known food are skipped and
+    reported through the coverage fraction.
+    """
+
+    def __init__(self, db):
+        self.matrix = NutrientMatrix(db)
+
+    def match_food(self, text):
+        """Row of the food named by text ("packed brown sugar" -> "brown sugar" or "sugar"), or None."""
+        words = re.findall(r"[a-z]+", text.lower())
+        for start in range(len(words)):
+            name = " ".join(words[start:])
+            for candidate in (name, name + "s", name[:-1] if name.endswith("s") else None,
+                              name[:-2] if name.endswith("es") else None):
+                if candidate and candidate in self.matrix.rows:
+                    return self.matrix.rows[candidate]
+        return None
+
+    def servings(self, directions):
+        match = SERVINGS_RE.search(directions) if isinstance(directions, str) else None
+        if match and 0 < int(match.group(1)) <= MAX_SERVINGS:
+            return int(match.group(1))
+        return DEFAULT_SERVINGS
+
+    def estimate(self, ingredients, ner, directions=None):
+        """(per-serving nutrient array in NUTRIENTS order, servings, fraction of lines matched)."""
+        lines = split_list(ingredients)
+        entities = sorted({e.strip().lower() for e in split_list(ner) if e.strip()}, key=len, reverse=True)
+        total = np.zeros(len(NUTRIENTS))
+        matched = 0
+        for line in lines:
+            text = line.lower()
+            row = None
+            for entity in entities:
+                if entity in text:
+                    row = self.match_food(entity)
+                    if row is not None:
+                        break
+            food, quantity, unit = parse_quantity(line)
+            if row is None:
+                row = self.match_food(food)
+            if row is None:
+                continue
+            grams = min(portion_grams(self.matrix.names[row], quantity, unit), MAX_LINE_GRAMS)
+            total += self.matrix.matrix[row] * grams / 100.0
+            matched += 1
+        servings = self.servings(directions)
+        return total / servings, servings, (matched / len(lines) if lines else 0.0)
+
+
+def nutrient_dict(values):
+    return {nutrient: round(float(value), 2) for nutrient, value in zip(NUTRIENTS, values)}
@@ -0,0 +1,166 @@
+"""Recipe -> allergy classes, joined once from the recipe and allergen tables."""
+import threading
+import weakref
+
+import numpy as np
+
+from search_index import normalize_ingredient, tokenize
+
+# Longest food name (in words) looked for inside an ingredient
+MAX_FOOD_WORDS = 4
+# Allergen table columns whose words can name an allergy class in exclude_allergens
+DESCRIPTOR_COLUMNS = ['allergy', 'food', 'type', 'group']
+
+
+def words(text):
+    return {normalize_ingredient(word) for word in tokenize(text)}
+
+
+class RecipeAllergens:
+    """Per-recipe bitmask of the allergy classes its ingredients fall under.
+
+    Every ingredient in the recipe model's IngredientIndex vocabulary is
+    matched against the allergen table's foods: a run of its words naming a
+    food ("peanut" in "peanut butter") gives it that food's allergy class.
+    Ingredient masks are OR-ed per recipe once, so excluding allergens during
+    a search is one AND over the candidate rows.
+    """
+
+    def __init__(self, ingredients, allergen_df):
+        foods = {}
+        self.descriptors = []
+        columns = [allergen_df[name].tolist() for name in DESCRIPTOR_COLUMNS]
+        for allergy, food, *rest in zip(*columns):
+            if not isinstance(allergy, str) or not isinstance(food, str):
+                continue
+            allergy = allergy.strip().lower()
+            foods.setdefault(normalize_ingredient(food), set()).add(allergy)
+            described = set()
+            for text in (allergy, food, *rest):
+                if isinstance(text, str):
+                    described |= words(text)
+            self.descriptors.append((described, allergy))
+
+        self.classes = sorted({allergy for classes in foods.values() for allergy in classes})
+        self.bits = {allergy: i for i, allergy in enumerate(self.classes)}
+        self.n_words = max(1, (len(self.classes) + 63) // 64)
+
+        term_masks = np.zeros((len(ingredients.terms), self.n_words), dtype=np.uint64)
+        for term_id, term in enumerate(ingredients.terms):
+            tokens = term.split()
+            for size in range(1, min(MAX_FOOD_WORDS, len(tokens)) + 1):
+                for start in range(len(tokens) - size + 1):
+                    for allergy in foods.get(normalize_ingredient(" ".join(tokens[start:start + size])), ()):
+                        bit = self.bits[allergy]
+                        term_masks[term_id, bit // 64] |= np.uint64(1 << (bit % 64))
+
+        self.term_masks = term_masks
+        self.masks = np.zeros((ingredients.n_docs, self.n_words), dtype=np.uint64)
+        # reduceat only over recipes with ingredients: an empty recipe's start
+        # equals the next one's, and clamping trailing ones would cut the last
+        # non-empty recipe short
+        filled = ingredients.sizes > 0
+        if filled.any():
+            starts = ingredients.doc_offsets[:-1][filled]
+            self.masks[filled] = np.bitwise_or.reduceat(term_masks[ingredients.doc_terms], starts, axis=0)
+
+    def resolve(self, names):
+        """(exclusion mask, allergy classes it covers, names that match no class) for exclude_allergens.
+
+        A name matches the classes whose allergen rows mention all of its
+        words, so "nuts" covers "nut allergy" and "dairy" covers the allergy
+        of every dairy food.
+        """
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        classes, unknown = set(), []
+        for name in names:
+            wanted = words(name)
+            found = {allergy for described, allergy in self.descriptors if wanted and wanted <= described}
+            if not found:
+                unknown.append(name)
+            classes |= found
+        for allergy in classes:
+            bit = self.bits[allergy]
+            mask[bit // 64] |= np.uint64(1 << (bit % 64))
+        return mask, sorted(classes), unknown
+
+    def allows(self, docs, mask):
+        """Boolean array: which of docs contain none of the classes in mask."""
+        return ~(self.masks[docs] & mask).any(axis=1)
+
+    def excluded_terms(self, mask):
+        """Ids of the ingredients falling under any of the classes in mask."""
+        return np.flatnonzero((self.term_masks & mask).any(axis=1))
+
+
+class ShardedRecipeAllergens:
+    """RecipeAllergens of every shard of a ShardedRecipeModel, addressed by global row.
+
+    The allergy classes come from the allergen table alone, so every shard
+    numbers them the same way and one mask works for all of them.
+    """
+
+    def __init__(self, model, allergen_df):
+        self.parts = [RecipeAllergens(shard.ingredients, allergen_df) for shard in model.shards]
+        self.offsets = model.offsets
+        self.classes = self.parts[0].classes
+
+    def resolve(self, names):
+        return self.parts[0].resolve(names)
+
+    def allows(self, docs, mask):
+        docs = np.asarray(docs, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, docs, side="right") - 1
+        allowed = np.empty(len(docs), dtype=bool)
+        for shard in np.unique(shard_ids):
+            picked = shard_ids == shard
+            allowed[picked] = self.parts[shard].allows(docs[picked] - self.offsets[shard], mask)
+        return allowed
+
+
+class AllergenFilter:
+    """allowed= filter (see BM25Index.top_k) dropping recipes with any of the allergy classes in mask.
+
+    A sharded search can't ship this object to its worker processes, so it
+    sends each shard the ids of the ingredients to avoid instead
+    (shard_terms), which IngredientIndex.without turns back into a filter.
+    """
+
+    def __init__(self, join, mask):
+        self.join = join
+        self.mask = mask
+
+    def __call__(self, docs):
+        return self.join.allows(docs, self.mask)
+
+    def shard_terms(self, shard):
+        return self.join.parts[shard].excluded_terms(self.mask)
+
+
+class RecipeAllergenCache:
+    """Keeps the RecipeAllergens of the current recipe and allergen models.
+
+    Rebuilt whenever either model object is replaced; the models are held
+    weakly, like ResultCache's namespace owners.
+    """
+
+    def __init__(self):
+        self._owners = (None, None)
+        self._join = None
+        self._lock = threading.Lock()
+
+    def get(self, recipe_model, allergen_model):
+        sharded = hasattr(recipe_model, 'shards')
+        if allergen_model is None or (not sharded and getattr(recipe_model, 'ingredients', None) is None):
+            return None
+        with self._lock:
+            recipe_ref, allergen_ref = self._owners
+            if recipe_ref is not None and recipe_ref() is recipe_model and allergen_ref() is allergen_model:
+                return self._join
+            if sharded:
+                join = ShardedRecipeAllergens(recipe_model, allergen_model.df)
+            else:
+                join = RecipeAllergens(recipe_model.ingredients, allergen_model.df)
+            self._owners = (weakref.ref(recipe_model), weakref.ref(allergen_model))
+            self._join = join
+            return join
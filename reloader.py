@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def active_file(paths):
+    """The first of `paths` that exists: the one the loader reads, as paths are listed in its order of preference."""
+    return next((path for path in paths if os.path.exists(path)), None)
+
+
+def files_version(paths):
+    """Short hex id of the model file the loader reads (see active_file), or None if there is none.
+
+    Only that file counts, so touching a fallback (the .pkl next to a .cols
+    export) changes nothing. Columnar metadata (meta.json, shards.json)
+    carries a checksum of the data, which identifies the export without
+    reading it. Any other file, or an export older than the checksums, is
+    identified by its size and mtime; its contents are never read.
+    """
+    path = active_file(paths)
+    if path is None:
+        return None
+    digest = hashlib.blake2b(os.path.basename(path).encode("utf-8") + b"\0", digest_size=8)
+    checksums = None
+    if path.endswith(".json"):
+        with open(path) as f:
+            meta = json.load(f)
+        shards = meta.get("shards")
+        checksums = [shard.get("checksum") for shard in shards] if shards else [meta.get("checksum")]
+    if checksums and all(checksums):
+        digest.update("\0".join(checksums).encode("utf-8"))
+    else:
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+class ModelReloader:
+    """Rebuilds models in the background and swaps them into the shared `models` dict.
+
+    A reload runs the model's loader (which also builds or maps its indexes)
+    on a background thread, stamps the result with a version derived from
+    the export it reads (see files_version; the same in every worker, and
+    across restarts) and then replaces the entry in `models` with a single dict
+    assignment.
+    Request handlers read `models[name]` once at the start, so requests
+    already running keep using the old object until they finish.
+
+    Each gunicorn worker holds its own `models`; an HTTP reload only reaches
+    the worker that served it, while watch() (polling the model files) makes
+    every worker pick up a new export on its own.
+    """
+
+    def __init__(self, models, loaders):
+        # loaders: name -> (function returning a new model or None,
+        #                   [model files, in the order the function prefers them])
+        self.models = models
+        self.loaders = loaders
+        self.versions = {}
+        self.loads = {}
+        self.status = {}
+        # Called as listener(name, model) on the reload thread after each swap
+        self.listeners = []
+        self._locks = {name: threading.Lock() for name in loaders}
+        self._signatures = {name: self._signature(name) for name in loaders}
+        for name in loaders:
+            if models.get(name) is not None:
+                self._stamp(name, models[name], self._version(name))
+            self.status[name] = {"state": "idle", "error": None, "loaded_at": time.time()}
+
+    def _version(self, name):
+        _, paths = self.loaders[name]
+        return files_version(paths)
+
+    def _stamp(self, name, model, version):
+        self.versions[name] = version
+        self.loads[name] = self.loads.get(name, 0) + 1
+        model.version = version
+
+    def _signature(self, name):
+        _, paths = self.loaders[name]
+        path = active_file(paths)
+        return (path, os.stat(path).st_mtime_ns) if path else None
+
+    def reload(self, name, wait=False):
+        """Start rebuilding `name`; returns False if a reload of it is already running."""
+        if name not in self.loaders:
+            raise KeyError(name)
+        lock = self._locks[name]
+        if not lock.acquire(blocking=False):
+            return False
+        self.status[name] = dict(self.status[name], state="loading", error=None)
+        thread = threading.Thread(target=self._build, args=(name, lock), name=f"reload-{name}", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def _build(self, name, lock):
+        loader, _ = self.loaders[name]
+        started = time.time()
+        signature = self._signature(name)
+        try:
+            # Taken before loading, like the signature: files replaced meanwhile trigger another reload
+            version = self._version(name)
+            model = loader()
+            if model is None:
+                raise FileNotFoundError(f"No model files found for '{name}'")
+            self._stamp(name, model, version)
+            self.models[name] = model
+            self._signatures[name] = signature
+            self.status[name] = {"state": "idle", "error": None, "loaded_at": time.time(),
+                                 "load_seconds": round(time.time() - started, 3)}
+            print(f"✅ Reloaded {name} model (version {model.version})")
+            for listener in self.listeners:
+                try:
+                    listener(name, model)
+                except Exception as e:
+                    print(f"❌ Reload listener failed for {name}: {e}")
+        except Exception as e:
+            # Remember the files anyway so the watcher doesn't retry a broken export forever
+            self._signatures[name] = signature
+            self.status[name] = dict(self.status[name], state="failed", error=str(e))
+            print(f"❌ Reloading {name} model failed, keeping version {self.versions.get(name)}: {e}")
+        finally:
+            lock.release()
+
+    def info(self):
+        return {
+            name: dict(self.status[name], version=self.versions.get(name), loads=self.loads.get(name, 0))
+            for name in self.loaders
+        }
+
+    def check(self):
+        """Reload every model whose files changed since they were last loaded."""
+        for name in self.loaders:
+            if self._signature(name) != self._signatures[name]:
+                self.reload(name)
+
+    def watch(self, interval):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check()
+                except Exception as e:
+                    print(f"❌ Model watcher error: {e}")
+
+        thread = threading.Thread(target=loop, name="model-watcher", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,560 @@
+import bisect
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+# Characters that make pandas' str.contains treat the query as a real regex.
+# Queries containing any of them are answered by the original scan instead.
+REGEX_CHARS = set(".^$*+?{}[]\\|()")
+
+# Joins the searchable columns of a row so a substring can never span two columns
+FIELD_SEP = "\x1f"
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def is_plain_query(query):
+    return not any(ch in REGEX_CHARS for ch in query)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def lowered_columns(df, columns):
+    """Lower-cased text of `columns`, missing values as empty strings."""
+    return [df[col].fillna("").astype(str).str.lower() for col in columns]
+
+
+def row_haystacks(df, columns):
+    """Lower-cased, separator-joined text of `columns` for every row of `df`."""
+    parts = [values.tolist() for values in lowered_columns(df, columns)]
+    return [FIELD_SEP.join(values) for values in zip(*parts)]
+
+
+def scan(columns, query):
+    """Positions of the rows where any of the lowered `columns` contains `query` (a regex unless plain)."""
+    mask = np.zeros(len(columns[0]) if columns else 0, dtype=bool)
+    regex = not is_plain_query(query)
+    for values in columns:
+        mask |= np.asarray(values.str.contains(query, regex=regex), dtype=bool)
+    return np.flatnonzero(mask)
+
+
+def scan_many(df, columns, queries):
+    """{query: scan() result, or the exception its pattern raised} with the table lowered once.
+
+    Plain queries are tested against each row's joined haystack, one
+    substring check per row instead of one str.contains per column.
+    """
+    plain = [query for query in queries if is_plain_query(query)]
+    patterns = [query for query in queries if not is_plain_query(query)]
+    results = {}
+    if plain:
+        haystacks = row_haystacks(df, columns)
+        for query in plain:
+            results[query] = np.fromiter((r for r, text in enumerate(haystacks) if query in text), dtype=np.int64)
+    if patterns:
+        lowered = lowered_columns(df, columns)
+        for query in patterns:
+            try:
+                results[query] = scan(lowered, query)
+            except Exception as e:
+                results[query] = e
+    return results
+
+
+def find_sorted(vocabulary, term, lo=0):
+    """bisect_left over a sorted list, or a sorted columnar.StringColumn without decoding it."""
+    if hasattr(vocabulary, "searchsorted"):
+        return vocabulary.searchsorted(term, lo=lo)
+    return bisect.bisect_left(vocabulary, term, lo)
+
+
+class TrigramIndex:
+    """Character trigram -> row id inverted index over a list of strings.
+
+    Postings are kept CSR-style (one flat int32 array plus per-trigram
+    offsets) so the whole index is a handful of NumPy arrays.
+    """
+
+    N = 3
+
+    def __init__(self, docs):
+        self.docs = docs
+        postings = {}
+        for row, doc in enumerate(docs):
+            for gram in {doc[i:i + self.N] for i in range(len(doc) - self.N + 1)}:
+                postings.setdefault(gram, []).append(row)
+
+        # Sorted trigrams, looked up by binary search, so a saved index needs no dict rebuilt on load
+        self.grams = sorted(postings)
+        offsets = [0]
+        flat = []
+        for gram in self.grams:
+            flat.extend(postings[gram])
+            offsets.append(len(flat))
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.postings = np.asarray(flat, dtype=np.int32)
+
+    def to_arrays(self):
+        return {"docs": self.docs, "grams": self.grams, "offsets": self.offsets, "postings": self.postings}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        for name in ("docs", "grams", "offsets", "postings"):
+            setattr(index, name, arrays[name])
+        return index
+
+    def __len__(self):
+        return len(self.docs)
+
+    def span(self, gram):
+        """(start, end) of a trigram's postings, or None if no row has it."""
+        i = find_sorted(self.grams, gram)
+        if i == len(self.grams) or self.grams[i] != gram:
+            return None
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def grams_of(self, query):
+        return {query[i:i + self.N] for i in range(len(query) - self.N + 1)}
+
+    def intersect(self, spans):
+        """Rows in every one of the postings `spans`, binary searched from the shortest list."""
+        spans = sorted(spans, key=lambda bounds: bounds[1] - bounds[0])
+        rows = self.postings[spans[0][0]:spans[0][1]]
+        for start, end in spans[1:]:
+            if not len(rows):
+                break
+            posting = self.postings[start:end]
+            pos = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+            rows = rows[posting[pos] == rows]
+        return rows
+
+    def candidates(self, query):
+        """Rows that contain every trigram of `query`, or None if it is too short to filter."""
+        if len(query) < self.N:
+            return None
+        spans = [self.span(gram) for gram in self.grams_of(query)]
+        if None in spans:
+            return self.postings[:0]
+        return self.intersect(spans)
+
+    def _verify(self, query, rows):
+        if rows is None:
+            rows = range(len(self.docs))
+        elif len(query) == self.N:
+            # A row holding the query's only trigram holds the query
+            return rows.astype(np.int64)
+        else:
+            rows = rows.tolist()
+        docs = self.docs
+        return np.fromiter((r for r in rows if query in docs[r]), dtype=np.int64)
+
+    def search(self, query):
+        """Sorted row ids whose text contains `query` as a literal substring."""
+        return self._verify(query, self.candidates(query))
+
+    def search_many(self, queries):
+        """search() for each of `queries`, looking up every distinct trigram of the batch once."""
+        gram_sets = [self.grams_of(query) for query in queries]
+        spans = {gram: self.span(gram) for gram in set().union(*gram_sets)}
+        results = []
+        for query, grams in zip(queries, gram_sets):
+            if len(query) < self.N:
+                rows = None
+            elif any(spans[gram] is None for gram in grams):
+                rows = self.postings[:0]
+            else:
+                rows = self.intersect([spans[gram] for gram in grams])
+            results.append(self._verify(query, rows))
+        return results
+
+
+def expand_token(vocabulary, token, limit):
+    """The token itself if the sorted `vocabulary` has it, else the `limit` shortest terms it prefixes."""
+    lo = find_sorted(vocabulary, token)
+    if lo < len(vocabulary) and vocabulary[lo] == token:
+        return [token]
+    hi = find_sorted(vocabulary, token + "\uffff", lo)
+    if hasattr(vocabulary, "offsets"):
+        # Terms are ASCII tokens, so byte lengths are their lengths
+        lengths = np.diff(vocabulary.offsets[lo:hi + 1])
+    else:
+        lengths = [len(vocabulary[j]) for j in range(lo, hi)]
+    shortest = np.argsort(lengths, kind="stable")[:limit]
+    return [vocabulary[lo + int(j)] for j in shortest]
+
+
+def expand_query(vocabulary, query, limit):
+    """Distinct vocabulary terms a query searches for, each token expanded by expand_token."""
+    terms = []
+    for token in dict.fromkeys(tokenize(query)):
+        terms.extend(expand_token(vocabulary, token, limit))
+    return list(dict.fromkeys(terms))
+
+
+class BM25Index:
+    """BM25F-style ranked index over several weighted text fields.
+
+    Every term keeps two views of the same postings: impact-ordered (best
+    partial score first), which drives the top-k loop, and doc-ordered, which
+    gives random access to a document's score for that term. top_k() walks the
+    impact-ordered lists a block at a time and stops as soon as the k-th best
+    score seen can no longer be beaten by anything further down the lists.
+    """
+
+    BLOCK = 256
+    MAX_EXPANSIONS = 10
+    # Longest total postings a query may have to be scored exhaustively in top_k_many
+    BATCH_POSTINGS = 1 << 12
+
+    def __init__(self, fields, weights, k1=1.2, b=0.75, stats=None):
+        columns = list(fields.values())
+        n_docs = len(columns[0]) if columns else 0
+        self.n_docs = n_docs
+
+        tf = {}
+        doc_len = np.zeros(n_docs, dtype=np.float64)
+        for name, texts in fields.items():
+            weight = weights[name]
+            for doc, text in enumerate(texts):
+                tokens = tokenize(text) if isinstance(text, str) else []
+                doc_len[doc] += weight * len(tokens)
+                for term, count in Counter(tokens).items():
+                    postings = tf.setdefault(term, {})
+                    postings[doc] = postings.get(doc, 0.0) + weight * count
+
+        # A shard scores with the whole corpus' statistics (see corpus_stats),
+        # so its scores compare directly with every other shard's.
+        if stats is not None:
+            total_docs, avg_len, doc_freq = stats["n_docs"], stats["avg_len"], stats["doc_freq"]
+        else:
+            total_docs = n_docs
+            avg_len = doc_len.mean() if n_docs and doc_len.mean() > 0 else 1.0
+            doc_freq = {term: len(postings) for term, postings in tf.items()}
+        norm = k1 * (1 - b + b * doc_len / avg_len)
+
+        self.terms = sorted(tf)
+        offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        impact_docs, impact_scores, docs_sorted, scores_sorted = [], [], [], []
+        for i, term in enumerate(self.terms):
+            postings = tf[term]
+            docs = np.fromiter(postings.keys(), dtype=np.int32, count=len(postings))
+            wtf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            df = doc_freq[term]
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            scores = (idf * wtf * (k1 + 1) / (wtf + norm[docs])).astype(np.float32)
+
+            by_impact = np.argsort(-scores, kind="stable")
+            impact_docs.append(docs[by_impact])
+            impact_scores.append(scores[by_impact])
+            by_doc = np.argsort(docs, kind="stable")
+            docs_sorted.append(docs[by_doc])
+            scores_sorted.append(scores[by_doc])
+            offsets[i + 1] = offsets[i] + len(docs)
+
+        def flat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        self.offsets = offsets
+        self.impact_docs = flat(impact_docs, np.int32)
+        self.impact_scores = flat(impact_scores, np.float32)
+        self.docs_sorted = flat(docs_sorted, np.int32)
+        self.scores_sorted = flat(scores_sorted, np.float32)
+
+    ARRAYS = ("terms", "offsets", "impact_docs", "impact_scores", "docs_sorted", "scores_sorted")
+
+    @staticmethod
+    def corpus_stats(fields, weights):
+        """Document count, average weighted length and document frequencies of a whole corpus."""
+        columns = list(fields.values())
+        n_docs = len(columns[0]) if columns else 0
+        total_len = 0.0
+        doc_freq = Counter()
+        for doc in range(n_docs):
+            terms = set()
+            for name, texts in fields.items():
+                text = texts[doc]
+                tokens = tokenize(text) if isinstance(text, str) else []
+                total_len += weights[name] * len(tokens)
+                terms.update(tokens)
+            doc_freq.update(terms)
+        avg_len = total_len / n_docs if n_docs and total_len > 0 else 1.0
+        return {"n_docs": n_docs, "avg_len": avg_len, "doc_freq": doc_freq}
+
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays["n_docs"] = np.array([self.n_docs], dtype=np.int64)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index.n_docs = int(arrays["n_docs"][0])
+        return index
+
+    def lookup(self, term):
+        """Term id of a vocabulary term, or None."""
+        i = find_sorted(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return i
+        return None
+
+    def query_terms(self, query, terms=None):
+        """Term ids for a query, or for its already expanded `terms` (see expand_query)."""
+        if terms is None:
+            terms = expand_query(self.terms, query, self.MAX_EXPANSIONS)
+        ids = (self.lookup(term) for term in terms)
+        return [term_id for term_id in ids if term_id is not None]
+
+    def _score(self, term, docs):
+        start, end = self.offsets[term], self.offsets[term + 1]
+        sorted_docs = self.docs_sorted[start:end]
+        pos = np.searchsorted(sorted_docs, docs)
+        pos[pos == len(sorted_docs)] = 0
+        hit = sorted_docs[pos] == docs if len(sorted_docs) else np.zeros(len(docs), dtype=bool)
+        return np.where(hit, self.scores_sorted[start:end][pos], 0.0)
+
+    def top_k(self, query, k, allowed=None, terms=None):
+        """(doc ids, scores) of the k best documents for `query`, best first; equal scores go to the lower id.
+
+        allowed, if given, maps an array of doc ids to a boolean array; docs
+        it rejects are skipped as they come up, before scoring. terms, if
+        given, are the query's terms already expanded against a larger
+        vocabulary (a shard searched with the whole corpus' expansions).
+        """
+        return self._top_k(self.query_terms(query, terms), k, allowed)
+
+    def _top_k(self, terms, k, allowed):
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+        if not terms or k <= 0:
+            return empty
+
+        starts = [int(self.offsets[t]) for t in terms]
+        ends = [int(self.offsets[t + 1]) for t in terms]
+        cursor = list(starts)
+        best_docs = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float64)
+        seen = set()
+
+        while True:
+            block = []
+            for j, term in enumerate(terms):
+                if cursor[j] < ends[j]:
+                    stop = min(cursor[j] + self.BLOCK, ends[j])
+                    block.append(self.impact_docs[cursor[j]:stop])
+                    cursor[j] = stop
+            if not block:
+                break
+
+            candidates = np.unique(np.concatenate(block)).astype(np.int64)
+            if seen:
+                candidates = candidates[[d not in seen for d in candidates.tolist()]]
+            if len(candidates):
+                seen.update(candidates.tolist())
+                if allowed is not None:
+                    candidates = candidates[allowed(candidates)]
+            if len(candidates):
+                scores = np.zeros(len(candidates), dtype=np.float64)
+                for term in terms:
+                    scores += self._score(term, candidates)
+                best_docs = np.concatenate([best_docs, candidates])
+                best_scores = np.concatenate([best_scores, scores])
+                if len(best_docs) > k:
+                    keep = np.lexsort((best_docs, -best_scores))[:k]
+                    best_docs, best_scores = best_docs[keep], best_scores[keep]
+
+            # Nothing not yet seen can score above the sum of the next postings' impacts.
+            # An unseen doc scoring exactly that could still win a tie on its id, hence ">".
+            threshold = sum(
+                float(self.impact_scores[cursor[j]]) for j in range(len(terms)) if cursor[j] < ends[j]
+            )
+            if len(best_docs) == k and best_scores.min() > threshold:
+                break
+
+        order = np.lexsort((best_docs, -best_scores))
+        return best_docs[order], best_scores[order].astype(np.float32)
+
+    def top_k_many(self, queries, k, allowed=None, terms=None):
+        """top_k() for each of `queries` (and of `terms`, one list or None per query).
+
+        Queries whose postings hold at most BATCH_POSTINGS entries in all are
+        scored together: their doc-ordered postings are read once, summed
+        per (query, doc) by one np.unique/np.bincount and ranked by one
+        lexsort. Queries with longer postings keep top_k()'s early stop.
+        """
+        if terms is None:
+            terms = [None] * len(queries)
+        term_ids = [self.query_terms(query, expanded) for query, expanded in zip(queries, terms)]
+        results = [None] * len(queries)
+        batched = []
+        for q, ids in enumerate(term_ids):
+            size = sum(int(self.offsets[t + 1] - self.offsets[t]) for t in ids)
+            if ids and k > 0 and size <= self.BATCH_POSTINGS:
+                batched.append(q)
+            else:
+                results[q] = self._top_k(ids, k, allowed)
+        if not batched:
+            return results
+
+        # Postings are concatenated query by query and term by term, so each
+        # (query, doc) sum adds its terms in the same order as top_k()
+        spans = [(q, int(self.offsets[t]), int(self.offsets[t + 1])) for q in batched for t in term_ids[q]]
+        owners = np.repeat([q for q, _, _ in spans], [end - start for _, start, end in spans]).astype(np.int64)
+        docs = np.concatenate([self.docs_sorted[start:end] for _, start, end in spans]).astype(np.int64)
+        scores = np.concatenate([self.scores_sorted[start:end] for _, start, end in spans]).astype(np.float64)
+        keys, inverse = np.unique(owners * self.n_docs + docs, return_inverse=True)
+        sums = np.bincount(inverse, weights=scores, minlength=len(keys))
+        owners, docs = keys // self.n_docs, keys % self.n_docs
+        if allowed is not None and len(docs):
+            keep = allowed(docs)
+            owners, docs, sums = owners[keep], docs[keep], sums[keep]
+
+        order = np.lexsort((docs, -sums, owners))
+        owners, docs, sums = owners[order], docs[order], sums[order]
+        starts = np.searchsorted(owners, batched, side="left")
+        ends = np.searchsorted(owners, batched, side="right")
+        for q, start, end in zip(batched, starts, np.minimum(ends, starts + k)):
+            results[q] = docs[start:end], sums[start:end].astype(np.float32)
+        return results
+
+
+# Items of a stored ingredient list such as '["brown sugar", "milk"]'
+QUOTED_RE = re.compile(r'"([^"]*)"|\'([^\']*)\'')
+
+
+def normalize_ingredient(name):
+    """Lower-cased words of an ingredient name with a plural last word made singular ("Eggs" -> "egg")."""
+    words = tokenize(name)
+    if not words:
+        return ""
+    last = words[-1]
+    if last.endswith("ies") and len(last) > 4:
+        last = last[:-3] + "y"
+    elif last.endswith("oes") and len(last) > 4:
+        last = last[:-2]
+    elif last.endswith("s") and not last.endswith("ss") and len(last) > 3:
+        last = last[:-1]
+    return " ".join(words[:-1] + [last])
+
+
+def parse_ingredients(text):
+    """Normalized ingredient names from a recipe's `ner` text (a list literal, or comma separated)."""
+    if not isinstance(text, str):
+        return []
+    items = [a or b for a, b in QUOTED_RE.findall(text)] or text.split(",")
+    return [name for name in map(normalize_ingredient, items) if name]
+
+
+class IngredientIndex:
+    """Ingredient -> recipes postings, and each recipe's own ingredient list, for pantry coverage ranking.
+
+    Both directions are CSR arrays over one sorted ingredient vocabulary.
+    rank() only touches the postings of the ingredients the user has, so the
+    cost follows how common those ingredients are, not the number of recipes.
+    """
+
+    ARRAYS = ("terms", "offsets", "postings", "doc_offsets", "doc_terms")
+
+    def __init__(self, ingredient_lists):
+        postings = {}
+        n_docs = 0
+        for doc, text in enumerate(ingredient_lists):
+            for name in dict.fromkeys(parse_ingredients(text)):
+                postings.setdefault(name, []).append(doc)
+            n_docs = doc + 1
+
+        self.terms = sorted(postings)
+        lengths = np.fromiter((len(postings[t]) for t in self.terms), dtype=np.int64, count=len(self.terms))
+        self.offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        flat = [postings[t] for t in self.terms]
+        self.postings = np.concatenate(flat).astype(np.int32) if flat else np.zeros(0, dtype=np.int32)
+
+        # Invert the postings into per-recipe ingredient id lists
+        term_ids = np.repeat(np.arange(len(self.terms), dtype=np.int32), lengths)
+        by_doc = np.argsort(self.postings, kind="stable")
+        self.doc_terms = term_ids[by_doc]
+        self.doc_offsets = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.postings, minlength=n_docs), out=self.doc_offsets[1:])
+        self.sizes = np.diff(self.doc_offsets)
+
+    def to_arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        index = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(index, name, arrays[name])
+        index.sizes = np.diff(index.doc_offsets)
+        return index
+
+    @property
+    def n_docs(self):
+        return len(self.doc_offsets) - 1
+
+    def lookup(self, name):
+        """Term id of a normalized ingredient name, or None."""
+        i = find_sorted(self.terms, name)
+        if i < len(self.terms) and self.terms[i] == name:
+            return i
+        return None
+
+    def rank(self, term_ids, k, max_missing=None, allowed=None):
+        """(docs, matched counts, missing counts) of the k recipes needing the fewest other ingredients.
+
+        Ties go to the recipe using more of the given ingredients, then to the
+        lower row. Recipes using none of them, or rejected by `allowed` (see
+        BM25Index.top_k), are never returned.
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        parts = [self.postings[self.offsets[t]:self.offsets[t + 1]] for t in sorted(set(term_ids))]
+        total = sum(len(part) for part in parts)
+        if not total or k <= 0:
+            return empty, empty, empty
+
+        hits = np.concatenate(parts)
+        if total > self.n_docs // 8:
+            # Common ingredients: one counting pass beats sorting the hits
+            counts = np.bincount(hits, minlength=self.n_docs)
+            docs = np.flatnonzero(counts)
+            matched = counts[docs]
+        else:
+            docs, matched = np.unique(hits, return_counts=True)
+        docs = docs.astype(np.int64)
+        matched = matched.astype(np.int64)
+        missing = self.sizes[docs] - matched
+        keep = np.ones(len(docs), dtype=bool)
+        if max_missing is not None:
+            keep &= missing <= max_missing
+        if allowed is not None:
+            keep &= allowed(docs)
+        docs, matched, missing = docs[keep], matched[keep], missing[keep]
+        if not len(docs):
+            return empty, empty, empty
+
+        # One sortable int64 key: fewest missing, then most matched, then row
+        width = int(self.sizes.max()) + 1
+        key = (missing * width + (width - matched)) * self.n_docs + docs
+        top = np.argpartition(key, k - 1)[:k] if len(key) > k else np.arange(len(key))
+        top = top[np.argsort(key[top])]
+        return docs[top], matched[top], missing[top]
+
+    def without(self, term_ids):
+        """allowed= filter (see BM25Index.top_k) rejecting the recipes that use any of term_ids."""
+        parts = [self.postings[self.offsets[t]:self.offsets[t + 1]] for t in term_ids]
+        banned = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+        return lambda docs: ~np.isin(docs, banned)
+
+    def missing(self, doc, term_ids):
+        """Names of the recipe's ingredients that are not among term_ids."""
+        have = set(term_ids)
+        start, end = self.doc_offsets[doc], self.doc_offsets[doc + 1]
+        return [self.terms[int(t)] for t in self.doc_terms[start:end] if int(t) not in have]
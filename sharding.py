@@ -0,0 +1,272 @@
+"""Recipe corpus split into on-disk shards, searched in parallel by a process pool.
+
+A sharded export is a directory holding shards.json and one columnar
+RecipeSearchModel export per shard (shard-000.cols, ...), each covering a
+contiguous range of rows. Every shard's BM25 index is built with the whole
+corpus' statistics, and query prefixes are expanded once against the whole
+corpus' vocabulary (a sorted, memory-mapped string column next to the
+manifest) before the shards are asked, so
+every shard scores the same terms with the same weights and merging the
+per-shard top-k by score gives the global top-k.
+
+The serving process only memory-maps the shards (to read the rows it
+returns); the searches themselves run in a pool of worker processes that
+open the shards they are asked about, also memory-mapped.
+"""
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import columnar
+from model import RecipeSearchModel
+from search_index import BM25Index, expand_query, normalize_ingredient
+
+MANIFEST = "shards.json"
+FORMAT_VERSION = 3
+# Sorted terms of the whole corpus, saved with columnar.write_strings
+VOCABULARY = "vocabulary"
+
+
+def write_shards(frame, path, n_shards):
+    """Split a recipe frame (DataFrame or MappedFrame) into n_shards exports under the directory `path`."""
+    n_rows = len(frame)
+    n_shards = max(1, min(n_shards, n_rows))
+    column = frame.column if hasattr(frame, "column") else frame.__getitem__
+    fields = {name: list(column(name)) for name in RecipeSearchModel.FIELD_WEIGHTS}
+    stats = BM25Index.corpus_stats(fields, RecipeSearchModel.FIELD_WEIGHTS)
+
+    tmp = path.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    bounds = np.linspace(0, n_rows, n_shards + 1).astype(np.int64)
+    shards = []
+    for i in range(n_shards):
+        start, end = int(bounds[i]), int(bounds[i + 1])
+        part = frame.iloc[start:end].reset_index(drop=True)
+        name = f"shard-{i:03d}.cols"
+        RecipeSearchModel(part, bm25_stats=stats).save(os.path.join(tmp, name))
+        checksum = columnar.read_meta(os.path.join(tmp, name))["checksum"]
+        shards.append({"path": name, "start": start, "rows": end - start, "checksum": checksum})
+        print(f"  ✅ {name}: rows {start}-{end}")
+    columnar.write_strings(tmp, VOCABULARY, sorted(stats["doc_freq"]))
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump({"format": FORMAT_VERSION, "n_rows": n_rows, "shards": shards}, f)
+
+    old = path.rstrip(os.sep) + ".old"
+    if os.path.exists(path):
+        os.rename(path, old)
+    os.rename(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+# ====================== WORKERS ======================
+# Shards opened by this worker process: path -> (export mtime, model)
+_open_shards = {}
+
+
+def _shard(path):
+    mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+    cached = _open_shards.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, RecipeSearchModel.load(path, mmap=True))
+        _open_shards[path] = cached
+    return cached[1]
+
+
+def in_worker(task, path, *args):
+    """Run task on the shard at path, opened (once) in this worker process."""
+    return task(_shard(path), *args)
+
+
+def shard_filter(model, excluded):
+    """The allowed= filter of a shard given the ingredient ids it must avoid (None: no filter)."""
+    return None if excluded is None else model.ingredients.without(excluded)
+
+
+def search_shard(model, queries, k, use_index, excluded):
+    """[(local rows, scores or None)] of one shard for each (query, expanded terms)."""
+    allowed = shard_filter(model, excluded)
+    texts, terms = [query for query, _ in queries], [expanded for _, expanded in queries]
+    return model.find_many(texts, k, use_index, allowed, terms)
+
+
+def cook_with_shard(model, pantry, k, max_missing, excluded):
+    """RecipeSearchModel.cook_with() on one shard, rows local to it."""
+    return model.cook_with(pantry, k, max_missing, shard_filter(model, excluded))
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """The process pool with `workers` processes, started on first use in this process."""
+    with _pools_lock:
+        key = (os.getpid(), workers)
+        if key not in _pools:
+            _pools[key] = ProcessPoolExecutor(max_workers=workers)
+        return _pools[key]
+
+
+# ====================== SERVING ======================
+class ShardedRows:
+    """EncodedRows over global row numbers, reading each row from its shard's pre-encoded rows."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def row(self, i, extra=()):
+        shard, local = self.model.locate(i)
+        return self.model.shards[shard].rows.row(local, extra)
+
+    def join(self, rows, extras=None):
+        if extras is None:
+            extras = [()] * len(rows)
+        return b"[" + b",".join(self.row(i, extra) for i, extra in zip(rows, extras)) + b"]"
+
+    def lines(self, rows, extras=None):
+        if extras is None:
+            extras = [()] * len(rows)
+        for i, extra in zip(rows, extras):
+            yield self.row(i, extra) + b"\n"
+
+
+class ShardedRecipeModel:
+    """The ranked-search side of RecipeSearchModel over a sharded export.
+
+    workers=0 searches the shards one after another in this process, which
+    is handy for small corpora and tests.
+    """
+
+    NO_RESULTS = RecipeSearchModel.NO_RESULTS
+    NO_PANTRY_RESULTS = RecipeSearchModel.NO_PANTRY_RESULTS
+    version = 0
+
+    def __init__(self, path, workers=None):
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") not in (1, 2, FORMAT_VERSION):
+            raise ValueError(f"Unsupported shard format {manifest.get('format')!r} in {path}")
+        self.path = path
+        self.workers = workers
+        self.use_index = True
+        self.shard_paths = [os.path.join(path, shard["path"]) for shard in manifest["shards"]]
+        self.shards = [RecipeSearchModel.load(shard_path, mmap=True) for shard_path in self.shard_paths]
+        self.offsets = np.array([shard["start"] for shard in manifest["shards"]] + [manifest["n_rows"]], dtype=np.int64)
+        if manifest["format"] == FORMAT_VERSION:
+            self.vocabulary = columnar.read_strings(path, VOCABULARY, mmap=True)
+        else:
+            # Format 2 keeps the vocabulary in the manifest; format 1 has none, but the union of the shards' is the same
+            self.vocabulary = manifest.get("vocabulary") or sorted(set().union(*(shard.index.terms for shard in self.shards)))
+        self.rows = ShardedRows(self)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    @property
+    def result_columns(self):
+        return self.shards[0].result_columns
+
+    def locate(self, row):
+        shard = int(np.searchsorted(self.offsets, row, side="right")) - 1
+        return shard, int(row - self.offsets[shard])
+
+    def _excluded(self, allowed):
+        """Per shard, the ingredient ids an AllergenFilter excludes (None each without a filter)."""
+        if allowed is None:
+            return [None] * len(self.shards)
+        if not hasattr(allowed, "shard_terms"):
+            raise TypeError("A sharded corpus only filters rows with a recipe_allergens.AllergenFilter")
+        return [allowed.shard_terms(i) for i in range(len(self.shards))]
+
+    def _fan_out(self, task, *args, excluded):
+        """[task(shard, *args, that shard's excluded ids)] for every shard, in the worker pool if there is one."""
+        if not self.workers:
+            return [task(shard, *args, ids) for shard, ids in zip(self.shards, excluded)]
+        pool = get_pool(self.workers)
+        futures = [pool.submit(in_worker, task, path, *args, ids) for path, ids in zip(self.shard_paths, excluded)]
+        return [future.result() for future in futures]
+
+    def find_many(self, queries, top_n=5, use_index=None, allowed=None):
+        """[(global rows, scores or None)] for each query, merged from every shard's top_n."""
+        queries = [query.lower().strip() for query in queries]
+        if use_index is None:
+            use_index = self.use_index
+        expanded = [expand_query(self.vocabulary, query, BM25Index.MAX_EXPANSIONS) for query in queries]
+        per_shard = self._fan_out(search_shard, list(zip(queries, expanded)), top_n, use_index,
+                                  excluded=self._excluded(allowed))
+
+        results = []
+        for q in range(len(queries)):
+            rows = np.concatenate([np.asarray(per_shard[s][q][0], dtype=np.int64) + self.offsets[s]
+                                   for s in range(len(self.shards))])
+            if not use_index:
+                # The scan returns rows in table order; shards are in table order too
+                results.append((rows[:top_n], None))
+                continue
+            scores = np.concatenate([per_shard[s][q][1] for s in range(len(self.shards))])
+            best = np.lexsort((rows, -scores))[:top_n]
+            results.append((rows[best], scores[best]))
+        return results
+
+    def find(self, query, top_n=5, use_index=None, allowed=None):
+        return self.find_many([query], top_n, use_index, allowed)[0]
+
+    def cook_with(self, pantry, top_n=5, max_missing=None, allowed=None):
+        """RecipeSearchModel.cook_with() over every shard, merged with the same ordering as IngredientIndex.rank."""
+        per_shard = self._fan_out(cook_with_shard, pantry, top_n, max_missing, excluded=self._excluded(allowed))
+        rows, matched, missing = [], [], []
+        for s, (shard_rows, shard_matched, shard_missing, _, _) in enumerate(per_shard):
+            rows.append(np.asarray(shard_rows, dtype=np.int64) + self.offsets[s])
+            matched.append(np.asarray(shard_matched, dtype=np.int64))
+            missing.extend(shard_missing)
+        rows, matched = np.concatenate(rows), np.concatenate(matched)
+        n_missing = np.array([len(names) for names in missing], dtype=np.int64)
+        best = np.lexsort((rows, -matched, n_missing))[:top_n]
+
+        names = list(dict.fromkeys(filter(None, map(normalize_ingredient, pantry))))
+        used = set().union(*(shard_known for _, _, _, shard_known, _ in per_shard))
+        known = [name for name in names if name in used]
+        unknown = [name for name in names if name not in used]
+        return rows[best], matched[best], [missing[i] for i in best], known, unknown
+
+    def take(self, rows):
+        """The result columns of the given global rows, in that order, as a DataFrame."""
+        rows = np.asarray(rows, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, rows, side="right") - 1
+        parts, positions = [], []
+        for shard in np.unique(shard_ids):
+            picked = np.flatnonzero(shard_ids == shard)
+            local = rows[picked] - self.offsets[shard]
+            parts.append(self.shards[shard].df.iloc[local][self.result_columns])
+            positions.append(picked)
+        frame = pd.concat(parts, ignore_index=True)
+        return frame.iloc[np.argsort(np.concatenate(positions))].reset_index(drop=True)
+
+    def search(self, query, top_n=5, use_index=None, allowed=None):
+        rows, scores = self.find(query, top_n, use_index, allowed)
+        if not len(rows):
+            return self.NO_RESULTS
+        results = self.take(rows)
+        if scores is not None:
+            results['score'] = scores.astype(float).round(4)
+        return results
+
+    def search_many(self, queries, top_n=5, use_index=None, allowed=None):
+        """Search several queries with one task per shard; returns {query: DataFrame or message}."""
+        queries = list(dict.fromkeys(q.lower().strip() for q in queries))
+        results = {}
+        for query, (rows, scores) in zip(queries, self.find_many(queries, top_n, use_index, allowed)):
+            if not len(rows):
+                results[query] = self.NO_RESULTS
+                continue
+            frame = self.take(rows)
+            if scores is not None:
+                frame['score'] = scores.astype(float).round(4)
+            results[query] = frame
+        return results
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+
+
+class FlightTimeout(TimeoutError):
+    """Raised to a caller that waited longer than the timeout for another caller's result."""
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one computation per key at a time; identical concurrent calls share its outcome.
+
+    The first caller for a key (the leader) runs the function. Callers that
+    arrive while it runs wait for it, up to `timeout` seconds, and get the
+    same return value or the same exception. Nothing is kept once the call
+    finishes; remembering results is ResultCache's job.
+
+    Only threading primitives are used, which gevent's monkey patching turns
+    into cooperative ones, so this works with threaded and gevent workers.
+    """
+
+    def __init__(self, timeout=10.0):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def do(self, key, fn):
+        """(fn's result, whether it came from another caller's run)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.value = fn()
+            except BaseException as e:
+                call.error = e
+                with self._lock:
+                    self.errors += 1
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.value, False
+
+        if not call.done.wait(self.timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise FlightTimeout(f"Timed out after {self.timeout}s waiting for an identical request")
+        if call.error is not None:
+            raise call.error
+        with self._lock:
+            self.shared += 1
+        return call.value, True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "leaders": self.leaders,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "timeout": self.timeout,
+            }
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines on one event loop.
+
+    The leader's coroutine runs as its own task, so a caller that goes away
+    (a client disconnecting) doesn't cancel the work others are waiting for.
+    """
+
+    def __init__(self, timeout=10.0):
+        self.timeout = timeout
+        self._calls = {}
+        self.leaders = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _finished(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    async def do(self, key, fn):
+        """(await fn()'s result, whether it came from another caller's run)."""
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finished(key, done))
+            self.leaders += 1
+            return await asyncio.shield(task), False
+
+        try:
+            value = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise FlightTimeout(f"Timed out after {self.timeout}s waiting for an identical request") from None
+        self.shared += 1
+        return value, True
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "shared": self.shared,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "timeout": self.timeout,
+        }
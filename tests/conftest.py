@@ -0,0 +1,38 @@
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from benchmarks.tables import allergen_table, make_words, recipe_table  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def words():
+    return make_words(random.Random(7), 300)
+
+
+@pytest.fixture(scope="session")
+def allergen_df(words):
+    return allergen_table(random.Random(1), 2000, words)
+
+
+@pytest.fixture(scope="session")
+def recipe_df(words):
+    return recipe_table(random.Random(2), 1500, words)
+
+
+@pytest.fixture
+def small_allergen_df():
+    return pd.DataFrame({
+        "class": ["Plant origin", "Animal origin", "Plant origin", "Animal origin"],
+        "type": ["Cereal grain and pulse", "Dairy", "Cereal grain and pulse", "Seafood"],
+        "group": ["Pulse", "Dairy", "Cereal", "Shellfish"],
+        "food": ["Peanut", "Milk", "Wheat", "Shrimp"],
+        "allergy": ["Peanut allergy", "Lactose intolerance", "Gluten allergy", "Shellfish allergy"],
+    }, dtype=object)
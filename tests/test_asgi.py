@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import asgi
+import backend
+
+
+def call(path, body, on_send=None):
+    """(response start message, body messages) of one request through asgi.app."""
+    scope = {"type": "http", "method": "POST", "path": path, "headers": [(b"content-type", b"application/json")]}
+    request = [{"type": "http.request", "body": json.dumps(body).encode()}]
+    sent = []
+
+    async def receive():
+        return request.pop(0)
+
+    async def send(message):
+        sent.append(message)
+        if on_send:
+            on_send(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0], sent[1:]
+
+
+@pytest.fixture
+def chunk_rows(monkeypatch):
+    monkeypatch.setattr(backend, "STREAM_CHUNK_ROWS", 2)
+    backend.result_cache.clear()
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/predict_allergen", {"text": "a", "stream": True}),
+    ("/recommend_recipes", {"query": "chicken", "top_n": 7, "stream": True}),
+])
+def test_stream_matches_flask(chunk_rows, path, body):
+    start, messages = call(path, body)
+    flask = backend.app.test_client().post(path, json=body)
+    assert start["status"] == flask.status_code == 200
+    assert dict(start["headers"])[b"x-result-count"] == flask.headers["X-Result-Count"].encode()
+    assert b"".join(message["body"] for message in messages) == flask.data
+    assert [message.get("more_body", False) for message in messages] == [True] * (len(messages) - 1) + [False]
+
+
+def test_stream_sends_each_chunk_as_it_is_encoded(chunk_rows, monkeypatch):
+    drawn = []
+    row_chunks = backend.row_chunks
+
+    def counted(*args):
+        for chunk in row_chunks(*args):
+            drawn.append(chunk)
+            yield chunk
+    monkeypatch.setattr(backend, "row_chunks", counted)
+
+    sent_after = []
+    _, messages = call("/predict_allergen", {"text": "a", "stream": True},
+                       lambda message: sent_after.append(len(drawn)) if message.get("body") else None)
+    assert len(messages) > 3
+    # The n-th chunk leaves before the (n+1)-th is encoded
+    assert sent_after == list(range(1, len(messages)))
+
+
+def test_exclusions_are_resolved_off_the_event_loop(monkeypatch):
+    threads = []
+    get = backend.recipe_allergens.get
+
+    def recorded(*args):
+        threads.append(threading.current_thread().name)
+        return get(*args)
+    monkeypatch.setattr(backend.recipe_allergens, "get", recorded)
+    backend.result_cache.clear()
+
+    body = {"query": "chicken", "exclude_allergens": ["peanut"]}
+    start, messages = call("/recommend_recipes", body)
+    flask = backend.app.test_client().post("/recommend_recipes", json=body)
+    assert start["status"] == flask.status_code == 200
+    assert threads[0].startswith("search")
@@ -0,0 +1,172 @@
+import pandas as pd
+import pytest
+
+import backend
+from model import RecipeSearchModel
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(backend, "ADMIN_TOKEN", "secret")
+    backend.result_cache.clear()
+    return backend.app.test_client()
+
+
+def test_reload_drops_cached_responses(client):
+    first = client.post("/predict_allergen", json={"text": "peanut"})
+    assert first.headers["X-Cache"] == "MISS"
+    assert client.post("/predict_allergen", json={"text": "peanut"}).headers["X-Cache"] == "HIT"
+
+    reloaded = client.post("/admin/reload", json={"model": "allergen", "wait": True},
+                           headers={"X-Admin-Token": "secret"})
+    assert reloaded.status_code == 202
+    after = client.post("/predict_allergen", json={"text": "peanut"})
+    assert after.headers["X-Cache"] == "MISS"
+    # Same files, same version
+    assert after.json["model_version"] == first.json["model_version"]
+
+
+@pytest.mark.parametrize("token", [None, "", "wrong", "secret2"])
+def test_admin_requires_the_token(client, token):
+    headers = {"X-Admin-Token": token} if token is not None else {}
+    assert client.get("/admin/models", headers=headers).status_code == 403
+
+
+@pytest.mark.parametrize("body", [{"model": ["allergen"]}, {"model": 3}, ["allergen"]])
+def test_admin_reload_rejects_malformed_models(client, body):
+    response = client.post("/admin/reload", json=body, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 400
+
+
+def test_admin_reload_rejects_unknown_models(client):
+    response = client.post("/admin/reload", json={"model": "nope"}, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 400
+
+
+def test_nutrition_batch_matches_single_lookups(client):
+    texts = ["apple", "Banana ", "chiken breast", "bananna", "apple", "zzzzzz"]
+    batch = client.post("/predict_nutrition/batch", json={"texts": texts}).json["results"]
+    assert len(batch) == len(texts)
+    for text, result in zip(texts, batch):
+        single = client.post("/predict_nutrition", json={"text": text}).json
+        assert result == single, text
+
+
+@pytest.mark.parametrize("path, field, single_path, single_field, extra", [
+    ("/predict_allergen/batch", "texts", "/predict_allergen", "text", {}),
+    ("/recommend_recipes/batch", "queries", "/recommend_recipes", "query", {"top_n": 2}),
+])
+def test_search_batches_match_single_requests(client, path, field, single_path, single_field, extra):
+    items = ["milk", "Peanut", "dummy", "zzzzzz", "recipe"]
+    batch = client.post(path, json=dict(extra, **{field: items})).json["results"]
+    for item, result in zip(items, batch):
+        assert result == client.post(single_path, json=dict(extra, **{single_field: item})).json, item
+
+
+@pytest.mark.parametrize("body", [None, {}, {"texts": "milk"}, {"texts": []}, {"texts": ["milk"] * 101}])
+def test_batch_rejects_malformed_bodies(client, body):
+    assert client.post("/predict_allergen/batch", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("path, field", [
+    ("/predict_allergen/batch", "texts"),
+    ("/predict_nutrition/batch", "texts"),
+    ("/recommend_recipes/batch", "queries"),
+])
+def test_batch_results_follow_the_request_order(client, path, field):
+    items = ["milk", 123, "123", None, "  ", "milk", ["x"]]
+    response = client.post(path, json={field: items})
+    assert response.status_code == 200
+    results = response.json["results"]
+    assert response.json["count"] == len(results) == len(items)
+    for position in (1, 3, 6):
+        assert results[position] == {"error": "Query must be a string"}
+    assert results[4] == {"error": "Empty query"}
+    assert "error" not in results[2]
+    assert results[0] == results[5]
+
+
+def test_meal_nutrition_adds_up_its_items(client):
+    meal = client.post("/meal_nutrition", json={"text": "2 large eggs, 150g rice, 1 T butter, 1 xyzzy"}).json
+    assert [(item["food"], item["grams"]) for item in meal["items"]] == [("egg", 100), ("rice", 150), ("butter", 15)]
+    assert meal["unmatched"] == ["xyzzy"]
+    for nutrient, total in meal["total"].items():
+        assert total == pytest.approx(sum(item["nutrition"][nutrient] for item in meal["items"]), abs=0.05)
+
+    both = client.post("/meal_nutrition", json={"meals": ["2 large eggs", [{"food": "rice", "grams": 150}]]}).json
+    assert both["count"] == 2
+    assert both["meals"][0]["total"] == meal["items"][0]["nutrition"]
+    assert both["meals"][1]["total"] == meal["items"][1]["nutrition"]
+
+
+@pytest.mark.parametrize("top_n", [0, 101, True, "5", 2.5])
+def test_recommend_rejects_bad_top_n(client, top_n):
+    response = client.post("/recommend_recipes", json={"query": "recipe", "top_n": top_n})
+    assert response.status_code == 400
+
+
+def test_recommend_returns_scored_recipes(client):
+    recipes = client.post("/recommend_recipes", json={"query": "dummy", "top_n": 3}).json
+    assert recipes["top_n"] == 3
+    assert recipes["count"] == len(recipes["recipes"]) >= 1
+    scores = [recipe["score"] for recipe in recipes["recipes"]]
+    assert scores == sorted(scores, reverse=True) and scores[0] > 0
+
+
+@pytest.fixture
+def pantry_client(client, monkeypatch):
+    df = pd.DataFrame({
+        "title": ["Omelette", "Pancakes", "Fried Rice", "Toast"],
+        "ingredients": ["[]"] * 4,
+        "directions": ["[]"] * 4,
+        "link": ["#"] * 4,
+        "ner": ['["eggs", "butter"]', '["eggs", "flour", "milk", "sugar"]', '["rice", "eggs", "peas"]', '["bread"]'],
+    }, dtype=object)
+    monkeypatch.setitem(backend.models, "recipe", RecipeSearchModel(df))
+    return client
+
+
+def test_pantry_ranks_by_fewest_missing_ingredients(pantry_client):
+    body = {"ingredients": ["Eggs", "rice", "butter", "saffron"], "top_n": 5}
+    response = pantry_client.post("/recommend_recipes/by_ingredients", json=body).json
+    assert [recipe["title"] for recipe in response["recipes"]] == ["Omelette", "Fried Rice", "Pancakes"]
+    assert [(r["matched"], r["missing"], r["coverage"]) for r in response["recipes"]] == [
+        (2, [], 1.0), (2, ["pea"], 0.6667), (1, ["flour", "milk", "sugar"], 0.25)]
+    assert (response["ingredients"], response["unknown"]) == (["egg", "rice", "butter"], ["saffron"])
+
+    limited = pantry_client.post("/recommend_recipes/by_ingredients", json=dict(body, max_missing=1)).json
+    assert [recipe["title"] for recipe in limited["recipes"]] == ["Omelette", "Fried Rice"]
+    nothing = pantry_client.post("/recommend_recipes/by_ingredients", json={"ingredients": ["saffron"]}).json
+    assert "recipes" not in nothing and nothing["unknown"] == ["saffron"]
+
+
+@pytest.mark.parametrize("body", [{}, {"ingredients": []}, {"ingredients": "eggs"}, {"ingredients": [1]},
+                                  {"ingredients": ["eggs"], "max_missing": -1}])
+def test_pantry_rejects_bad_requests(pantry_client, body):
+    assert pantry_client.post("/recommend_recipes/by_ingredients", json=body).status_code == 400
+
+
+def test_foods_query_and_similar(client):
+    found = client.post("/foods/query", json={"where": "protein > 20 and fat < 5", "sort_by": "protein",
+                                              "descending": True, "limit": 3}).json
+    proteins = [food["nutrition"]["protein"] for food in found["foods"]]
+    assert found["count"] == len(proteins) <= 3 and found["total"] >= found["count"]
+    assert proteins == sorted(proteins, reverse=True) and all(protein > 20 for protein in proteins)
+    assert all(food["nutrition"]["fat"] < 5 for food in found["foods"])
+
+    similar = client.post("/foods/similar", json={"food": "chiken breast", "k": 3}).json
+    assert (similar["food"], similar["corrected"], similar["count"]) == ("chicken breast", True, 3)
+    assert "chicken breast" not in [food["food"] for food in similar["similar"]]
+    distances = [food["distance"] for food in similar["similar"]]
+    assert distances == sorted(distances)
+
+
+@pytest.mark.parametrize("path, body, status", [
+    ("/foods/query", {"where": "sugar < 5"}, 400),
+    ("/foods/query", {"where": "protein > 1", "sort_by": "sugar"}, 400),
+    ("/foods/query", {"limit": 0}, 400),
+    ("/foods/similar", {"food": "apple", "k": 0}, 400),
+    ("/foods/similar", {"food": "xyzzy"}, 404),
+])
+def test_food_endpoints_reject_bad_requests(client, path, body, status):
+    assert client.post(path, json=body).status_code == status
@@ -0,0 +1,58 @@
+import json
+from collections import Counter
+
+from benchmarks import compare, micro, replay
+from benchmarks.workloads import load_log, synthetic
+
+
+def test_load_log_reads_request_records(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"method": "post", "path": "/predict_allergen", "json": {"text": "milk"}}),
+        json.dumps({"endpoint": "/recommend_recipes", "body": {"query": "soup"}}),
+        json.dumps({"path": "/metrics"}),
+        "not json",
+        json.dumps({"path": "no-slash"}),
+        "",
+    ]))
+    assert load_log(str(path)) == [
+        ("POST", "/predict_allergen", {"text": "milk"}),
+        ("POST", "/recommend_recipes", {"query": "soup"}),
+        ("GET", "/metrics", None),
+    ]
+
+
+def test_synthetic_traffic_is_skewed_and_repeatable():
+    vocabularies = {"/predict_allergen": ["milk", "egg", "soy", "fish"], "/recommend_recipes": ["soup"]}
+    requests = synthetic(vocabularies, 2000, seed=3, mix={"/predict_allergen": 3, "/recommend_recipes": 1})
+    assert requests == synthetic(vocabularies, 2000, seed=3, mix={"/predict_allergen": 3, "/recommend_recipes": 1})
+    endpoints = Counter(path for _, path, _ in requests)
+    assert endpoints["/predict_allergen"] > 2 * endpoints["/recommend_recipes"]
+    queries = Counter(body["text"] for _, path, body in requests if path == "/predict_allergen")
+    assert [query for query, _ in queries.most_common()] == ["milk", "egg", "soy", "fish"]
+
+
+def test_replay_and_compare(tmp_path):
+    before, after = str(tmp_path / "before.json"), tmp_path / "after.json"
+    assert replay.main(["--synthetic", "60", "--warmup", "0", "--output", before]) == 0
+    results = compare.load(before)
+    assert results["kind"] == "replay"
+    assert results["results"]["_all"]["count"] == 60
+    assert all(set(summary["statuses"]) == {"200"}
+               for path, summary in results["results"].items() if path != "_all")
+
+    assert compare.main([before, before]) == 0
+    slower = dict(results, results={key: dict(summary, p95_ms=summary["p95_ms"] * 2 + 1)
+                                    for key, summary in results["results"].items()})
+    after.write_text(json.dumps(slower))
+    assert compare.main([before, str(after)]) == 1
+
+
+def test_micro_runs_every_benchmark(tmp_path):
+    output = str(tmp_path / "micro.json")
+    assert micro.main(["--sizes", "200", "--repeat", "3", "--scan-repeat", "2", "--output", output]) == 0
+    results = compare.load(output)["results"]
+    assert set(results) == {f"{name}/200" for name in [
+        "allergen_search/index", "allergen_search/scan", "recipe_search/bm25", "recipe_search/scan",
+        "nutrition_lookup/exact", "nutrition_lookup/correct", "nutrition_lookup/autocomplete"]}
+    assert all(summary["count"] > 0 for summary in results.values())
@@ -0,0 +1,85 @@
+import os
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import build_recipe_nutrition
+from build_recipe_nutrition import ResultStore, VALUE_COLUMNS, build
+from food_data import food_nutrition_db
+from model import RecipeSearchModel
+
+CHUNK_SIZE = 8
+
+
+@pytest.fixture
+def export(tmp_path):
+    rng = random.Random(3)
+    foods = sorted(food_nutrition_db)
+    rows = []
+    for i in range(60):
+        items = rng.sample(foods, rng.randint(2, 6))
+        rows.append({
+            "title": f"Recipe {i}",
+            "ingredients": str([f"{rng.randint(1, 3)} cup {food}" for food in items]),
+            "directions": str([f"Serves {rng.randint(1, 6)}."]),
+            "link": f"example.com/{i}",
+            "ner": str(items),
+        })
+    path = str(tmp_path / "recipe_model.cols")
+    RecipeSearchModel(pd.DataFrame(rows, dtype=object)).save(path)
+    return path
+
+
+def estimated(capsys):
+    """How many recipes the last build() estimated, from its progress output."""
+    return int(re.search(r"(\d+) recipes to estimate", capsys.readouterr().out).group(1))
+
+
+def test_resume_estimates_only_missing_recipes(export, tmp_path, capsys):
+    work_dir = str(tmp_path / "work")
+    full = build(export, workers=2, chunk_size=CHUNK_SIZE, work_dir=work_dir)
+    assert estimated(capsys) == 60
+    assert full[:, 0].all()
+    store = ResultStore(work_dir)
+    parts = store.parts()
+    assert len(parts) == 8
+
+    # An interrupted run: some chunks never finished, one died while being written
+    lost = 0
+    for path in parts[::3]:
+        with np.load(path) as part:
+            lost += len(part["hashes"])
+        os.remove(path)
+    with open(os.path.join(work_dir, "part-0-0.npz.tmp"), "wb") as f:
+        f.write(b"PK\x03\x04 truncated")
+
+    resumed = build(export, workers=2, chunk_size=CHUNK_SIZE, work_dir=work_dir)
+    assert estimated(capsys) == lost
+    np.testing.assert_array_equal(resumed, full)
+
+    # Everything is stored now, and the estimates written to the export don't change the hashes
+    again = build(export, workers=2, chunk_size=CHUNK_SIZE, work_dir=work_dir)
+    assert estimated(capsys) == 0
+    np.testing.assert_array_equal(again, full)
+
+    model = RecipeSearchModel.load(export)
+    for i, name in enumerate(VALUE_COLUMNS):
+        np.testing.assert_array_equal(np.asarray(model.df[name], dtype=np.float64), full[:, i].round(2))
+
+
+def test_compaction_keeps_current_recipes(export, tmp_path, capsys, monkeypatch):
+    work_dir = str(tmp_path / "work")
+    full = build(export, workers=1, chunk_size=CHUNK_SIZE, work_dir=work_dir)
+    store = ResultStore(work_dir)
+    # A recipe that has since left the corpus
+    store.write(np.array([12345], dtype=np.uint64), np.ones((1, len(VALUE_COLUMNS))))
+
+    monkeypatch.setattr(build_recipe_nutrition, "COMPACT_PARTS", 2)
+    compacted = build(export, workers=1, chunk_size=CHUNK_SIZE, work_dir=work_dir)
+    np.testing.assert_array_equal(compacted, full)
+    assert len(store.parts()) == 1
+    hashes, _ = store.load()
+    assert len(hashes) == 60 and 12345 not in hashes
@@ -0,0 +1,74 @@
+import gc
+
+import pytest
+
+import cache
+from cache import ResultCache
+
+
+class Model:
+    pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_the_ttl(clock):
+    results, model = ResultCache(max_size=10, ttl=5), Model()
+    assert results.get("a", model, "q") is None
+    results.put("a", model, "q", b"body")
+    clock[0] += 4.9
+    assert results.get("a", model, "q") == b"body"
+    clock[0] += 0.2
+    assert results.get("a", model, "q") is None
+    stats = results.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["size"]) == (1, 2, 1, 0)
+
+
+def test_least_recently_used_entries_are_evicted_first(clock):
+    results, model = ResultCache(max_size=3, ttl=60), Model()
+    results.get("a", model, "q0")
+    for i in range(3):
+        results.put("a", model, f"q{i}", i)
+    assert results.get("a", model, "q0") == 0  # q1 is now the oldest
+    results.put("a", model, "q3", 3)
+    assert [results.get("a", model, f"q{i}") for i in range(4)] == [0, None, 2, 3]
+    assert results.stats()["evictions"] == 1
+
+
+def test_a_new_model_drops_only_its_namespace(clock):
+    results, old, new, other = ResultCache(max_size=10, ttl=60), Model(), Model(), Model()
+    results.get("a", old, "q")
+    results.put("a", old, "q", b"old")
+    results.get("b", other, "q")
+    results.put("b", other, "q", b"other")
+
+    assert results.get("a", new, "q") is None
+    # A search that started on the old model finishes after the swap
+    results.put("a", old, "q", b"old")
+    assert results.get("a", new, "q") is None
+    assert results.get("b", other, "q") == b"other"
+    assert results.stats()["invalidations"] == 1
+
+
+def test_owner_is_held_weakly(clock):
+    results, model = ResultCache(max_size=10, ttl=60), Model()
+    results.get("a", model, "q")
+    results.put("a", model, "q", b"body")
+    del model
+    gc.collect()
+    # The cache alone doesn't keep a replaced model alive, and its entries go with it
+    assert results._owners["a"]() is None
+    assert results.get("a", Model(), "q") is None
+
+
+def test_a_zero_size_cache_stores_nothing(clock):
+    results, model = ResultCache(max_size=0, ttl=60), Model()
+    results.get("a", model, "q")
+    results.put("a", model, "q", b"body")
+    assert results.get("a", model, "q") is None
+    assert results.stats()["size"] == 0
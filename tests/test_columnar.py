@@ -0,0 +1,75 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import columnar
+from model import AllergenModel, RecipeSearchModel
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "name": pd.Series(["milk", None, "crème brûlée", ""], dtype=object),
+        "count": np.array([1, 2, 3, 4], dtype=np.int64),
+        "weight": np.array([0.5, np.nan, 2.0, 1e9]),
+    })
+
+
+def test_round_trip(frame, tmp_path):
+    path = str(tmp_path / "frame.cols")
+    columnar.save(path, frame, arrays={"ids": np.arange(3, dtype=np.int32), "words": ["a", "bé"]}, extra={"k": 1})
+    for mmap in (True, False):
+        meta, loaded, arrays = columnar.load(path, mmap=mmap)
+        pd.testing.assert_frame_equal(loaded.to_frame(), frame)
+        assert loaded.iloc[[3, 1]]["name"].tolist() == ["", None]
+        assert arrays["ids"].tolist() == [0, 1, 2] and arrays["words"].tolist() == ["a", "bé"]
+        assert (meta["n_rows"], meta["extra"]) == (4, {"k": 1})
+    assert sorted(os.listdir(tmp_path)) == ["frame.cols"]
+
+
+def test_checksum_identifies_the_data(frame, tmp_path):
+    first, second, changed = (str(tmp_path / name) for name in ("a.cols", "b.cols", "c.cols"))
+    columnar.save(first, frame)
+    columnar.save(second, frame)
+    columnar.save(changed, frame.assign(count=[1, 2, 3, 5]))
+    checksums = [columnar.read_meta(path)["checksum"] for path in (first, second, changed)]
+    assert checksums[0] == checksums[1] != checksums[2]
+
+    # It covers every data file, not the meta.json written after it
+    os.remove(os.path.join(first, columnar.META_FILE))
+    assert columnar.checksum(first) == checksums[0]
+
+
+def test_saving_over_an_export_replaces_it(frame, tmp_path):
+    path = str(tmp_path / "frame.cols")
+    columnar.save(path, frame)
+    columnar.save(path, frame.iloc[:2])
+    _, loaded, _ = columnar.load(path)
+    assert len(loaded) == 2
+    assert sorted(os.listdir(tmp_path)) == ["frame.cols"]
+
+
+def test_unknown_formats_are_refused(frame, tmp_path):
+    path = str(tmp_path / "frame.cols")
+    columnar.save(path, frame)
+    meta = columnar.read_meta(path)
+    meta["format"] = columnar.FORMAT_VERSION + 1
+    with open(os.path.join(path, columnar.META_FILE), "w") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError):
+        columnar.load(path)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_models_search_the_same_after_export(allergen_df, recipe_df, words, tmp_path, mmap):
+    allergen, recipes = AllergenModel(allergen_df), RecipeSearchModel(recipe_df)
+    allergen.save(str(tmp_path / "allergen.cols"))
+    recipes.save(str(tmp_path / "recipes.cols"))
+    loaded_allergen = AllergenModel.load(str(tmp_path / "allergen.cols"), mmap=mmap)
+    loaded_recipes = RecipeSearchModel.load(str(tmp_path / "recipes.cols"), mmap=mmap)
+    for query in words[:30] + [word[:3] for word in words[30:60]]:
+        assert loaded_allergen.search(query).equals(allergen.search(query)), query
+        assert loaded_recipes.search(query, 5).equals(recipes.search(query, 5)), query
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from benchmarks.tables import food_names, misspell
+from food_data import food_nutrition_db
+from food_index import FoodIndex, edit_distance
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FoodIndex(food_nutrition_db)
+
+
+@pytest.mark.parametrize("typo, name", [
+    ("chiken breast", "chicken breast"),
+    ("chicken brest", "chicken breast"),
+    ("chikcen breast", "chicken breast"),
+    ("brocoli", "broccoli"),
+    ("bananna", "banana"),
+    ("salmn", "salmon"),
+])
+def test_corrects_typos(index, typo, name):
+    assert index.correct(typo) == name
+
+
+def test_known_names_and_nonsense(index):
+    assert index.correct("egg") == "egg"
+    assert index.correct("xyzzy") is None
+
+
+def test_suggest_matches_brute_force(words):
+    rng = random.Random(3)
+    names = food_names(rng, 3000, words)
+    index = FoodIndex(names)
+    for name in rng.sample(names, 100):
+        typo = misspell(rng, name)
+        budget = index.max_distance(typo)
+        expected = min((edit_distance(typo, other, budget), other) for other in names)
+        suggestions = index.suggest(typo, limit=50)
+        if len(typo.split()) != len(name.split()):
+            continue  # a typo merging or splitting words isn't corrected
+        assert (name, edit_distance(typo, name, budget)) in suggestions
+        assert suggestions[0][1] == expected[0]
+
+
+def test_corrects_on_large_tables(words):
+    # Latency on large tables is checked by benchmarks/micro.py --check
+    rng = random.Random(4)
+    names = food_names(rng, 50000, words) + ["cooked chicken breast"]
+    index = FoodIndex(names)
+    assert index.correct("cooked chikcen breast") == "cooked chicken breast"
+    assert index.correct("cooked chicken breast") == "cooked chicken breast"
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import jsonify
+
+import backend
+import columnar
+from json_rows import EncodedRows, encode_value, score_fields
+from model import AllergenModel, RecipeSearchModel
+
+
+@pytest.fixture
+def tricky_df():
+    return pd.DataFrame({
+        "title": ['Say "cheese"', 'a,"link":"x"', "café ☃", "back\\slash"],
+        "link": ["#", "", "{\"k\": 1}", "\n\t"],
+        "number": [1, 2, 3, 4],
+    }, dtype=object)
+
+
+def jsonified(payload):
+    with backend.app.app_context():
+        return jsonify(payload).data
+
+
+def test_rows_are_encoded_like_jsonify(tricky_df):
+    rows = EncodedRows.build(tricky_df)
+    expected = jsonified(tricky_df.to_dict(orient="records"))
+    assert rows.join(range(len(tricky_df))) + b"\n" == expected
+    assert b"".join(rows.lines(range(4))) == b"".join(jsonified(row) for row in tricky_df.to_dict(orient="records"))
+
+
+@pytest.mark.parametrize("extra", [
+    {"score": 1.5},
+    {"aaa": None},
+    {"zzz": [1, "two"]},
+    {"coverage": 0.5, "matched": 2, "missing": ["egg"], "title0": "x"},
+])
+def test_extra_fields_are_merged_in_key_order(tricky_df, extra):
+    rows = EncodedRows.build(tricky_df)
+    pairs = [(name.encode(), encode_value(value)) for name, value in extra.items()]
+    for i, row in enumerate(tricky_df.to_dict(orient="records")):
+        assert json.loads(rows.row(i, pairs)) == dict(row, **extra)
+        assert rows.row(i, pairs) + b"\n" == jsonified(dict(row, **extra))
+
+
+def test_missing_values_become_null():
+    rows = EncodedRows.build(pd.DataFrame({"a": ["x", None], "b": [1.0, np.nan]}, dtype=object))
+    assert rows.row(1) == b'{"a":null,"b":null}'
+
+
+def test_recipe_body_matches_the_jsonify_payload(recipe_df, words):
+    model = RecipeSearchModel(recipe_df)
+    for query in words[:20]:
+        rows, scores = model.find(query, 5)
+        if not len(rows):
+            continue
+        body = backend.rows_body(model, rows, "recipes", score_fields(scores), top_n=5)
+        assert body == jsonified(backend.recipe_payload(model.search(query, 5), 5, model.version)), query
+
+
+def test_allergen_body_matches_the_jsonify_payload(small_allergen_df):
+    model = AllergenModel(small_allergen_df)
+    for query in ["peanut", "milk", "allergy"]:
+        body = backend.rows_body(model, model.find(query), "result")
+        assert body == jsonified(backend.allergen_payload(model.search(query), model.version)), query
+
+
+def test_exports_with_an_older_row_encoding_are_reencoded(small_allergen_df, tmp_path):
+    model = AllergenModel(small_allergen_df)
+    arrays = model._index_arrays()
+    arrays["rows_json"] = [json.dumps(row, sort_keys=True)[:-1] for row in small_allergen_df.to_dict(orient="records")]
+    path = str(tmp_path / "allergen_model.cols")
+    columnar.save(path, small_allergen_df, arrays=arrays, model="AllergenModel")
+
+    loaded = AllergenModel.load(path)
+    assert loaded.rows.join(range(4)) == model.rows.join(range(4))
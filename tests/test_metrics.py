@@ -0,0 +1,61 @@
+import time
+
+import pytest
+from prometheus_client.parser import text_string_to_metric_families
+
+import backend
+import metrics
+
+
+@pytest.fixture
+def client():
+    backend.result_cache.clear()
+    return backend.app.test_client()
+
+
+def sample(client, name, **labels):
+    """Current value of one sample on /metrics, 0 if it isn't there yet."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    for family in text_string_to_metric_families(response.get_data(as_text=True)):
+        for s in family.samples:
+            if s.name == name and all(s.labels.get(k) == v for k, v in labels.items()):
+                return s.value
+    return 0
+
+
+def test_requests_are_counted_by_status(client):
+    ok = sample(client, "api_request_duration_seconds_count", endpoint="predict_allergen", status="200")
+    bad = sample(client, "api_errors_total", endpoint="predict_allergen", kind="bad_request")
+    client.post("/predict_allergen", json={"text": "milk"})
+    client.post("/predict_allergen", json={})
+    assert sample(client, "api_request_duration_seconds_count", endpoint="predict_allergen", status="200") == ok + 1
+    assert sample(client, "api_errors_total", endpoint="predict_allergen", kind="bad_request") == bad + 1
+
+
+def test_stages_and_result_sizes_are_recorded(client):
+    searches = sample(client, "api_request_stage_duration_seconds_count", endpoint="recommend_recipes", stage="search")
+    sizes = sample(client, "api_result_size_count", endpoint="recommend_recipes")
+    client.post("/recommend_recipes", json={"query": "dummy"})
+    assert sample(client, "api_request_stage_duration_seconds_count",
+                  endpoint="recommend_recipes", stage="search") == searches + 1
+    assert sample(client, "api_result_size_count", endpoint="recommend_recipes") == sizes + 1
+
+
+def test_profiler_runs_only_when_asked(client, monkeypatch):
+    profiles = []
+    monkeypatch.setattr(metrics, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(metrics, "profile_hooks", [lambda endpoint, stacks: profiles.append((endpoint, stacks))])
+    original = backend.lookup_food
+
+    def slow(*args):
+        time.sleep(0.05)
+        return original(*args)
+    monkeypatch.setattr(backend, "lookup_food", slow)
+
+    client.post("/predict_nutrition", json={"text": "apple"})
+    assert profiles == []
+    client.post("/predict_nutrition", json={"text": "apple"}, headers={"X-Profile": "1"})
+    [(endpoint, stacks)] = profiles
+    assert endpoint == "predict_nutrition"
+    assert any("slow (test_metrics.py" in stack for stack in stacks)
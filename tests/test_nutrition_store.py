@@ -0,0 +1,92 @@
+import operator
+import random
+
+import numpy as np
+import pytest
+
+from nutrition_store import NUTRIENTS, NutrientMatrix, parse_meal_text, parse_predicates, parse_quantity, portion_grams
+
+OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "=": operator.eq}
+
+
+def random_db(rng, n, integers):
+    """n foods with random nutrients; integer values give plenty of ties."""
+    value = (lambda: rng.randint(0, 20)) if integers else (lambda: rng.uniform(0, 100))
+    return {f"food {i}": {nutrient: value() for nutrient in NUTRIENTS} for i in range(n)}
+
+
+@pytest.mark.parametrize("text, parsed", [
+    ("150g rice", ("rice", 150.0, "g")),
+    ("1 1/2 cups milk", ("milk", 1.5, "cups")),
+    ("2 eggs", ("eggs", 2.0, None)),
+    ("half an avocado", ("an avocado", 0.5, None)),
+    ("2 t salt", ("salt", 2.0, "tsp")),
+    ("1 T butter", ("butter", 1.0, "tbsp")),
+    ("1 Tbsp. olive oil", ("olive oil", 1.0, "tbsp")),
+    ("1 large egg", ("egg", 1.0, None)),
+    ("3 medium potatoes", ("potatoes", 3.0, None)),
+    ("2 extra-large eggs", ("eggs", 2.0, None)),
+    ("egg", ("egg", None, None)),
+    ("cheese", ("cheese", None, None)),
+    ("tomato", ("tomato", None, None)),
+])
+def test_parse_quantity(text, parsed):
+    assert parse_quantity(text) == parsed
+
+
+def test_teaspoons_and_tablespoons_weigh_differently():
+    assert portion_grams("salt", *parse_quantity("2 t salt")[1:]) == 10
+    assert portion_grams("butter", *parse_quantity("2 T butter")[1:]) == 30
+
+
+def test_parse_meal_text():
+    assert parse_meal_text("2 eggs, 150g rice and 1 banana") == [
+        ("eggs", 2.0, None), ("rice", 150.0, "g"), ("banana", 1.0, None)]
+
+
+def test_parse_predicates():
+    assert parse_predicates("protein > 20 and FAT<=5.5, fiber == 0") == [
+        ("protein", ">", 20.0), ("fat", "<=", 5.5), ("fiber", "=", 0.0)]
+    for text in ("protein >> 20", "sugar < 5", "protein"):
+        with pytest.raises(ValueError):
+            parse_predicates(text)
+
+
+def test_range_queries_match_brute_force():
+    rng = random.Random(11)
+    db = random_db(rng, 400, integers=True)
+    matrix = NutrientMatrix(db)
+    for _ in range(300):
+        predicates = [(rng.choice(NUTRIENTS), rng.choice(list(OPS)), rng.randint(-1, 21))
+                      for _ in range(rng.randint(0, 3))]
+        sort_by = rng.choice([None] + NUTRIENTS)
+        descending = rng.random() < 0.5
+        limit = rng.randint(1, 50)
+        matching = [row for row, name in enumerate(matrix.names)
+                    if all(OPS[op](db[name][nutrient], value) for nutrient, op, value in predicates)]
+        if sort_by is not None:
+            sign = -1 if descending else 1
+            matching.sort(key=lambda row: (sign * db[matrix.names[row]][sort_by], row))
+        rows, total = matrix.query(predicates, sort_by, descending, limit)
+        assert total == len(matching)
+        assert rows.tolist() == matching[:limit], (predicates, sort_by, descending, limit)
+
+
+def test_similar_foods_are_the_nearest_neighbours():
+    rng = random.Random(12)
+    matrix = NutrientMatrix(random_db(rng, 300, integers=False))
+    scaled = matrix.matrix / matrix.matrix.std(axis=0)
+    for row in rng.sample(range(300), 30):
+        distances = np.sqrt(((scaled - scaled[row]) ** 2).sum(axis=1))
+        distances[row] = np.inf
+        nearest = np.argsort(distances)[:5]
+        rows, found = matrix.similar(row, 5)
+        assert rows.tolist() == nearest.tolist()
+        np.testing.assert_allclose(found, distances[nearest])
+
+
+def test_similar_on_tiny_tables():
+    matrix = NutrientMatrix({"a": {"calories": 1}, "b": {"calories": 1}})
+    rows, distances = matrix.similar(0, 5)
+    assert rows.tolist() == [1] and distances.tolist() == [0.0]
+    assert NutrientMatrix({}).similar(0)[0].tolist() == []
@@ -0,0 +1,55 @@
+import numpy as np
+
+from recipe_allergens import RecipeAllergens
+from search_index import IngredientIndex
+
+
+def build(ner, allergen_df):
+    return RecipeAllergens(IngredientIndex(ner), allergen_df)
+
+
+def allowed(join, names, n_docs):
+    mask, _, unknown = join.resolve(names)
+    assert not unknown
+    return join.allows(np.arange(n_docs), mask).tolist()
+
+
+def test_excludes_recipes_containing_the_allergen(small_allergen_df):
+    ner = ['["flour", "peanut butter"]', '["milk", "sugar"]', '["rice", "salt"]']
+    join = build(ner, small_allergen_df)
+    assert allowed(join, ["peanut"], 3) == [False, True, True]
+    assert allowed(join, ["dairy"], 3) == [True, False, True]
+    assert allowed(join, ["peanut", "lactose"], 3) == [False, False, True]
+
+
+def test_trailing_empty_recipes_keep_the_last_recipes_allergens(small_allergen_df):
+    ner = ['["flour", "peanut butter"]', '[]', '']
+    join = build(ner, small_allergen_df)
+    assert allowed(join, ["peanut"], 3) == [False, True, True]
+    assert allowed(join, ["gluten"], 3) == [True, True, True]
+
+
+def test_empty_recipes_between_others(small_allergen_df):
+    ner = ['[]', '["shrimp", "garlic"]', '[]', '[]', '["whole milk"]', '["peanut", "wheat flour"]', '[]']
+    join = build(ner, small_allergen_df)
+    assert allowed(join, ["shellfish"], 7) == [True, False, True, True, True, True, True]
+    assert allowed(join, ["milk"], 7) == [True, True, True, True, False, True, True]
+    assert allowed(join, ["peanut"], 7) == [True, True, True, True, True, False, True]
+
+
+def test_masks_match_a_per_recipe_join(recipe_df, allergen_df):
+    join = build(recipe_df["ner"], allergen_df)
+    single = [RecipeAllergens(IngredientIndex([ner]), allergen_df) for ner in recipe_df["ner"][:200]]
+    for doc, one in enumerate(single):
+        expected = {one.classes[bit] for bit in range(len(one.classes))
+                    if one.masks[0, bit // 64] & np.uint64(1 << (bit % 64))}
+        got = {join.classes[bit] for bit in range(len(join.classes))
+               if join.masks[doc, bit // 64] & np.uint64(1 << (bit % 64))}
+        assert got == expected
+
+
+def test_unknown_allergen_names_are_reported(small_allergen_df):
+    join = build(['["peanut"]'], small_allergen_df)
+    _, classes, unknown = join.resolve(["peanut", "unobtainium"])
+    assert classes == ["peanut allergy"]
+    assert unknown == ["unobtainium"]
@@ -0,0 +1,111 @@
+import os
+import threading
+
+import pytest
+
+from cache import ResultCache
+from model import AllergenModel
+from reloader import ModelReloader, files_version
+
+
+@pytest.fixture
+def export(tmp_path, small_allergen_df):
+    path = str(tmp_path / "allergen_model.cols")
+    AllergenModel(small_allergen_df).save(path)
+    return path
+
+
+def make_reloader(path):
+    models = {"allergen": AllergenModel.load(path)}
+    return models, ModelReloader(models, {"allergen": (lambda: AllergenModel.load(path), [os.path.join(path, "meta.json")])})
+
+
+def test_version_comes_from_the_export(export, small_allergen_df):
+    _, first = make_reloader(export)
+    models, second = make_reloader(export)
+    # Separate processes (here: reloaders) loading the same files agree on the version
+    assert first.versions["allergen"] == second.versions["allergen"]
+    assert models["allergen"].version == second.versions["allergen"]
+
+    second.reload("allergen", wait=True)
+    assert models["allergen"].version == first.versions["allergen"]
+
+    AllergenModel(small_allergen_df.iloc[:2]).save(export)
+    second.reload("allergen", wait=True)
+    assert models["allergen"].version != first.versions["allergen"]
+    assert second.info()["allergen"]["loads"] == 3
+
+
+def test_failed_reload_keeps_the_model(export):
+    models, reloader = make_reloader(export)
+    before = models["allergen"]
+    reloader.loaders["allergen"] = (lambda: None, reloader.loaders["allergen"][1])
+    reloader.reload("allergen", wait=True)
+    assert models["allergen"] is before
+    assert reloader.info()["allergen"]["state"] == "failed"
+
+
+def test_reload_invalidates_cached_responses(export):
+    models, reloader = make_reloader(export)
+    cache = ResultCache()
+    cache.put("allergen", models["allergen"], "peanut", b"old")  # owner not known yet: dropped
+    assert cache.get("allergen", models["allergen"], "peanut") is None
+    cache.put("allergen", models["allergen"], "peanut", b"old")
+    assert cache.get("allergen", models["allergen"], "peanut") == b"old"
+
+    old = models["allergen"]
+    reloader.reload("allergen", wait=True)
+    assert models["allergen"] is not old
+    assert cache.get("allergen", models["allergen"], "peanut") is None
+    assert cache.stats()["invalidations"] == 1
+    # A late put computed from the replaced model is not kept
+    cache.put("allergen", old, "peanut", b"stale")
+    assert cache.get("allergen", models["allergen"], "peanut") is None
+
+
+def test_watch_picks_up_a_new_export(export, small_allergen_df):
+    models, reloader = make_reloader(export)
+    version = models["allergen"].version
+    reloader.check()
+    assert models["allergen"].version == version
+    AllergenModel(small_allergen_df.iloc[:1]).save(export)
+    os.utime(os.path.join(export, "meta.json"), ns=(1, 1))
+    reloader.check()
+    for thread in threading.enumerate():
+        if thread.name == "reload-allergen":
+            thread.join()
+    assert len(models["allergen"].df) == 1
+    assert models["allergen"].version != version
+
+
+def test_version_ignores_the_unused_pickle(export, tmp_path):
+    pickle_path = str(tmp_path / "allergen_model.pkl")
+    with open(pickle_path, "wb") as f:
+        f.write(b"old pickle")
+    paths = [os.path.join(export, "meta.json"), pickle_path]
+    models = {"allergen": AllergenModel.load(export)}
+    reloader = ModelReloader(models, {"allergen": (lambda: AllergenModel.load(export), paths)})
+    version = reloader.versions["allergen"]
+    assert version == files_version(paths[:1])
+
+    with open(pickle_path, "wb") as f:
+        f.write(b"new pickle, much longer")
+    assert files_version(paths) == version
+    reloader.check()
+    assert models["allergen"].version == version and reloader.info()["allergen"]["loads"] == 1
+
+
+def test_pickle_version_comes_from_size_and_mtime(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    with open(path, "wb") as f:
+        f.write(b"a" * 10)
+    os.utime(path, ns=(1, 1))
+    version = files_version([path])
+    # Same size and mtime: the contents are not read
+    with open(path, "wb") as f:
+        f.write(b"b" * 10)
+    os.utime(path, ns=(1, 1))
+    assert files_version([path]) == version
+    os.utime(path, ns=(2, 2))
+    assert files_version([path]) != version
+    assert files_version([str(tmp_path / "missing.pkl")]) is None
@@ -0,0 +1,314 @@
+import bisect
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.tables import allergen_table, make_words, recipe_table
+from columnar import StringColumn
+from model import AllergenModel, RecipeSearchModel
+from recipe_allergens import AllergenFilter, RecipeAllergenCache
+from search_index import BM25Index, TrigramIndex, expand_query, expand_token, normalize_ingredient, parse_ingredients
+from sharding import ShardedRecipeModel, write_shards
+
+
+@pytest.fixture(scope="module")
+def allergen_model(allergen_df):
+    return AllergenModel(allergen_df)
+
+
+@pytest.fixture(scope="module")
+def recipe_model(recipe_df):
+    return RecipeSearchModel(recipe_df)
+
+
+def recipe_queries(words, n=60, seed=5):
+    rng = random.Random(seed)
+    queries = [" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(n)]
+    queries += [word[:rng.randint(2, 4)] for word in rng.sample(words, n // 2)]  # prefixes
+    return queries
+
+
+def brute_force_top_k(index, query, k, allowed=None):
+    """Score every document for the query's terms; ties go to the lower row."""
+    docs = np.arange(index.n_docs)
+    if allowed is not None:
+        docs = docs[allowed(docs)]
+    scores = np.zeros(len(docs))
+    for term in index.query_terms(query):
+        scores += index._score(term, docs)
+    docs, scores = docs[scores > 0], scores[scores > 0]
+    order = np.lexsort((docs, -scores))[:k]
+    return docs[order], scores[order]
+
+
+def test_trigram_search_matches_substring_scan(words):
+    rng = random.Random(8)
+    docs = [" ".join(rng.sample(words, 2)) for _ in range(500)] + ["", "aaaa", "a.b|c", "crème brûlée"]
+    index = TrigramIndex.from_arrays(TrigramIndex(docs).to_arrays())
+    queries = []
+    for doc in rng.sample(docs[:500], 60):
+        start = rng.randrange(len(doc))
+        queries.append(doc[start:start + rng.randint(1, 8)])
+    queries += ["", "a", "aa", "aaa", "aaaa", "aaaaa", ".b|", "rème", "zzz", "q" * 3]
+    expected = [[row for row, doc in enumerate(docs) if query in doc] for query in queries]
+    assert [index.search(query).tolist() for query in queries] == expected
+    assert [rows.tolist() for rows in index.search_many(queries)] == expected
+
+
+def test_allergen_index_matches_scan(allergen_model, words):
+    rng = random.Random(6)
+    queries = [word[:rng.randint(1, 6)] for word in rng.sample(words, 80)] + ["allergy", "nuts", "zzz"]
+    for query in queries:
+        indexed = allergen_model.find(query, use_index=True)
+        scanned = allergen_model.find(query, use_index=False)
+        assert indexed.tolist() == scanned.tolist(), query
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_allergen_batch_matches_single(allergen_model, words, use_index):
+    queries = words[:20] + [word[:n] for word, n in zip(words[20:40], [2, 3, 4, 5] * 5)] + ["[bad regex", "pea.ut"]
+    batch = allergen_model.search_many(queries, use_index=use_index)
+    for query in queries:
+        single = allergen_model.search(query, use_index=use_index) if query != "[bad regex" else None
+        if isinstance(single, str) or single is None:
+            assert isinstance(batch[query], (str, Exception))
+        else:
+            assert batch[query].equals(single)
+
+
+def test_allergen_scan_sees_past_missing_values():
+    df = pd.DataFrame({"food": ["Milk", None, 5], "type": [None, "milk", "Milk"], "group": ["Dairy"] * 3,
+                       "class": ["Animal origin"] * 3, "allergy": [None, "Lactose intolerance", None]}, dtype=object)
+    model = AllergenModel(df)
+    for use_index in (True, False):
+        assert model.find("milk", use_index=use_index).tolist() == [0, 1, 2]
+        assert model.find("lact.se", use_index=use_index).tolist() == [1]
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+@pytest.mark.parametrize("batch_postings", [0, 1 << 30])
+def test_recipe_batch_matches_single(recipe_model, allergen_model, words, use_index, batch_postings, monkeypatch):
+    # batch_postings sends every query through top_k(), then every one through the batched scoring
+    monkeypatch.setattr(recipe_model.index, "BATCH_POSTINGS", batch_postings)
+    join = RecipeAllergenCache().get(recipe_model, allergen_model)
+    mask, _, _ = join.resolve(["peanut"])
+    queries = list(dict.fromkeys(recipe_queries(words, n=40))) + ["zzz"]
+    for allowed in (None, AllergenFilter(join, mask)):
+        batch = recipe_model.find_many(queries, 5, use_index, allowed)
+        for query, (rows, scores) in zip(queries, batch):
+            expected_rows, expected_scores = recipe_model.find(query, 5, use_index, allowed)
+            assert rows.tolist() == expected_rows.tolist(), query
+            if use_index:
+                assert scores.tolist() == expected_scores.tolist(), query
+            else:
+                assert scores is None
+
+
+def test_recipe_search_many_matches_search(recipe_model, words):
+    queries = recipe_queries(words, n=20)
+    batch = recipe_model.search_many(queries, use_index=False)
+    for query in queries:
+        single = recipe_model.search(query, use_index=False)
+        if isinstance(single, str):
+            assert batch[query] == single
+        else:
+            assert batch[query].equals(single)
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_bm25_top_k_matches_brute_force(recipe_model, words, k):
+    for query in recipe_queries(words):
+        rows, scores = recipe_model.find(query, k)
+        expected_rows, expected_scores = brute_force_top_k(recipe_model.index, query, k)
+        assert rows.tolist() == expected_rows.tolist(), query
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_bm25_scores_follow_the_formula():
+    fields = {"title": ["Chicken Soup", "Lemon Chicken", "Rice"], "ner": ["chicken, onion", "lemon", "rice, chicken"]}
+    weights = {"title": 3.0, "ner": 1.0}
+    index = BM25Index.from_arrays(BM25Index(fields, weights).to_arrays())
+    k1, b = 1.2, 0.75
+    doc_len = np.array([3 * 2 + 2, 3 * 2 + 1, 3 * 1 + 2])
+    tf = np.array([3 + 1, 3, 1])  # weighted count of "chicken" in each doc
+    idf = np.log(1 + (3 - 3 + 0.5) / (3 + 0.5))
+    expected = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / doc_len.mean()))
+
+    rows, scores = index.top_k("chick", 3)  # a prefix expands to "chicken"
+    assert rows.tolist() == np.argsort(-expected, kind="stable").tolist()
+    np.testing.assert_allclose(scores, np.sort(expected)[::-1], rtol=1e-6)
+    assert index.top_k("lemon chicken", 1)[0].tolist() == [1]
+    assert index.top_k("zzz", 3)[0].tolist() == []
+
+
+def test_bm25_ties_go_to_the_lower_row():
+    # Identical documents score the same; the lowest rows must win every cut,
+    # including across the impact-ordered blocks top_k() reads
+    fields = {"title": ["milk"] * 600 + ["cream"] * 10 + ["milk"] * 300}
+    index = BM25Index(fields, {"title": 1.0})
+    for k in (1, 10, 255, 256, 257, 599, 600, 601, 900):
+        rows, _ = index.top_k("milk", k)
+        assert rows.tolist() == (list(range(600)) + list(range(610, 910)))[:k]
+
+
+def test_bm25_filter_matches_brute_force(recipe_model, words):
+    def allowed(docs):
+        return docs % 3 != 0
+
+    for query in recipe_queries(words, 30):
+        rows, _ = recipe_model.find(query, 10, allowed=allowed)
+        assert rows.tolist() == brute_force_top_k(recipe_model.index, query, 10, allowed)[0].tolist()
+
+
+@pytest.mark.parametrize("name, normalized", [
+    ("Eggs", "egg"), ("Cherries", "cherry"), ("tomatoes", "tomato"), ("Brown Sugar", "brown sugar"),
+    ("swiss", "swiss"), ("bus", "bus"), ("  ", ""),
+])
+def test_normalize_ingredient(name, normalized):
+    assert normalize_ingredient(name) == normalized
+
+
+def test_parse_ingredients():
+    assert parse_ingredients('["Eggs", "brown sugar", "milk"]') == ["egg", "brown sugar", "milk"]
+    assert parse_ingredients("eggs, milk,") == ["egg", "milk"]
+    assert parse_ingredients(None) == []
+
+
+@pytest.mark.parametrize("max_missing", [None, 0, 2])
+def test_pantry_ranking_matches_brute_force(recipe_model, recipe_df, words, max_missing):
+    def allowed(docs):
+        return docs % 4 != 1
+
+    recipes = [set(parse_ingredients(text)) for text in recipe_df["ner"]]
+    rng = random.Random(9)
+    for _ in range(40):
+        pantry = rng.sample(words, rng.randint(1, 30))
+        for rule in (None, allowed):
+            rows, matched, missing, known, unknown = recipe_model.cook_with(pantry + ["Unobtainium"], 7, max_missing, rule)
+            have = set(pantry)
+            ranked = sorted((len(items - have), -len(items & have), row) for row, items in enumerate(recipes)
+                            if items & have and (max_missing is None or len(items - have) <= max_missing)
+                            and (rule is None or rule(np.array([row]))[0]))[:7]
+            assert rows.tolist() == [row for _, _, row in ranked]
+            assert matched.tolist() == [-count for _, count, _ in ranked]
+            assert [sorted(names) for names in missing] == [sorted(recipes[row] - have) for row in rows]
+            assert sorted(known) == sorted(have & set().union(*recipes)) and unknown == ["unobtainium"]
+
+
+def test_expanded_terms_reproduce_the_query(recipe_model, words):
+    for query in recipe_queries(words, 20):
+        terms = expand_query(recipe_model.index.terms, query, BM25Index.MAX_EXPANSIONS)
+        assert recipe_model.index.query_terms(query, terms) == recipe_model.index.query_terms(query)
+
+
+@pytest.fixture(scope="module")
+def rare_words():
+    # A vocabulary large enough that every shard misses some words, so
+    # per-shard prefix expansion would differ from the whole corpus'
+    return make_words(random.Random(8), 4000)
+
+
+@pytest.fixture(scope="module")
+def rare_df(rare_words):
+    return recipe_table(random.Random(2), 1500, rare_words)
+
+
+@pytest.fixture(scope="module")
+def sharded(rare_df, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("shards") / "recipes.shards")
+    write_shards(rare_df, path, 4)
+    return ShardedRecipeModel(path, workers=0)
+
+
+def test_sharded_vocabulary_is_mapped(sharded, rare_words):
+    vocabulary = sharded.vocabulary
+    assert isinstance(vocabulary, StringColumn) and isinstance(vocabulary.data, np.memmap)
+    terms = list(vocabulary)
+    assert terms == sorted(terms)
+    rng = random.Random(9)
+    for token in [word[:rng.randint(1, 5)] for word in rng.sample(rare_words, 200)] + ["zzzz", "", terms[0]]:
+        assert expand_token(vocabulary, token, 10) == expand_token(terms, token, 10), token
+        assert vocabulary.searchsorted(token) == bisect.bisect_left(terms, token)
+
+
+@pytest.mark.parametrize("k", [1, 5, 20])
+def test_sharded_matches_unsharded(sharded, rare_df, rare_words, k):
+    model = RecipeSearchModel(rare_df)
+    queries = recipe_queries(rare_words) + [word[:3] for word in rare_words[::40]]
+    for query, (rows, scores) in zip(queries, sharded.find_many(queries, k)):
+        expected_rows, expected_scores = model.find(query, k)
+        assert rows.tolist() == expected_rows.tolist(), query
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_sharded_scan_matches_unsharded(sharded, rare_df, rare_words):
+    model = RecipeSearchModel(rare_df)
+    for query in rare_words[:20] + ["ba", "mo"]:
+        rows, _ = sharded.find(query, 10, use_index=False)
+        assert rows.tolist() == model.find(query, 10, use_index=False)[0].tolist()
+
+
+def test_sharded_process_pool_matches_in_process(sharded, rare_words):
+    pooled = ShardedRecipeModel(sharded.path, workers=2)
+    queries = recipe_queries(rare_words, 10)
+    for (rows, scores), (expected_rows, expected_scores) in zip(pooled.find_many(queries, 5),
+                                                                sharded.find_many(queries, 5)):
+        assert rows.tolist() == expected_rows.tolist()
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+@pytest.fixture(scope="module")
+def rare_allergen_model(rare_words):
+    # Single-word foods, so recipe ingredients (single words here) match them
+    rng = random.Random(1)
+    df = allergen_table(rng, 600, rare_words)
+    df["food"] = [word.title() for word in rng.sample(rare_words, len(df))]
+    return AllergenModel(df)
+
+
+@pytest.mark.parametrize("names", [["peanut"], ["gluten", "shellfish"], ["lactose"]])
+def test_sharded_exclusions_match_unsharded(sharded, rare_df, rare_words, rare_allergen_model, names):
+    model = RecipeSearchModel(rare_df)
+    filters = []
+    for recipes in (model, sharded):
+        join = RecipeAllergenCache().get(recipes, rare_allergen_model)
+        mask, _, unknown = join.resolve(names)
+        assert not unknown
+        filters.append(AllergenFilter(join, mask))
+
+    docs = np.arange(len(rare_df))
+    assert filters[0](docs).tolist() == filters[1](docs).tolist()
+    assert not filters[0](docs).all()
+
+    queries = recipe_queries(rare_words, 40)
+    for query, (rows, scores) in zip(queries, sharded.find_many(queries, 10, allowed=filters[1])):
+        expected_rows, _ = model.find(query, 10, allowed=filters[0])
+        assert rows.tolist() == expected_rows.tolist(), query
+        assert filters[0](rows).all()
+
+
+def test_sharded_pool_applies_exclusions(sharded, rare_words, rare_allergen_model):
+    pooled = ShardedRecipeModel(sharded.path, workers=2)
+    join = RecipeAllergenCache().get(pooled, rare_allergen_model)
+    allowed = AllergenFilter(join, join.resolve(["peanut"])[0])
+    queries = recipe_queries(rare_words, 10)
+    for (rows, _), (expected_rows, _) in zip(pooled.find_many(queries, 10, allowed=allowed),
+                                             sharded.find_many(queries, 10, allowed=allowed)):
+        assert rows.tolist() == expected_rows.tolist()
+
+
+@pytest.mark.parametrize("max_missing", [None, 2])
+def test_sharded_pantry_matches_unsharded(sharded, rare_df, rare_words, rare_allergen_model, max_missing):
+    model = RecipeSearchModel(rare_df)
+    join = RecipeAllergenCache().get(sharded, rare_allergen_model)
+    rng = random.Random(9)
+    for _ in range(40):
+        pantry = rng.sample(rare_words, rng.randint(1, 12)) + ["Unobtainium"]
+        allowed = AllergenFilter(join, join.resolve(["peanut"])[0]) if rng.random() < 0.3 else None
+        got = sharded.cook_with(pantry, 10, max_missing, allowed)
+        expected = model.cook_with(pantry, 10, max_missing, allowed)
+        assert got[0].tolist() == expected[0].tolist()
+        assert got[1].tolist() == expected[1].tolist()
+        assert got[2:] == expected[2:]
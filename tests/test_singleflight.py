@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from singleflight import AsyncSingleFlight, FlightTimeout, SingleFlight
+
+
+def start_waiters(flight, key, fn, n):
+    """n threads calling flight.do(key, fn) after the leader; (threads, outcomes)."""
+    outcomes = []
+
+    def wait():
+        try:
+            outcomes.append(flight.do(key, fn))
+        except BaseException as e:
+            outcomes.append(e)
+    threads = [threading.Thread(target=wait) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()["waiting"] < n:
+        time.sleep(0.001)
+    return threads, outcomes
+
+
+def blocked_leader(flight, key, release, result=None, error=None):
+    """Start a leader for key that finishes once `release` is set; (thread, its outcomes)."""
+    outcomes = []
+
+    def compute():
+        release.wait()
+        if error is not None:
+            raise error
+        return result
+
+    def lead():
+        try:
+            outcomes.append(flight.do(key, compute))
+        except BaseException as e:
+            outcomes.append(e)
+    thread = threading.Thread(target=lead)
+    thread.start()
+    while flight.stats()["in_flight"] < 1:
+        time.sleep(0.001)
+    return thread, outcomes
+
+
+def test_waiters_share_the_leaders_result():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    result = object()
+    leader, led = blocked_leader(flight, "k", release, result=result)
+    threads, outcomes = start_waiters(flight, "k", lambda: pytest.fail("ran twice"), 4)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join()
+
+    assert led == [(result, False)]
+    assert outcomes == [(result, True)] * 4
+    stats = flight.stats()
+    assert (stats["leaders"], stats["shared"], stats["in_flight"], stats["waiting"]) == (1, 4, 0, 0)
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    error = ValueError("boom")
+    leader, led = blocked_leader(flight, "k", release, error=error)
+    threads, outcomes = start_waiters(flight, "k", lambda: pytest.fail("ran twice"), 3)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join()
+
+    assert led == [error]
+    assert outcomes == [error] * 3
+    assert flight.stats()["errors"] == 1
+    # The failed call is forgotten; the next caller runs its own
+    assert flight.do("k", lambda: 7) == (7, False)
+
+
+def test_waiter_times_out_while_the_leader_finishes():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    leader, led = blocked_leader(flight, "k", release, result=1)
+    with pytest.raises(FlightTimeout):
+        flight.do("k", lambda: pytest.fail("ran twice"))
+    release.set()
+    leader.join()
+
+    assert led == [(1, False)]
+    assert flight.stats()["timeouts"] == 1
+
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    leader, led = blocked_leader(flight, "a", release, result="a")
+    assert flight.do("b", lambda: "b") == ("b", False)
+    release.set()
+    leader.join()
+    assert led == [("a", False)]
+
+
+def test_async_waiters_share_result_and_errors():
+    async def run():
+        flight = AsyncSingleFlight(timeout=5)
+        calls = []
+
+        async def compute(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        shared = await asyncio.gather(*(flight.do("k", lambda: compute(1)) for _ in range(4)))
+        error = KeyError("missing")
+        failed = await asyncio.gather(*(flight.do("e", lambda: compute(error)) for _ in range(3)),
+                                      return_exceptions=True)
+        return flight, calls, shared, failed, error
+
+    flight, calls, shared, failed, error = asyncio.run(run())
+    assert calls[0] == 1 and calls[1] is error and len(calls) == 2
+    assert shared == [(1, False)] + [(1, True)] * 3
+    assert failed == [error] * 3
+    stats = flight.stats()
+    assert (stats["leaders"], stats["shared"], stats["errors"], stats["in_flight"]) == (2, 3, 1, 0)
+
+
+def test_async_waiter_times_out_and_a_cancelled_leader_keeps_running():
+    async def run():
+        flight = AsyncSingleFlight(timeout=0.02)
+        finished = asyncio.Event()
+
+        async def compute():
+            await asyncio.sleep(0.1)
+            finished.set()
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        with pytest.raises(FlightTimeout):
+            await flight.do("k", compute)
+        # The client that started the work goes away; the work does not
+        leader.cancel()
+        await asyncio.wait_for(finished.wait(), 1)
+        return flight
+
+    flight = asyncio.run(run())
+    assert flight.stats()["timeouts"] == 1
+    assert flight.stats()["in_flight"] == 0